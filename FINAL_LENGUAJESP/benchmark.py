@@ -0,0 +1,326 @@
+"""
+Script de mediciones de rendimiento para el Sistema de Gestión Bancaria.
+Uso: python benchmark.py [cantidad_de_cuentas]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from models.banco import TIPOS_CUENTA
+from operations.sistema import SistemaBancario
+from operations.intereses import MotorIntereses
+from operations.verificacion import VerificadorLibro
+from operations.ordenes import ProgramadorOrdenes
+from operations.instantanea import guardar_instantanea, cargar_instantanea
+from operations.memoria_compartida import PublicadorSaldos, LectorSaldos
+from operations.conciliacion import ConciliadorExtractos
+from operations.politicas import MotorPoliticas, POLITICAS_POR_DEFECTO
+
+
+def crear_sistema_poblado(total_cuentas):
+    """Crea un sistema con la cantidad de cuentas indicada repartidas entre los tipos."""
+    sistema = SistemaBancario()
+    for i in range(total_cuentas):
+        sistema.crear_cuenta(f"Titular {i}", TIPOS_CUENTA[i % len(TIPOS_CUENTA)], 1000 + i % 5000)
+    return sistema
+
+
+def benchmark_intereses(total_cuentas):
+    """Mide una ejecución completa del motor de intereses y comisiones."""
+    print(f"━━━ Devengo de intereses: {total_cuentas} cuentas ━━━")
+
+    inicio = time.perf_counter()
+    sistema = crear_sistema_poblado(total_cuentas)
+    print(f"  Población del sistema: {time.perf_counter() - inicio:.2f} s")
+
+    motor = MotorIntereses(sistema)
+    inicio = time.perf_counter()
+    resumen = motor.ejecutar()
+    duracion = time.perf_counter() - inicio
+
+    print(f"  Movimientos generados: {resumen['movimientos']}")
+    print(f"  Intereses: ${resumen['intereses']} | Comisiones: ${resumen['comisiones']}")
+    print(f"  Duración: {duracion:.2f} s ({total_cuentas / duracion:,.0f} cuentas/s)\n")
+
+
+def benchmark_verificacion(total_cuentas, procesos=4):
+    """Mide la verificación completa del libro en un proceso y en varios."""
+    print(f"━━━ Verificación del libro: {total_cuentas} cuentas ━━━")
+
+    sistema = crear_sistema_poblado(total_cuentas)
+    MotorIntereses(sistema).ejecutar()
+    print(f"  Apuntes en el libro: {len(sistema.transacciones)}")
+
+    for cantidad_procesos in (1, procesos):
+        verificador = VerificadorLibro(sistema, procesos=cantidad_procesos, minimo_paralelo=0)
+        inicio = time.perf_counter()
+        resultado = verificador.verificar()
+        duracion = time.perf_counter() - inicio
+        print(f"  {cantidad_procesos} proceso(s): {duracion:.2f} s | correcto: {resultado['correcto']}")
+    print()
+
+
+def benchmark_memoria_cuentas(total_cuentas):
+    """Mide la memoria por cuenta del almacén denso y el recorrido completo de saldos."""
+    print(f"━━━ Almacén de cuentas: {total_cuentas} cuentas ━━━")
+
+    tracemalloc.start()
+    sistema = SistemaBancario()
+    for i in range(total_cuentas):
+        sistema.cuentas.agregar(f"Titular {i}", TIPOS_CUENTA[i % len(TIPOS_CUENTA)], 100000 + i % 500000)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    saldo_total = sistema.obtener_estadisticas()["saldo_total_sistema"]
+    duracion = time.perf_counter() - inicio
+
+    print(f"  Memoria: {memoria / total_cuentas:.0f} bytes por cuenta")
+    print(f"  Suma de saldos: ${saldo_total} en {duracion * 1000:.1f} ms\n")
+
+
+def benchmark_ordenes(total_ordenes, total_cuentas=100_000):
+    """Mide la ejecución en un solo ciclo de órdenes permanentes vencidas."""
+    print(f"━━━ Órdenes permanentes: {total_ordenes} órdenes sobre {total_cuentas} cuentas ━━━")
+
+    sistema = crear_sistema_poblado(total_cuentas)
+    programador = ProgramadorOrdenes(sistema)
+    aleatorio = random.Random(1)
+    primer_numero = sistema.cuentas.primer_numero
+    vencimiento = datetime(2025, 1, 1)
+
+    inicio = time.perf_counter()
+    for _ in range(total_ordenes):
+        origen, destino = aleatorio.sample(range(total_cuentas), 2)
+        programador.crear_orden(primer_numero + origen, primer_numero + destino,
+                                aleatorio.randint(1, 200), primera_ejecucion=vencimiento)
+    print(f"  Programación: {time.perf_counter() - inicio:.2f} s")
+
+    inicio = time.perf_counter()
+    resumen = programador.ejecutar_pendientes(vencimiento)
+    duracion = time.perf_counter() - inicio
+
+    print(f"  Ejecutadas: {resumen['ejecutadas']} | Reintentos: {resumen['reintentos']}")
+    print(f"  Duración: {duracion:.2f} s ({total_ordenes / duracion:,.0f} órdenes/s)\n")
+
+
+def benchmark_rechazos(repeticiones=200_000):
+    """Compara el costo de los rechazos con excepciones y con códigos de resultado."""
+    print(f"━━━ Rechazos por saldo insuficiente: {repeticiones} operaciones ━━━")
+
+    sistema = SistemaBancario()
+    numero_cuenta = sistema.crear_cuenta("Titular", "Ahorro", 10)["numero_cuenta"]
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        try:
+            sistema.retirar(numero_cuenta, 100)
+        except ValueError:
+            pass
+    duracion_excepciones = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        sistema.intentar_retirar(numero_cuenta, 100)
+    duracion_resultados = time.perf_counter() - inicio
+
+    print(f"  Con excepciones: {duracion_excepciones:.2f} s")
+    print(f"  Con resultados:  {duracion_resultados:.2f} s\n")
+
+
+def benchmark_instantanea(total_cuentas, total_transacciones):
+    """Compara el arranque reproduciendo las operaciones con la carga de una instantánea."""
+    print(f"━━━ Arranque: {total_cuentas} cuentas y {total_transacciones} operaciones ━━━")
+
+    aleatorio = random.Random(1)
+    operaciones = [
+        (aleatorio.randrange(total_cuentas), aleatorio.randrange(total_cuentas), aleatorio.randint(1, 50))
+        for _ in range(total_transacciones)
+    ]
+
+    def reproducir():
+        sistema = crear_sistema_poblado(total_cuentas)
+        primer_numero = sistema.cuentas.primer_numero
+        for origen, destino, monto in operaciones:
+            if origen == destino:
+                sistema.intentar_depositar(primer_numero + origen, monto)
+            else:
+                sistema.intentar_transferir(primer_numero + origen, primer_numero + destino, monto)
+        return sistema
+
+    inicio = time.perf_counter()
+    sistema = reproducir()
+    duracion_reproduccion = time.perf_counter() - inicio
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "estado.sbin")
+        inicio = time.perf_counter()
+        guardar_instantanea(sistema, ruta)
+        duracion_guardado = time.perf_counter() - inicio
+        tamano = os.path.getsize(ruta)
+        apuntes = len(sistema.transacciones)
+        del sistema
+
+        inicio = time.perf_counter()
+        restaurado = cargar_instantanea(ruta)
+        duracion_carga = time.perf_counter() - inicio
+
+    assert len(restaurado.transacciones) == apuntes
+    print(f"  Reproducción: {duracion_reproduccion:.2f} s ({apuntes} apuntes)")
+    print(f"  Instantánea: {tamano / 1_000_000:.1f} MB guardados en {duracion_guardado:.2f} s")
+    print(f"  Carga: {duracion_carga:.2f} s ({duracion_reproduccion / duracion_carga:.1f}x más rápida)\n")
+
+
+def benchmark_ranking(total_cuentas, total_operaciones=100_000):
+    """Mide la construcción del índice de saldos y las consultas de ranking tras muchas operaciones."""
+    print(f"━━━ Ranking de saldos: {total_cuentas} cuentas ━━━")
+
+    sistema = crear_sistema_poblado(total_cuentas)
+    inicio = time.perf_counter()
+    sistema.cuentas_mayor_saldo(10)
+    print(f"  Construcción del índice: {time.perf_counter() - inicio:.2f} s")
+
+    aleatorio = random.Random(1)
+    primer_numero = sistema.cuentas.primer_numero
+    for _ in range(total_operaciones):
+        sistema.intentar_depositar(primer_numero + aleatorio.randrange(total_cuentas), aleatorio.randint(1, 5000))
+
+    inicio = time.perf_counter()
+    sistema.cuentas_mayor_saldo(10)
+    duracion_sincronizacion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for i in range(1000):
+        sistema.cuentas_mayor_saldo(10, TIPOS_CUENTA[i % len(TIPOS_CUENTA)])
+        sistema.posicion_saldo(primer_numero + i)
+    duracion_consultas = time.perf_counter() - inicio
+
+    print(f"  Reordenamiento de {total_operaciones} depósitos: {duracion_sincronizacion:.2f} s")
+    print(f"  Top 10 y posición: {duracion_consultas / 1000 * 1e6:.0f} µs por consulta\n")
+
+
+def benchmark_memoria_compartida(total_cuentas, total_operaciones=200_000):
+    """Mide el costo de publicar los saldos en memoria compartida y la lectura desde un lector."""
+    print(f"━━━ Saldos en memoria compartida: {total_cuentas} cuentas ━━━")
+
+    sistema = crear_sistema_poblado(total_cuentas)
+    primer_numero = sistema.cuentas.primer_numero
+    aleatorio = random.Random(1)
+    numeros = [primer_numero + aleatorio.randrange(total_cuentas) for _ in range(total_operaciones)]
+
+    inicio = time.perf_counter()
+    for numero in numeros:
+        sistema.intentar_depositar(numero, 1)
+    duracion_sin = time.perf_counter() - inicio
+
+    publicador = PublicadorSaldos(sistema)
+    lector = LectorSaldos(publicador.nombre)
+    try:
+        inicio = time.perf_counter()
+        for numero in numeros:
+            sistema.intentar_depositar(numero, 1)
+        duracion_con = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for numero in numeros:
+            lector.leer(numero)
+        duracion_lectura = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        lector.saldo_total()
+        duracion_total = time.perf_counter() - inicio
+    finally:
+        lector.cerrar()
+        publicador.cerrar()
+
+    print(f"  Depósitos: {duracion_sin / total_operaciones * 1e6:.1f} µs sin publicar, "
+          f"{duracion_con / total_operaciones * 1e6:.1f} µs publicando")
+    print(f"  Lectura de una cuenta: {duracion_lectura / total_operaciones * 1e6:.2f} µs")
+    print(f"  Suma consistente de todos los saldos: {duracion_total * 1000:.1f} ms\n")
+
+
+def benchmark_conciliacion(total_operaciones, total_cuentas=100_000):
+    """Mide la conciliación de un extracto con discrepancias contra el libro."""
+    print(f"━━━ Conciliación: {total_operaciones} operaciones sobre {total_cuentas} cuentas ━━━")
+
+    sistema = crear_sistema_poblado(total_cuentas)
+    aleatorio = random.Random(1)
+    primer_numero = sistema.cuentas.primer_numero
+    for _ in range(total_operaciones):
+        sistema.intentar_depositar(primer_numero + aleatorio.randrange(total_cuentas), aleatorio.randint(1, 500))
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "extracto.csv")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write("numero_cuenta,fecha,monto\n")
+            for transaccion in sistema.transacciones:
+                azar = aleatorio.random()
+                if azar < 0.01:
+                    continue  # Falta en el extracto
+                monto = transaccion.monto + (1 if azar < 0.02 else 0)  # Discrepancia de monto
+                archivo.write(f"{transaccion.numero_cuenta},{transaccion.fecha},{monto}\n")
+
+        inicio = time.perf_counter()
+        resumen = ConciliadorExtractos(sistema).conciliar(ruta)
+        duracion = time.perf_counter() - inicio
+
+        # La memoria se mide en una segunda pasada para no inflar el tiempo
+        tracemalloc.start()
+        ConciliadorExtractos(sistema).conciliar(ruta)
+        memoria = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    print(f"  Conciliadas: {resumen['conciliada']} | Discrepancias: {resumen['discrepancia_monto']} | "
+          f"Faltan en el extracto: {resumen['falta_en_extracto']}")
+    print(f"  Tiempo: {duracion:.2f} s ({resumen['lineas'] / duracion:,.0f} líneas/s)")
+    print(f"  Memoria adicional máxima del proceso principal: {memoria / 1_000_000:.1f} MB\n")
+
+
+def benchmark_politicas(repeticiones=200_000):
+    """Mide retiros, transferencias y rechazos sin políticas y con las políticas por defecto."""
+    print(f"━━━ Políticas por tipo de cuenta: {repeticiones} operaciones ━━━")
+
+    for nombre, politicas in (("Sin políticas", None), ("Por defecto", MotorPoliticas(POLITICAS_POR_DEFECTO))):
+        sistema = SistemaBancario(politicas=politicas)
+        corriente = sistema.crear_cuenta("Titular", "Corriente", 10_000_000)["numero_cuenta"]
+        ahorro = sistema.crear_cuenta("Titular", "Ahorro", 10_000_000)["numero_cuenta"]
+        sin_saldo = sistema.crear_cuenta("Titular", "Nómina", 0)["numero_cuenta"]
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            sistema.intentar_retirar(corriente, 1)
+        duracion_retiros = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            sistema.intentar_transferir(ahorro, corriente, 1)
+        duracion_transferencias = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            sistema.intentar_retirar(sin_saldo, 1)
+        duracion_rechazos = time.perf_counter() - inicio
+
+        print(f"  {nombre}: retiros {repeticiones / duracion_retiros:,.0f}/s | "
+              f"transferencias {repeticiones / duracion_transferencias:,.0f}/s | "
+              f"rechazos {repeticiones / duracion_rechazos:,.0f}/s")
+    print()
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    benchmark_intereses(cantidad)
+    benchmark_verificacion(cantidad)
+    benchmark_ordenes(cantidad)
+    benchmark_rechazos()
+    benchmark_memoria_cuentas(cantidad)
+    benchmark_instantanea(cantidad, cantidad * 10)
+    benchmark_ranking(cantidad)
+    benchmark_memoria_compartida(cantidad)
+    benchmark_conciliacion(cantidad)
+    benchmark_politicas()
@@ -5,18 +5,63 @@ Implementa la GUI usando Tkinter con múltiples pestañas y funcionalidades comp
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+from models.banco import (
+    ESTADO_ACTIVA, ESTADO_BLOQUEADA, ESTADO_CERRADA, SIGNO_OPERACION, Cuenta, Transaccion
+)
 from operations.sistema import SistemaBancario
+from operations.limites import MotorLimites, REGLAS_POR_DEFECTO
+from operations.politicas import MotorPoliticas, POLITICAS_POR_DEFECTO
+from operations.eventos import EventoCuentaCreada, EventoMovimiento, EventoEstadoCambiado
 
 
 class AplicacionBancaria:
     """Clase principal de la interfaz gráfica del sistema bancario."""
     
-    def __init__(self, ventana_principal):
+    # Clave del resumen de estadísticas que cuenta las cuentas de cada estado
+    _CLAVES_ESTADO = {
+        ESTADO_ACTIVA: "cuentas_activas",
+        ESTADO_BLOQUEADA: "cuentas_bloqueadas",
+        ESTADO_CERRADA: "cuentas_cerradas"
+    }
+    
+    # Cantidad de filas insertadas en el Treeview por cada ciclo del loop de eventos
+    TAMANO_BLOQUE_CARGA = 500
+    
+    # Transacciones pedidas al sistema por página y mostradas por ciclo en el extracto
+    TAMANO_PAGINA_EXTRACTO = 50
+    TRANSACCIONES_POR_CICLO = 10
+    
+    # Cantidad máxima de cuentas mostradas por una búsqueda por rango de saldo
+    LIMITE_RANGO_SALDOS = 1000
+    
+    # Días mostrados en el volumen de operaciones de las estadísticas
+    DIAS_VOLUMEN = 7
+    
+    # Métodos medidos cuando se activa el modo de trazas
+    ACCIONES_TRAZADAS = (
+        "_crear_cuenta", "_realizar_deposito", "_realizar_retiro", "_realizar_transferencia",
+        "_cambiar_estado_seleccion", "_consultar_saldo", "_cargar_mas_transacciones",
+        "_actualizar_lista_cuentas", "_mostrar_transacciones", "_mostrar_todas_transacciones",
+        "_buscar_por_titular", "_actualizar_estadisticas", "_al_cambiar_pestaña",
+        "_cargar_datos_iniciales", "_insertar_bloque_cuentas", "_mostrar_parte_extracto",
+        "_mostrar_ranking", "_buscar_por_rango_saldo", "_mostrar_posicion_saldo"
+    )
+    ACTUALIZACIONES_TRAZADAS = (
+        "_insertar_fila_cuenta", "_insertar_fila_transaccion", "_procesar_eventos",
+        "_actualizar_lista_transacciones", "_mostrar_resumen"
+    )
+    
+    def __init__(self, ventana_principal, sistema=None, carga_diferida=True, trazador=None):
         """
         Inicializa la aplicación bancaria con la ventana principal.
         
         Args:
             ventana_principal: Instancia de tk.Tk()
+            sistema: SistemaBancario existente (por ejemplo, restaurado); si se omite se crea uno vacío
+            carga_diferida: Si es True, las pestañas se construyen al seleccionarse por primera vez
+                y los datos se cargan después de que la ventana se muestra
+            trazador: Trazador opcional que mide las acciones, las llamadas al sistema,
+                las conversiones a diccionario y las actualizaciones de widgets
         """
         self.ventana = ventana_principal
         self.ventana.title("Sistema de Gestión Bancaria")
@@ -24,7 +69,24 @@ class AplicacionBancaria:
         self.ventana.resizable(True, True)
         
         # Instanciar el sistema bancario
-        self.sistema = SistemaBancario()
+        if sistema is None:
+            sistema = SistemaBancario(
+                limites=MotorLimites(REGLAS_POR_DEFECTO),
+                politicas=MotorPoliticas(POLITICAS_POR_DEFECTO)
+            )
+        self.sistema = sistema
+        self.carga_diferida = carga_diferida
+        self._datos_cargados = False
+        
+        # Suscribirse al flujo de cambios para actualizar las vistas de forma incremental
+        self.suscripcion = self.sistema.suscribir_eventos(capacidad=5000)
+        self._resumen = None
+        self._lista_cuentas_completa = True
+        self._filtro_transacciones = None  # None: sin cargar, "todas" o número de cuenta
+        
+        self.trazador = trazador
+        if trazador is not None:
+            self._instrumentar(trazador)
         
         # Configurar la interfaz
         self._configurar_interfaz()
@@ -54,11 +116,20 @@ class AplicacionBancaria:
         self.notebook = ttk.Notebook(frame_principal)
         self.notebook.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        # Crear las pestañas
-        self._crear_pestaña_cuentas()
-        self._crear_pestaña_operaciones()
-        self._crear_pestaña_transacciones()
-        self._crear_pestaña_busqueda()
+        # Crear las pestañas vacías; su contenido se construye al seleccionarlas
+        self._pestañas = []
+        for texto, constructor in (
+            ("📋 Gestión de Cuentas", self._crear_pestaña_cuentas),
+            ("💰 Operaciones", self._crear_pestaña_operaciones),
+            ("📊 Transacciones", self._crear_pestaña_transacciones),
+            ("🔍 Búsqueda", self._crear_pestaña_busqueda)
+        ):
+            frame = ttk.Frame(self.notebook, padding="10")
+            self.notebook.add(frame, text=texto)
+            self._pestañas.append([frame, constructor, False])
+        
+        self.notebook.bind("<<NotebookTabChanged>>", self._al_cambiar_pestaña)
+        self._asegurar_pestaña(0)
         
         # ===== BARRA DE ESTADO =====
         self.label_estado = ttk.Label(
@@ -69,14 +140,80 @@ class AplicacionBancaria:
         )
         self.label_estado.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
         
-        # Actualizar estado inicial
+        if self.carga_diferida:
+            # Cargar los datos cuando la ventana ya es visible
+            self.ventana.bind("<Map>", self._al_mostrar_ventana, add="+")
+        else:
+            for indice in range(len(self._pestañas)):
+                self._asegurar_pestaña(indice)
+            self._actualizar_lista_cuentas()
+            self._actualizar_estado()
+            self._datos_cargados = True
+    
+    def _instrumentar(self, trazador):
+        """Envuelve las acciones, el sistema y las conversiones en intervalos del trazador."""
+        trazador.instrumentar(self, self.ACCIONES_TRAZADAS, "accion")
+        trazador.instrumentar(self, self.ACTUALIZACIONES_TRAZADAS, "interfaz")
+        trazador.instrumentar(
+            self.sistema,
+            [nombre for nombre in dir(type(self.sistema))
+             if not nombre.startswith("_") and callable(getattr(self.sistema, nombre))],
+            "sistema"
+        )
+        trazador.instrumentar(Cuenta, ("to_dict",), "conversion")
+        trazador.instrumentar(Transaccion, ("to_dict",), "conversion")
+        if trazador.al_detectar_lento is None:
+            trazador.al_detectar_lento = self._avisar_accion_lenta
+    
+    def _avisar_accion_lenta(self, nombre, duracion_ms):
+        """Muestra en la barra de estado una advertencia por una acción lenta."""
+        if hasattr(self, "label_estado"):
+            self.label_estado.config(text=f"⚠ Acción lenta: {nombre} tardó {duracion_ms:.0f} ms")
+    
+    def _asegurar_pestaña(self, indice):
+        """Construye el contenido de una pestaña si todavía no existe."""
+        pestaña = self._pestañas[indice]
+        if not pestaña[2]:
+            pestaña[2] = True
+            pestaña[1](pestaña[0])
+    
+    def _al_cambiar_pestaña(self, evento=None):
+        """Construye la pestaña seleccionada la primera vez que se muestra."""
+        self._asegurar_pestaña(self.notebook.index(self.notebook.select()))
+    
+    def _al_mostrar_ventana(self, evento=None):
+        """Programa la carga inicial de datos la primera vez que la ventana se muestra."""
+        if self._datos_cargados:
+            return
+        self._datos_cargados = True
+        self.ventana.after_idle(self._cargar_datos_iniciales)
+    
+    def _cargar_datos_iniciales(self):
+        """Carga la barra de estado y la lista de cuentas por bloques sin bloquear la ventana."""
         self._actualizar_estado()
+        for item in self.tree_cuentas.get_children():
+            self.tree_cuentas.delete(item)
+        self._lista_cuentas_completa = True
+        # Solo se fijan los números: cada bloque lee el estado actual de sus cuentas al insertarse
+        cuentas = self.sistema.cuentas
+        self._insertar_bloque_cuentas(range(cuentas.primer_numero, cuentas.primer_numero + len(cuentas)), 0)
+    
+    def _insertar_bloque_cuentas(self, numeros_cuenta, inicio):
+        """Inserta un bloque de cuentas y programa el siguiente en el loop de eventos."""
+        if not self._lista_cuentas_completa:
+            return  # Una búsqueda reemplazó la lista mientras se cargaba
+        
+        cuentas = self.sistema.cuentas
+        fin = min(inicio + self.TAMANO_BLOQUE_CARGA, len(numeros_cuenta))
+        for numero_cuenta in numeros_cuenta[inicio:fin]:
+            if not self.tree_cuentas.exists(str(numero_cuenta)):
+                self._insertar_fila_cuenta(cuentas[numero_cuenta].to_dict())
+        
+        if fin < len(numeros_cuenta):
+            self.ventana.after(1, self._insertar_bloque_cuentas, numeros_cuenta, fin)
     
-    def _crear_pestaña_cuentas(self):
+    def _crear_pestaña_cuentas(self, frame_cuentas):
         """Crea la pestaña de gestión de cuentas."""
-        frame_cuentas = ttk.Frame(self.notebook, padding="10")
-        self.notebook.add(frame_cuentas, text="📋 Gestión de Cuentas")
-        
         frame_cuentas.columnconfigure(0, weight=1)
         frame_cuentas.rowconfigure(2, weight=1)
         
@@ -125,6 +262,24 @@ class AplicacionBancaria:
             command=self._actualizar_lista_cuentas
         ).pack(side=tk.LEFT, padx=(0, 10))
         
+        ttk.Button(
+            frame_botones_cuentas,
+            text="Bloquear",
+            command=lambda: self._cambiar_estado_seleccion(self.sistema.bloquear_cuenta)
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Button(
+            frame_botones_cuentas,
+            text="Cerrar",
+            command=lambda: self._cambiar_estado_seleccion(self.sistema.cerrar_cuenta)
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Button(
+            frame_botones_cuentas,
+            text="Reactivar",
+            command=lambda: self._cambiar_estado_seleccion(self.sistema.reactivar_cuenta)
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
         # ===== LISTA DE CUENTAS =====
         frame_lista_cuentas = ttk.LabelFrame(frame_cuentas, text="Cuentas Registradas", padding="10")
         frame_lista_cuentas.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -162,11 +317,8 @@ class AplicacionBancaria:
         self.tree_cuentas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar_cuentas.grid(row=0, column=1, sticky=(tk.N, tk.S))
     
-    def _crear_pestaña_operaciones(self):
+    def _crear_pestaña_operaciones(self, frame_operaciones):
         """Crea la pestaña de operaciones bancarias."""
-        frame_operaciones = ttk.Frame(self.notebook, padding="10")
-        self.notebook.add(frame_operaciones, text="💰 Operaciones")
-        
         frame_operaciones.columnconfigure(0, weight=1)
         
         # ===== DEPÓSITO =====
@@ -247,7 +399,20 @@ class AplicacionBancaria:
             frame_consulta_input,
             text="Consultar Saldo",
             command=self._consultar_saldo
-        ).pack(side=tk.LEFT)
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.btn_cargar_mas = ttk.Button(
+            frame_consulta_input,
+            text="Cargar más",
+            command=self._cargar_mas_transacciones,
+            state=tk.DISABLED
+        )
+        self.btn_cargar_mas.pack(side=tk.LEFT)
+        
+        # Estado del extracto que se está mostrando por partes
+        self._consulta_cuenta = None
+        self._consulta_siguiente_id = None
+        self._consulta_generacion = 0
         
         # Área de resultado
         self.text_consulta = tk.Text(frame_consulta, height=10, width=80, wrap=tk.WORD)
@@ -257,11 +422,8 @@ class AplicacionBancaria:
         self.text_consulta.configure(yscrollcommand=scrollbar_consulta.set)
         scrollbar_consulta.grid(row=1, column=1, sticky=(tk.N, tk.S))
     
-    def _crear_pestaña_transacciones(self):
+    def _crear_pestaña_transacciones(self, frame_transacciones):
         """Crea la pestaña de historial de transacciones."""
-        frame_transacciones = ttk.Frame(self.notebook, padding="10")
-        self.notebook.add(frame_transacciones, text="📊 Transacciones")
-        
         frame_transacciones.columnconfigure(0, weight=1)
         frame_transacciones.rowconfigure(1, weight=1)
         
@@ -324,13 +486,10 @@ class AplicacionBancaria:
         self.tree_transacciones.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar_trans.grid(row=0, column=1, sticky=(tk.N, tk.S))
     
-    def _crear_pestaña_busqueda(self):
+    def _crear_pestaña_busqueda(self, frame_busqueda):
         """Crea la pestaña de búsqueda y estadísticas."""
-        frame_busqueda = ttk.Frame(self.notebook, padding="10")
-        self.notebook.add(frame_busqueda, text="🔍 Búsqueda")
-        
         frame_busqueda.columnconfigure(0, weight=1)
-        frame_busqueda.rowconfigure(1, weight=1)
+        frame_busqueda.rowconfigure(2, weight=1)
         
         # ===== BÚSQUEDA POR TITULAR =====
         frame_buscar = ttk.LabelFrame(frame_busqueda, text="Buscar Cuentas por Titular", padding="10")
@@ -352,9 +511,63 @@ class AplicacionBancaria:
             command=self._actualizar_lista_cuentas
         ).pack(side=tk.LEFT)
         
+        # ===== RANKING DE SALDOS =====
+        frame_ranking = ttk.LabelFrame(frame_busqueda, text="Ranking de Saldos", padding="10")
+        frame_ranking.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        
+        ttk.Label(frame_ranking, text="Tipo:").grid(row=0, column=0, sticky=tk.W)
+        self.combo_tipo_ranking = ttk.Combobox(
+            frame_ranking,
+            values=["Todos", "Ahorro", "Corriente", "Nómina"],
+            state="readonly",
+            width=12
+        )
+        self.combo_tipo_ranking.current(0)
+        self.combo_tipo_ranking.grid(row=0, column=1, sticky=tk.W, padx=(5, 15))
+        
+        ttk.Label(frame_ranking, text="Cantidad:").grid(row=0, column=2, sticky=tk.W)
+        self.entry_cantidad_ranking = ttk.Entry(frame_ranking, width=6)
+        self.entry_cantidad_ranking.insert(0, "10")
+        self.entry_cantidad_ranking.grid(row=0, column=3, sticky=tk.W, padx=(5, 15))
+        
+        ttk.Button(
+            frame_ranking,
+            text="Mayores Saldos",
+            command=lambda: self._mostrar_ranking(mayores=True)
+        ).grid(row=0, column=4, padx=(0, 5))
+        
+        ttk.Button(
+            frame_ranking,
+            text="Menores Saldos",
+            command=lambda: self._mostrar_ranking(mayores=False)
+        ).grid(row=0, column=5)
+        
+        ttk.Label(frame_ranking, text="Saldo entre:").grid(row=1, column=0, sticky=tk.W, pady=(10, 0))
+        self.entry_saldo_minimo = ttk.Entry(frame_ranking, width=12)
+        self.entry_saldo_minimo.grid(row=1, column=1, sticky=tk.W, padx=(5, 15), pady=(10, 0))
+        ttk.Label(frame_ranking, text="y:").grid(row=1, column=2, sticky=tk.W, pady=(10, 0))
+        self.entry_saldo_maximo = ttk.Entry(frame_ranking, width=12)
+        self.entry_saldo_maximo.grid(row=1, column=3, sticky=tk.W, padx=(5, 15), pady=(10, 0))
+        
+        ttk.Button(
+            frame_ranking,
+            text="Buscar por Rango",
+            command=self._buscar_por_rango_saldo
+        ).grid(row=1, column=4, padx=(0, 5), pady=(10, 0))
+        
+        ttk.Label(frame_ranking, text="Cuenta:").grid(row=2, column=0, sticky=tk.W, pady=(10, 0))
+        self.entry_cuenta_ranking = ttk.Entry(frame_ranking, width=12)
+        self.entry_cuenta_ranking.grid(row=2, column=1, sticky=tk.W, padx=(5, 15), pady=(10, 0))
+        
+        ttk.Button(
+            frame_ranking,
+            text="Ver Posición",
+            command=self._mostrar_posicion_saldo
+        ).grid(row=2, column=4, padx=(0, 5), pady=(10, 0))
+        
         # ===== ESTADÍSTICAS =====
         frame_estadisticas = ttk.LabelFrame(frame_busqueda, text="Estadísticas del Sistema", padding="10")
-        frame_estadisticas.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        frame_estadisticas.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         frame_estadisticas.columnconfigure(0, weight=1)
         frame_estadisticas.rowconfigure(0, weight=1)
         
@@ -370,7 +583,7 @@ class AplicacionBancaria:
             frame_busqueda,
             text="Actualizar Estadísticas",
             command=self._actualizar_estadisticas
-        ).grid(row=2, column=0, pady=(10, 0))
+        ).grid(row=3, column=0, pady=(10, 0))
         
         # Actualizar estadísticas iniciales
         self._actualizar_estadisticas()
@@ -387,8 +600,7 @@ class AplicacionBancaria:
             saldo_inicial = float(saldo_inicial_str)
             cuenta = self.sistema.crear_cuenta(titular, tipo_cuenta, saldo_inicial)
             
-            self._actualizar_lista_cuentas()
-            self._actualizar_estado()
+            self._procesar_eventos()
             
             # Limpiar campos
             self.entry_titular.delete(0, tk.END)
@@ -414,8 +626,7 @@ class AplicacionBancaria:
             
             transaccion = self.sistema.depositar(numero_cuenta, monto)
             
-            self._actualizar_lista_cuentas()
-            self._actualizar_estado()
+            self._procesar_eventos()
             
             # Limpiar campos
             self.entry_deposito_cuenta.delete(0, tk.END)
@@ -439,8 +650,7 @@ class AplicacionBancaria:
             
             transaccion = self.sistema.retirar(numero_cuenta, monto)
             
-            self._actualizar_lista_cuentas()
-            self._actualizar_estado()
+            self._procesar_eventos()
             
             # Limpiar campos
             self.entry_retiro_cuenta.delete(0, tk.END)
@@ -465,8 +675,7 @@ class AplicacionBancaria:
             
             trans_origen, trans_destino = self.sistema.transferir(cuenta_origen, cuenta_destino, monto)
             
-            self._actualizar_lista_cuentas()
-            self._actualizar_estado()
+            self._procesar_eventos()
             
             # Limpiar campos
             self.entry_trans_origen.delete(0, tk.END)
@@ -485,6 +694,24 @@ class AplicacionBancaria:
         except ValueError as e:
             messagebox.showerror("Error", str(e))
     
+    def _cambiar_estado_seleccion(self, operacion):
+        """Aplica una operación de ciclo de vida a la cuenta seleccionada."""
+        seleccion = self.tree_cuentas.selection()
+        if not seleccion:
+            messagebox.showerror("Error", "Seleccione una cuenta de la lista")
+            return
+        
+        try:
+            cuenta = operacion(int(seleccion[0]))
+            self._procesar_eventos()
+            messagebox.showinfo(
+                "Éxito",
+                f"Cuenta {cuenta['numero_cuenta']} actualizada\n\n"
+                f"Estado: {cuenta['estado']}"
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+    
     def _consultar_saldo(self):
         """Consulta el saldo y detalles de una cuenta."""
         try:
@@ -495,8 +722,7 @@ class AplicacionBancaria:
                 messagebox.showerror("Error", f"La cuenta {numero_cuenta} no existe")
                 return
             
-            # Obtener transacciones de la cuenta
-            transacciones = self.sistema.obtener_transacciones_cuenta(numero_cuenta)
+            total_transacciones = self.sistema.contar_transacciones_cuenta(numero_cuenta)
             
             # Mostrar información
             self.text_consulta.delete(1.0, tk.END)
@@ -514,29 +740,72 @@ Fecha de Apertura:   {cuenta['fecha_apertura']}
 Estado:              {cuenta['estado']}
 
 ═══════════════════════════════════════════════════════════════
-                    ÚLTIMAS TRANSACCIONES
+              ÚLTIMAS TRANSACCIONES (más recientes primero)
 ═══════════════════════════════════════════════════════════════
 
-Total de transacciones: {len(transacciones)}
+Total de transacciones: {total_transacciones}
 
 """
+            resumen_archivado = self.sistema.obtener_resumen_archivado(numero_cuenta)
+            if resumen_archivado:
+                info += (
+                    f"Historial archivado: {resumen_archivado['movimientos']} movimientos hasta "
+                    f"{resumen_archivado['ultima_fecha']} (saldo ${resumen_archivado['saldo_final']})\n\n"
+                )
             self.text_consulta.insert(1.0, info)
             
-            if transacciones:
-                for trans in transacciones[-10:]:  # Últimas 10 transacciones
-                    trans_info = f"""
+            # Invalidar cualquier extracto que se estuviera mostrando
+            self._consulta_generacion += 1
+            self._consulta_cuenta = numero_cuenta
+            self._consulta_siguiente_id = None
+            
+            if total_transacciones:
+                self._cargar_mas_transacciones()
+            else:
+                self.btn_cargar_mas.config(state=tk.DISABLED)
+                self.text_consulta.insert(tk.END, "\nNo hay transacciones registradas para esta cuenta.\n")
+            
+        except ValueError as e:
+            messagebox.showerror("Error", "Ingrese un número de cuenta válido")
+    
+    def _cargar_mas_transacciones(self):
+        """Solicita al sistema la siguiente página del extracto y la muestra por partes."""
+        if self._consulta_cuenta is None:
+            return
+        
+        pagina = self.sistema.obtener_pagina_transacciones_cuenta(
+            self._consulta_cuenta,
+            self.TAMANO_PAGINA_EXTRACTO,
+            self._consulta_siguiente_id
+        )
+        self._consulta_siguiente_id = pagina["siguiente_antes_de_id"]
+        self.btn_cargar_mas.config(state=tk.DISABLED)
+        self._mostrar_parte_extracto(pagina["transacciones"], 0, self._consulta_generacion)
+    
+    def _mostrar_parte_extracto(self, transacciones, inicio, generacion):
+        """Agrega un grupo de transacciones al extracto y programa el siguiente."""
+        if generacion != self._consulta_generacion:
+            return  # Se inició otra consulta mientras se mostraba esta
+        
+        fin = min(inicio + self.TRANSACCIONES_POR_CICLO, len(transacciones))
+        texto = "".join(
+            f"""
 [{trans['fecha']}]
 Tipo: {trans['tipo']}
 Monto: ${trans['monto']}
 Saldo anterior: ${trans['saldo_anterior']} → Saldo nuevo: ${trans['saldo_nuevo']}
 {'-' * 60}
 """
-                    self.text_consulta.insert(tk.END, trans_info)
-            else:
-                self.text_consulta.insert(tk.END, "\nNo hay transacciones registradas para esta cuenta.\n")
-            
-        except ValueError as e:
-            messagebox.showerror("Error", "Ingrese un número de cuenta válido")
+            for trans in transacciones[inicio:fin]
+        )
+        self.text_consulta.insert(tk.END, texto)
+        
+        if fin < len(transacciones):
+            self.ventana.after(1, self._mostrar_parte_extracto, transacciones, fin, generacion)
+        elif self._consulta_siguiente_id is not None:
+            self.btn_cargar_mas.config(state=tk.NORMAL)
+        else:
+            self.text_consulta.insert(tk.END, "\nNo hay transacciones más antiguas.\n")
     
     def _actualizar_lista_cuentas(self):
         """Actualiza la lista de cuentas en el Treeview."""
@@ -549,18 +818,83 @@ Saldo anterior: ${trans['saldo_anterior']} → Saldo nuevo: ${trans['saldo_nuevo
         
         # Insertar cuentas en el Treeview
         for cuenta in cuentas:
-            self.tree_cuentas.insert(
-                "",
-                tk.END,
-                values=(
-                    cuenta["numero_cuenta"],
-                    cuenta["titular"],
-                    cuenta["tipo_cuenta"],
-                    f"${cuenta['saldo']}",
-                    cuenta["fecha_apertura"],
-                    cuenta["estado"]
-                )
+            self._insertar_fila_cuenta(cuenta)
+        
+        self._lista_cuentas_completa = True
+    
+    def _insertar_fila_cuenta(self, cuenta):
+        """Inserta una cuenta en el Treeview usando su número como identificador."""
+        self.tree_cuentas.insert(
+            "",
+            tk.END,
+            iid=str(cuenta["numero_cuenta"]),
+            values=(
+                cuenta["numero_cuenta"],
+                cuenta["titular"],
+                cuenta["tipo_cuenta"],
+                f"${cuenta['saldo']}",
+                cuenta["fecha_apertura"],
+                cuenta["estado"]
             )
+        )
+    
+    def _insertar_fila_transaccion(self, trans):
+        """Inserta una transacción en el Treeview de transacciones."""
+        self.tree_transacciones.insert(
+            "",
+            tk.END,
+            values=(
+                trans["id"],
+                trans["numero_cuenta"],
+                trans["tipo"],
+                f"${trans['monto']}",
+                f"${trans['saldo_anterior']}",
+                f"${trans['saldo_nuevo']}",
+                trans["fecha"]
+            )
+        )
+    
+    def _procesar_eventos(self):
+        """Aplica a las vistas los cambios publicados por el sistema desde la última llamada."""
+        eventos = self.suscripcion.obtener()
+        
+        # Si la cola se desbordó no es posible aplicar los cambios de forma incremental
+        if self.suscripcion.reiniciar_perdidos() or self._resumen is None:
+            self._actualizar_lista_cuentas()
+            self._actualizar_estado()
+            if self._filtro_transacciones is not None:
+                self._mostrar_transacciones()
+            return
+        
+        transacciones_nuevas = []
+        for evento in eventos:
+            if isinstance(evento, EventoCuentaCreada):
+                self._resumen["total_cuentas"] += 1
+                self._resumen["cuentas_activas"] += 1
+                self._resumen["saldo_total_sistema"] += evento.saldo
+                if self._lista_cuentas_completa:
+                    self._insertar_fila_cuenta(self.sistema.buscar_cuenta(evento.numero_cuenta))
+            elif isinstance(evento, EventoMovimiento):
+                self._resumen["total_transacciones"] += 1
+                self._resumen["saldo_total_sistema"] += evento.delta
+                iid = str(evento.numero_cuenta)
+                if self.tree_cuentas.exists(iid):
+                    self.tree_cuentas.set(iid, "Saldo", f"${evento.saldo_nuevo}")
+                if self._filtro_transacciones in ("todas", evento.numero_cuenta):
+                    transacciones_nuevas.append(evento.id_transaccion)
+            elif isinstance(evento, EventoEstadoCambiado):
+                clave_anterior = self._CLAVES_ESTADO[evento.estado_anterior]
+                self._resumen[clave_anterior] -= 1
+                self._resumen[self._CLAVES_ESTADO[evento.estado_nuevo]] += 1
+                iid = str(evento.numero_cuenta)
+                if self.tree_cuentas.exists(iid):
+                    self.tree_cuentas.set(iid, "Estado", evento.estado_nuevo)
+        
+        if transacciones_nuevas:
+            for trans in self.sistema.obtener_transacciones_por_id(transacciones_nuevas):
+                self._insertar_fila_transaccion(trans)
+        
+        self._mostrar_resumen()
     
     def _mostrar_transacciones(self):
         """Muestra transacciones filtradas por cuenta."""
@@ -574,6 +908,7 @@ Saldo anterior: ${trans['saldo_anterior']} → Saldo nuevo: ${trans['saldo_nuevo
             numero_cuenta = int(cuenta_str)
             transacciones = self.sistema.obtener_transacciones_cuenta(numero_cuenta)
             self._actualizar_lista_transacciones(transacciones)
+            self._filtro_transacciones = numero_cuenta
         except ValueError:
             messagebox.showerror("Error", "Ingrese un número de cuenta válido")
     
@@ -582,6 +917,7 @@ Saldo anterior: ${trans['saldo_anterior']} → Saldo nuevo: ${trans['saldo_nuevo
         self.entry_filtro_cuenta.delete(0, tk.END)
         transacciones = self.sistema.obtener_todas_transacciones()
         self._actualizar_lista_transacciones(transacciones)
+        self._filtro_transacciones = "todas"
     
     def _actualizar_lista_transacciones(self, transacciones=None):
         """Actualiza la lista de transacciones en el Treeview."""
@@ -594,19 +930,7 @@ Saldo anterior: ${trans['saldo_anterior']} → Saldo nuevo: ${trans['saldo_nuevo
         
         # Insertar transacciones en el Treeview
         for trans in transacciones:
-            self.tree_transacciones.insert(
-                "",
-                tk.END,
-                values=(
-                    trans["id"],
-                    trans["numero_cuenta"],
-                    trans["tipo"],
-                    f"${trans['monto']}",
-                    f"${trans['saldo_anterior']}",
-                    f"${trans['saldo_nuevo']}",
-                    trans["fecha"]
-                )
-            )
+            self._insertar_fila_transaccion(trans)
     
     def _buscar_por_titular(self):
         """Busca cuentas por nombre del titular."""
@@ -619,22 +943,72 @@ Saldo anterior: ${trans['saldo_anterior']} → Saldo nuevo: ${trans['saldo_nuevo
         
         # Insertar resultados
         for cuenta in cuentas:
-            self.tree_cuentas.insert(
-                "",
-                tk.END,
-                values=(
-                    cuenta["numero_cuenta"],
-                    cuenta["titular"],
-                    cuenta["tipo_cuenta"],
-                    f"${cuenta['saldo']}",
-                    cuenta["fecha_apertura"],
-                    cuenta["estado"]
-                )
-            )
+            self._insertar_fila_cuenta(cuenta)
+        self._lista_cuentas_completa = not nombre.strip()
         
         # Cambiar a la pestaña de cuentas
         self.notebook.select(0)
     
+    def _tipo_ranking(self):
+        """Retorna el tipo de cuenta elegido para el ranking o None para todos."""
+        tipo = self.combo_tipo_ranking.get()
+        return None if tipo == "Todos" else tipo
+    
+    def _mostrar_cuentas_encontradas(self, cuentas):
+        """Muestra un conjunto de cuentas en la lista de la pestaña de cuentas."""
+        for item in self.tree_cuentas.get_children():
+            self.tree_cuentas.delete(item)
+        
+        for cuenta in cuentas:
+            self._insertar_fila_cuenta(cuenta)
+        self._lista_cuentas_completa = False
+        
+        self.notebook.select(0)
+    
+    def _mostrar_ranking(self, mayores=True):
+        """Muestra las cuentas con mayor o menor saldo."""
+        try:
+            cantidad = int(self.entry_cantidad_ranking.get())
+        except ValueError:
+            messagebox.showerror("Error", "Ingrese una cantidad válida")
+            return
+        
+        if mayores:
+            cuentas = self.sistema.cuentas_mayor_saldo(cantidad, self._tipo_ranking())
+        else:
+            cuentas = self.sistema.cuentas_menor_saldo(cantidad, self._tipo_ranking())
+        self._mostrar_cuentas_encontradas(cuentas)
+    
+    def _buscar_por_rango_saldo(self):
+        """Muestra las cuentas con saldo dentro del rango indicado."""
+        try:
+            saldo_minimo = float(self.entry_saldo_minimo.get())
+            saldo_maximo = float(self.entry_saldo_maximo.get())
+        except ValueError:
+            messagebox.showerror("Error", "Ingrese saldos válidos")
+            return
+        
+        cuentas = self.sistema.cuentas_en_rango_saldo(
+            saldo_minimo, saldo_maximo, self._tipo_ranking(), limite=self.LIMITE_RANGO_SALDOS
+        )
+        self._mostrar_cuentas_encontradas(cuentas)
+    
+    def _mostrar_posicion_saldo(self):
+        """Muestra la posición de una cuenta en el ranking de saldos."""
+        try:
+            numero_cuenta = int(self.entry_cuenta_ranking.get())
+            posicion = self.sistema.posicion_saldo(numero_cuenta, self._tipo_ranking())
+        except ValueError as e:
+            mensaje = str(e) if self.entry_cuenta_ranking.get().strip().isdigit() else "Ingrese un número de cuenta válido"
+            messagebox.showerror("Error", mensaje)
+            return
+        
+        messagebox.showinfo(
+            "Posición en el Ranking",
+            f"La cuenta {numero_cuenta} (saldo ${posicion['saldo']}) ocupa el puesto "
+            f"{posicion['posicion']} de {posicion['total']}"
+        )
+    
     def _actualizar_estadisticas(self):
         """Actualiza las estadísticas del sistema."""
         stats = self.sistema.obtener_estadisticas()
@@ -651,6 +1025,8 @@ Saldo anterior: ${trans['saldo_anterior']} → Saldo nuevo: ${trans['saldo_nuevo
 
 Total de Cuentas:              {stats['total_cuentas']}
 Cuentas Activas:               {stats['cuentas_activas']}
+Cuentas Bloqueadas:            {stats['cuentas_bloqueadas']}
+Cuentas Cerradas:              {stats['cuentas_cerradas']}
 Total de Transacciones:        {stats['total_transacciones']}
 Saldo Total en el Sistema:     ${stats['saldo_total_sistema']}
 
@@ -659,38 +1035,58 @@ Saldo Total en el Sistema:     ${stats['saldo_total_sistema']}
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
         
-        # Contar por tipo de cuenta
-        cuentas = self.sistema.obtener_todas_cuentas()
-        tipos = {}
-        for cuenta in cuentas:
-            tipo = cuenta['tipo_cuenta']
-            if tipo not in tipos:
-                tipos[tipo] = {'cantidad': 0, 'saldo_total': 0}
-            tipos[tipo]['cantidad'] += 1
-            tipos[tipo]['saldo_total'] += cuenta['saldo']
-        
-        for tipo, datos in tipos.items():
+        # Los totales por tipo se calculan sobre las columnas del almacén
+        for tipo, datos in self.sistema.obtener_totales_por_tipo().items():
             estadisticas_texto += f"\n{tipo}:\n"
             estadisticas_texto += f"  • Cantidad: {datos['cantidad']}\n"
             estadisticas_texto += f"  • Saldo total: ${datos['saldo_total']}\n"
         
-        if cuentas:
-            saldos = [float(c['saldo']) for c in cuentas]
+        if stats['total_cuentas']:
+            # El máximo y el mínimo salen del índice ordenado de saldos
+            maxima = self.sistema.cuentas_mayor_saldo(1)[0]
+            minima = self.sistema.cuentas_menor_saldo(1)[0]
+            promedio = stats['saldo_total_sistema'] / stats['total_cuentas']
             estadisticas_texto += f"""
 
 📈 ANÁLISIS DE SALDOS
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-Saldo Promedio:                ${sum(saldos) / len(saldos):.2f}
-Saldo Máximo:                  ${max(saldos):.2f}
-Saldo Mínimo:                  ${min(saldos):.2f}
+Saldo Promedio:                ${promedio:.2f}
+Saldo Máximo:                  ${maxima['saldo']} (cuenta {maxima['numero_cuenta']})
+Saldo Mínimo:                  ${minima['saldo']} (cuenta {minima['numero_cuenta']})
 """
         
+        # Volumen de los últimos días leído de los agregados por tiempo
+        volumen = self.sistema.obtener_volumen("dia")[-self.DIAS_VOLUMEN:]
+        if volumen:
+            estadisticas_texto += """
+
+📅 VOLUMEN DE OPERACIONES POR DÍA
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+            for dia in volumen:
+                entradas = sum(
+                    datos['monto'] for codigo, datos in dia['por_operacion'].items() if SIGNO_OPERACION[codigo] > 0
+                )
+                salidas = sum(
+                    datos['monto'] for codigo, datos in dia['por_operacion'].items() if SIGNO_OPERACION[codigo] < 0
+                )
+                estadisticas_texto += (
+                    f"\n{dia['periodo']}:  {dia['cantidad']} operaciones | "
+                    f"Entradas: ${entradas} | Salidas: ${salidas}"
+                )
+        
         self.text_estadisticas.insert(1.0, estadisticas_texto)
     
     def _actualizar_estado(self):
         """Actualiza la barra de estado."""
-        stats = self.sistema.obtener_estadisticas()
+        self._resumen = self.sistema.obtener_estadisticas()
+        self.suscripcion.obtener()  # El resumen recién calculado ya incluye los eventos pendientes
+        self._mostrar_resumen()
+    
+    def _mostrar_resumen(self):
+        """Muestra en la barra de estado el resumen mantenido por eventos."""
+        stats = self._resumen
         self.label_estado.config(
             text=f"Sistema Activo | Cuentas: {stats['total_cuentas']} | "
                  f"Transacciones: {stats['total_transacciones']} | "
@@ -1,18 +1,96 @@
 """
 Punto de entrada principal del Sistema de Gestión Bancaria.
 Importa la GUI y la inicia.
+
+Uso:
+    python main.py                        # Interfaz gráfica
+    python main.py --sin-interfaz         # Uso no interactivo (no importa Tkinter)
+    python main.py --medir-arranque 100000  # Compara el tiempo de arranque de la interfaz
+    python main.py --trazar traza.json    # Guarda una traza de rendimiento al cerrar
 """
 
-import tkinter as tk
+import argparse
 import os
-from gui import AplicacionBancaria
+import time
+
+
+def crear_sistema(cuentas_de_prueba=0):
+    """
+    Crea un SistemaBancario importando únicamente la capa de operaciones.
+    Opcionalmente lo puebla con cuentas de prueba.
+    """
+    from operations.sistema import SistemaBancario
+
+    sistema = SistemaBancario()
+    for i in range(cuentas_de_prueba):
+        sistema.crear_cuenta(f"Cliente {i + 1}", "Ahorro", 100 + i % 1000)
+    return sistema
+
+
+def main_sin_interfaz(cuentas_de_prueba=0):
+    """Inicia el sistema sin interfaz gráfica y muestra sus estadísticas."""
+    sistema = crear_sistema(cuentas_de_prueba)
+    stats = sistema.obtener_estadisticas()
+    print(f"Sistema Activo | Cuentas: {stats['total_cuentas']} | "
+          f"Transacciones: {stats['total_transacciones']} | "
+          f"Saldo Total: ${stats['saldo_total_sistema']}")
+    return sistema
+
+
+def medir_arranque(cuentas_de_prueba):
+    """
+    Mide el tiempo hasta que la ventana se muestra, con carga diferida y sin ella,
+    sobre un sistema con la cantidad de cuentas indicada.
+    """
+    import tkinter as tk
+    from gui import AplicacionBancaria
+
+    sistema = crear_sistema(cuentas_de_prueba)
+    print(f"Cuentas cargadas: {cuentas_de_prueba}")
+
+    for carga_diferida in (False, True):
+        ventana = tk.Tk()
+        visible = []
+        ventana.bind("<Map>", lambda evento: visible or visible.append(time.perf_counter()), add="+")
+
+        inicio = time.perf_counter()
+        AplicacionBancaria(ventana, sistema, carga_diferida=carga_diferida)
+        ventana.update()  # Procesa los eventos pendientes, incluida la carga diferida
+        fin = time.perf_counter()
+        ventana.destroy()
+
+        modo = "diferida" if carga_diferida else "inmediata"
+        print(f"  Carga {modo:<10} ventana visible en {(visible[0] - inicio) * 1000:8.1f} ms | "
+              f"eventos procesados en {(fin - inicio) * 1000:8.1f} ms")
 
 
 def main():
     """Función principal que inicia la aplicación bancaria."""
+    parser = argparse.ArgumentParser(description="Sistema de Gestión Bancaria")
+    parser.add_argument("--sin-interfaz", action="store_true",
+                        help="Inicia el sistema sin importar la interfaz gráfica")
+    parser.add_argument("--medir-arranque", type=int, metavar="CUENTAS",
+                        help="Mide el tiempo de arranque de la interfaz con CUENTAS cuentas")
+    parser.add_argument("--trazar", metavar="RUTA",
+                        help="Mide las acciones de la interfaz y guarda la traza en RUTA al cerrar")
+    parser.add_argument("--umbral-lento", type=float, default=200, metavar="MS",
+                        help="Duración en ms a partir de la cual se advierte una acción lenta")
+    args = parser.parse_args()
+
+    if args.sin_interfaz:
+        main_sin_interfaz()
+        return
+
+    if args.medir_arranque is not None:
+        medir_arranque(args.medir_arranque)
+        return
+
+    import tkinter as tk
+    from gui import AplicacionBancaria
+
     # Crear la ventana principal de Tkinter
     ventana_principal = tk.Tk()
-    
+
     # Establecer el ícono de la ventana
     try:
         # Usar una ruta absoluta para mayor robustez
@@ -21,13 +99,24 @@ def main():
     except tk.TclError:
         # Manejar el error si el archivo no se encuentra o no es válido
         print("Advertencia: No se pudo cargar el ícono 'bank_icon.ico'.")
-    
+
+    trazador = None
+    if args.trazar:
+        from operations.trazas import Trazador
+        trazador = Trazador(umbral_lento_ms=args.umbral_lento)
+
     # Crear la instancia de la aplicación
-    app = AplicacionBancaria(ventana_principal)
-    
+    app = AplicacionBancaria(ventana_principal, trazador=trazador)
+
     # Iniciar el loop de la aplicación
     app.iniciar()
 
+    if trazador is not None:
+        trazador.restaurar()
+        trazador.guardar(args.trazar)
+        print(f"Traza guardada en {args.trazar} ({len(trazador.eventos)} intervalos, "
+              f"{trazador.acciones_lentas} acciones lentas)")
+
 
 if __name__ == "__main__":
     main()
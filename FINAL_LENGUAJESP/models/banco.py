@@ -3,23 +3,113 @@ Módulo de modelos de datos para el Sistema Bancario.
 Define las estructuras de datos (cuentas y transacciones).
 """
 
+import sys
+from array import array
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
+from enum import IntEnum
 
 # Constantes para tipos de cuenta
 TIPOS_CUENTA = ["Ahorro", "Corriente", "Nómina"]
 
+# Constantes para estados de cuenta
+ESTADO_ACTIVA = "Activa"
+ESTADO_BLOQUEADA = "Bloqueada"
+ESTADO_CERRADA = "Cerrada"
+ESTADOS_CUENTA = [ESTADO_ACTIVA, ESTADO_BLOQUEADA, ESTADO_CERRADA]
+
+
+class CodigoOperacion(IntEnum):
+    """Código tipado de la operación que originó un asiento contable."""
+    APERTURA = 1
+    DEPOSITO = 2
+    RETIRO = 3
+    TRANSFERENCIA_SALIDA = 4
+    TRANSFERENCIA_ENTRADA = 5
+    INTERES = 6
+    COMISION = 7
+
+
+# Signo con el que cada operación afecta el saldo de la cuenta
+SIGNO_OPERACION = {
+    CodigoOperacion.APERTURA: 1,
+    CodigoOperacion.DEPOSITO: 1,
+    CodigoOperacion.RETIRO: -1,
+    CodigoOperacion.TRANSFERENCIA_SALIDA: -1,
+    CodigoOperacion.TRANSFERENCIA_ENTRADA: 1,
+    CodigoOperacion.INTERES: 1,
+    CodigoOperacion.COMISION: -1
+}
+
+# Cuenta interna del banco que recibe la contrapartida de las operaciones externas;
+# las transferencias se compensan entre las dos cuentas de clientes del asiento
+CONTRAPARTIDA_OPERACION = {
+    CodigoOperacion.APERTURA: "Caja",
+    CodigoOperacion.DEPOSITO: "Caja",
+    CodigoOperacion.RETIRO: "Caja",
+    CodigoOperacion.INTERES: "Gasto por Intereses",
+    CodigoOperacion.COMISION: "Ingreso por Comisiones"
+}
+
+# Descripción mostrada para cada operación
+DESCRIPCION_OPERACION = {
+    CodigoOperacion.APERTURA: "Depósito Inicial",
+    CodigoOperacion.DEPOSITO: "Depósito",
+    CodigoOperacion.RETIRO: "Retiro",
+    CodigoOperacion.TRANSFERENCIA_SALIDA: "Transferencia a {}",
+    CodigoOperacion.TRANSFERENCIA_ENTRADA: "Transferencia desde {}",
+    CodigoOperacion.INTERES: "Abono de Intereses",
+    CodigoOperacion.COMISION: "Comisión de Mantenimiento"
+}
+
 class Cuenta:
-    """Modelo de datos para una cuenta bancaria."""
-    
-    def __init__(self, numero_cuenta, titular, tipo_cuenta, saldo_inicial):
-        self.numero_cuenta = numero_cuenta
-        self.titular = titular
-        self.tipo_cuenta = tipo_cuenta
-        self.saldo = Decimal(str(saldo_inicial)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        self.fecha_apertura = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.estado = "Activa"
-    
+    """
+    Vista de una cuenta bancaria guardada en un AlmacenCuentas.
+    Los atributos se leen y escriben directamente en las columnas del almacén.
+    """
+
+    __slots__ = ("_almacen", "_indice")
+
+    def __init__(self, almacen, indice):
+        self._almacen = almacen
+        self._indice = indice
+
+    @property
+    def numero_cuenta(self):
+        return self._almacen.primer_numero + self._indice
+
+    @property
+    def titular(self):
+        return self._almacen.titulares[self._indice]
+
+    @property
+    def tipo_cuenta(self):
+        return self._almacen.nombres_tipo[self._almacen.tipos[self._indice]]
+
+    @property
+    def saldo(self):
+        return Decimal(self._almacen.saldos[self._indice]).scaleb(-2)
+
+    @saldo.setter
+    def saldo(self, valor):
+        self._almacen.saldos[self._indice] = a_centavos(valor)
+
+    @property
+    def saldo_centavos(self):
+        return self._almacen.saldos[self._indice]
+
+    @property
+    def fecha_apertura(self):
+        return self._almacen.fechas_apertura[self._indice]
+
+    @property
+    def estado(self):
+        return ESTADOS_CUENTA[self._almacen.estados[self._indice]]
+
+    @estado.setter
+    def estado(self, valor):
+        self._almacen.estados[self._indice] = ESTADOS_CUENTA.index(valor)
+
     def to_dict(self):
         """Retorna la cuenta como un diccionario."""
         return {
@@ -31,23 +121,162 @@ class Cuenta:
             "estado": self.estado
         }
 
+
+class AlmacenCuentas:
+    """
+    Almacén denso de cuentas con números consecutivos.
+    Cada atributo es una columna indexada por numero_cuenta - primer_numero:
+    saldos en centavos, códigos de tipo y de estado, y titulares y fechas
+    compartidos entre cuentas iguales. Se consulta como un diccionario de
+    numero_cuenta a Cuenta.
+    """
+
+    def __init__(self, primer_numero=1000001):
+        self.primer_numero = primer_numero
+        self.saldos = array("q")
+        self.tipos = array("B")
+        self.estados = array("B")
+        self.titulares = []
+        self.fechas_apertura = []
+        self.nombres_tipo = list(TIPOS_CUENTA)
+        self._codigos_tipo = {nombre: codigo for codigo, nombre in enumerate(self.nombres_tipo)}
+        self.al_agregar_tipo = None  # Función llamada con el nombre de cada tipo de cuenta nuevo
+
+    def agregar(self, titular, tipo_cuenta, saldo_centavos=0, fecha_apertura=None, estado=ESTADO_ACTIVA):
+        """
+        Agrega una cuenta con el siguiente número y retorna su vista.
+        """
+        codigo_tipo = self._codigos_tipo.get(tipo_cuenta)
+        if codigo_tipo is None:
+            codigo_tipo = self._codigos_tipo[tipo_cuenta] = len(self.nombres_tipo)
+            self.nombres_tipo.append(tipo_cuenta)
+            if self.al_agregar_tipo is not None:
+                self.al_agregar_tipo(tipo_cuenta)
+
+        fecha_apertura = fecha_apertura or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if self.fechas_apertura and self.fechas_apertura[-1] == fecha_apertura:
+            fecha_apertura = self.fechas_apertura[-1]  # Cuentas abiertas en el mismo segundo comparten la cadena
+
+        self.saldos.append(saldo_centavos)
+        self.tipos.append(codigo_tipo)
+        self.estados.append(ESTADOS_CUENTA.index(estado))
+        self.titulares.append(sys.intern(titular))
+        self.fechas_apertura.append(fecha_apertura)
+        return Cuenta(self, len(self.saldos) - 1)
+
+    def codigo_tipo(self, tipo_cuenta):
+        """Retorna el código de un tipo de cuenta o None si no hay cuentas de ese tipo."""
+        return self._codigos_tipo.get(tipo_cuenta)
+
+    def indice(self, numero_cuenta):
+        """Retorna la posición de una cuenta o -1 si no existe."""
+        indice = numero_cuenta - self.primer_numero
+        return indice if 0 <= indice < len(self.saldos) else -1
+
+    def get(self, numero_cuenta, predeterminado=None):
+        """Retorna la vista de la cuenta o el valor predeterminado si no existe."""
+        if not isinstance(numero_cuenta, int):
+            return predeterminado
+        indice = numero_cuenta - self.primer_numero
+        if 0 <= indice < len(self.saldos):
+            return Cuenta(self, indice)
+        return predeterminado
+
+    def __getitem__(self, numero_cuenta):
+        cuenta_obj = self.get(numero_cuenta)
+        if cuenta_obj is None:
+            raise KeyError(numero_cuenta)
+        return cuenta_obj
+
+    def __contains__(self, numero_cuenta):
+        return self.get(numero_cuenta) is not None
+
+    def __len__(self):
+        return len(self.saldos)
+
+    def __iter__(self):
+        return iter(range(self.primer_numero, self.primer_numero + len(self.saldos)))
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        return (Cuenta(self, indice) for indice in range(len(self.saldos)))
+
+    def items(self):
+        return ((self.primer_numero + indice, Cuenta(self, indice)) for indice in range(len(self.saldos)))
+
+
+def a_centavos(valor):
+    """Convierte un importe a centavos enteros con redondeo al centavo más cercano."""
+    if isinstance(valor, int):
+        return valor * 100
+    return int((Decimal(str(valor)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def a_decimal(centavos):
+    """Convierte un importe en centavos enteros a Decimal con dos decimales."""
+    return Decimal(centavos).scaleb(-2)
+
+
 class Transaccion:
-    """Modelo de datos para una transacción bancaria."""
+    """
+    Modelo de datos para un apunte (posting) de un asiento contable.
+    Los apuntes de un mismo asiento comparten id_asiento; la descripción
+    (tipo) se deriva del código de operación.
+    """
+    
+    __slots__ = ("id", "numero_cuenta", "codigo", "monto", "saldo_anterior", "saldo_nuevo",
+                 "fecha", "id_asiento", "contraparte")
     
-    def __init__(self, id_transaccion, numero_cuenta, tipo, monto, saldo_nuevo, saldo_anterior=None):
+    def __init__(self, id_transaccion, numero_cuenta, codigo, monto, saldo_nuevo, saldo_anterior=None,
+                 fecha=None, id_asiento=None, contraparte=None):
         self.id = id_transaccion
         self.numero_cuenta = numero_cuenta
-        self.tipo = tipo
+        self.codigo = CodigoOperacion(codigo)
         self.monto = Decimal(str(monto)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
         self.saldo_anterior = saldo_anterior if saldo_anterior is not None else saldo_nuevo
         self.saldo_nuevo = saldo_nuevo
-        self.fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.fecha = fecha or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.id_asiento = id_asiento if id_asiento is not None else id_transaccion
+        self.contraparte = contraparte
+    
+    @classmethod
+    def desde_valores(cls, id_transaccion, numero_cuenta, codigo, monto, saldo_nuevo, saldo_anterior,
+                      fecha, id_asiento, contraparte):
+        """
+        Crea un apunte a partir de valores ya validados (código tipado e importes
+        Decimal con dos decimales), sin conversiones.
+        """
+        transaccion = cls.__new__(cls)
+        transaccion.id = id_transaccion
+        transaccion.numero_cuenta = numero_cuenta
+        transaccion.codigo = codigo
+        transaccion.monto = monto
+        transaccion.saldo_anterior = saldo_anterior
+        transaccion.saldo_nuevo = saldo_nuevo
+        transaccion.fecha = fecha
+        transaccion.id_asiento = id_asiento
+        transaccion.contraparte = contraparte
+        return transaccion
+    
+    @property
+    def tipo(self):
+        """Descripción de la operación."""
+        return DESCRIPCION_OPERACION[self.codigo].format(self.contraparte)
+    
+    @property
+    def importe(self):
+        """Monto con el signo con que afecta el saldo de la cuenta."""
+        return self.monto * SIGNO_OPERACION[self.codigo]
     
     def to_dict(self):
         """Retorna la transacción como un diccionario."""
         return {
             "id": self.id,
+            "id_asiento": self.id_asiento,
             "numero_cuenta": self.numero_cuenta,
+            "codigo": int(self.codigo),
             "tipo": self.tipo,
             "monto": self.monto,
             "saldo_anterior": self.saldo_anterior,
@@ -0,0 +1,137 @@
+"""
+Módulo de agregados por tiempo para el Sistema de Gestión Bancaria.
+Acumula, al registrar cada apunte, la cantidad y el monto por tipo de operación
+en cubetas por minuto, hora y día, para que los gráficos y tableros lean datos
+ya agregados sin recorrer el historial.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+
+from models.banco import CodigoOperacion, a_decimal
+
+# Cada resolución agrupa por un prefijo de la fecha "%Y-%m-%d %H:%M:%S"
+RESOLUCIONES = ("minuto", "hora", "dia")
+_LONGITUDES = {"minuto": 16, "hora": 13, "dia": 10}
+_FORMATOS = {"minuto": "%Y-%m-%d %H:%M", "hora": "%Y-%m-%d %H", "dia": "%Y-%m-%d"}
+
+# Antigüedad a partir de la cual se descartan las cubetas de cada resolución;
+# sus totales siguen disponibles en las resoluciones más gruesas
+RETENCION_POR_DEFECTO = {
+    "minuto": timedelta(days=1),
+    "hora": timedelta(days=90),
+    "dia": None
+}
+
+# Cada cubeta es una lista plana [cantidad, centavos] por código de operación
+_TAMANO_CUBETA = 2 * (max(CodigoOperacion) + 1)
+
+
+class AgregadosTiempo:
+    """
+    Totales de operaciones por intervalo de tiempo.
+    Las tres resoluciones se actualizan a la vez; al abrir una cubeta nueva se
+    descartan las que superan la retención de su resolución.
+    """
+
+    def __init__(self, retencion=None):
+        """
+        Inicializa los agregados.
+
+        Args:
+            retencion: Diccionario resolución -> timedelta (o None para no descartar)
+                que reemplaza los valores de RETENCION_POR_DEFECTO
+        """
+        self.retencion = dict(RETENCION_POR_DEFECTO)
+        self.retencion.update(retencion or {})
+        self._cubetas = {resolucion: {} for resolucion in RESOLUCIONES}  # periodo -> cubeta
+        self._periodos = {resolucion: [] for resolucion in RESOLUCIONES}  # periodos en orden
+
+    def registrar(self, fecha, codigo, monto_centavos):
+        """Suma una operación a las cubetas de la fecha indicada."""
+        posicion = 2 * codigo
+        for resolucion in RESOLUCIONES:
+            periodo = fecha[:_LONGITUDES[resolucion]]
+            cubeta = self._cubetas[resolucion].get(periodo)
+            if cubeta is None:
+                cubeta = self._abrir_cubeta(resolucion, periodo)
+            cubeta[posicion] += 1
+            cubeta[posicion + 1] += monto_centavos
+
+    def registrar_totales(self, fecha, totales):
+        """
+        Suma de una vez las operaciones de un lote con la misma fecha.
+        totales es un diccionario codigo -> (cantidad, centavos).
+        """
+        for resolucion in RESOLUCIONES:
+            periodo = fecha[:_LONGITUDES[resolucion]]
+            cubeta = self._cubetas[resolucion].get(periodo)
+            if cubeta is None:
+                cubeta = self._abrir_cubeta(resolucion, periodo)
+            for codigo, (cantidad, centavos) in totales.items():
+                cubeta[2 * codigo] += cantidad
+                cubeta[2 * codigo + 1] += centavos
+
+    def serie(self, resolucion="hora", desde=None, hasta=None):
+        """
+        Retorna en orden los periodos de una resolución entre dos fechas (incluidas),
+        cada uno con su cantidad total y el detalle por operación.
+        """
+        longitud = _LONGITUDES[resolucion]
+        periodos = self._periodos[resolucion]
+        inicio = bisect_left(periodos, desde[:longitud]) if desde else 0
+        fin = bisect_right(periodos, hasta[:longitud]) if hasta else len(periodos)
+        cubetas = self._cubetas[resolucion]
+        return [_periodo_a_dict(periodo, cubetas[periodo]) for periodo in periodos[inicio:fin]]
+
+    def periodo(self, resolucion, fecha):
+        """Retorna los totales del periodo que contiene la fecha, o None si no hubo operaciones."""
+        periodo = fecha[:_LONGITUDES[resolucion]]
+        cubeta = self._cubetas[resolucion].get(periodo)
+        return _periodo_a_dict(periodo, cubeta) if cubeta is not None else None
+
+    def exportar(self):
+        """Retorna las cubetas como un diccionario serializable en JSON."""
+        return {resolucion: dict(cubetas) for resolucion, cubetas in self._cubetas.items()}
+
+    def importar(self, datos):
+        """Reemplaza las cubetas por las exportadas con exportar()."""
+        for resolucion in RESOLUCIONES:
+            cubetas = {periodo: list(cubeta) for periodo, cubeta in datos.get(resolucion, {}).items()}
+            self._cubetas[resolucion] = cubetas
+            self._periodos[resolucion] = sorted(cubetas)
+
+    def _abrir_cubeta(self, resolucion, periodo):
+        """Crea la cubeta de un periodo nuevo y descarta las que quedaron fuera de la retención."""
+        cubetas = self._cubetas[resolucion]
+        cubeta = cubetas[periodo] = [0] * _TAMANO_CUBETA
+
+        periodos = self._periodos[resolucion]
+        if not periodos or periodo > periodos[-1]:
+            periodos.append(periodo)
+        else:
+            insort(periodos, periodo)  # Fecha fuera de orden, por ejemplo de un registro replicado
+
+        retencion = self.retencion[resolucion]
+        if retencion is not None:
+            formato = _FORMATOS[resolucion]
+            limite = (datetime.strptime(periodos[-1], formato) - retencion).strftime(formato)
+            corte = bisect_left(periodos, limite)
+            for vencido in periodos[:corte]:
+                del cubetas[vencido]
+            del periodos[:corte]
+        return cubeta
+
+
+def _periodo_a_dict(periodo, cubeta):
+    """Convierte una cubeta en un diccionario con los montos en Decimal."""
+    por_operacion = {}
+    for codigo in CodigoOperacion:
+        cantidad = cubeta[2 * codigo]
+        if cantidad:
+            por_operacion[codigo] = {"cantidad": cantidad, "monto": a_decimal(cubeta[2 * codigo + 1])}
+    return {
+        "periodo": periodo,
+        "cantidad": sum(datos["cantidad"] for datos in por_operacion.values()),
+        "por_operacion": por_operacion
+    }
@@ -0,0 +1,163 @@
+"""
+Módulo de archivo del libro contable para el Sistema de Gestión Bancaria.
+Compacta las transacciones anteriores al horizonte de retención en segmentos
+comprimidos y permite consultarlos bajo demanda.
+"""
+
+import gzip
+import json
+import os
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from models.banco import CodigoOperacion
+
+# Campos de la transacción que se guardan como texto y se leen como Decimal
+_CAMPOS_DECIMALES = ("monto", "saldo_anterior", "saldo_nuevo")
+
+# Sufijo del archivo en que se escribe un segmento antes de renombrarlo a su nombre final
+_SUFIJO_TEMPORAL = ".tmp"
+
+
+class SegmentoArchivado:
+    """Archivo comprimido con un rango consecutivo de transacciones."""
+
+    __slots__ = ("ruta", "primer_id", "ultimo_id", "cantidad", "cuentas")
+
+    def __init__(self, ruta, primer_id, ultimo_id, cantidad, cuentas):
+        self.ruta = ruta
+        self.primer_id = primer_id
+        self.ultimo_id = ultimo_id
+        self.cantidad = cantidad
+        self.cuentas = cuentas  # Cuentas con apuntes en el segmento; None si se desconocen
+
+    def leer(self):
+        """
+        Lee de forma incremental las transacciones del segmento como diccionarios.
+        """
+        with gzip.open(self.ruta, "rt", encoding="utf-8") as archivo:
+            for linea in archivo:
+                transaccion = json.loads(linea)
+                for campo in _CAMPOS_DECIMALES:
+                    transaccion[campo] = Decimal(transaccion[campo])
+                yield transaccion
+
+    def to_dict(self):
+        """Retorna el segmento como un diccionario."""
+        return {
+            "ruta": self.ruta,
+            "primer_id": self.primer_id,
+            "ultimo_id": self.ultimo_id,
+            "cantidad": self.cantidad
+        }
+
+
+class CompactadorLibro:
+    """Archiva el historial antiguo de un SistemaBancario en segmentos comprimidos."""
+
+    def __init__(self, sistema, directorio, retencion_dias=365):
+        """
+        Inicializa el compactador.
+
+        Args:
+            sistema: SistemaBancario cuyo historial se compacta
+            directorio: Carpeta donde se escriben los segmentos
+            retencion_dias: Antigüedad a partir de la cual las transacciones se archivan
+        """
+        if retencion_dias < 0:
+            raise ValueError("La retención no puede ser negativa")
+
+        self.sistema = sistema
+        self.directorio = directorio
+        self.retencion_dias = retencion_dias
+        self.segmentos = []
+
+        os.makedirs(directorio, exist_ok=True)
+        self._cargar_segmentos_existentes()
+
+    def compactar(self, ahora=None):
+        """
+        Archiva en un nuevo segmento las transacciones anteriores al horizonte de
+        retención y las reemplaza en memoria por el resumen de cada cuenta.
+        Retorna el segmento creado o None si no había nada que archivar.
+        """
+        ahora = ahora or datetime.now()
+        fecha_limite = (ahora - timedelta(days=self.retencion_dias)).strftime("%Y-%m-%d %H:%M:%S")
+
+        transacciones = self.sistema.transacciones
+        corte = bisect_left(transacciones, fecha_limite, key=lambda trans: trans.fecha)
+
+        # Un asiento de transferencia no se separa entre el archivo y la memoria
+        while corte > 0 and transacciones[corte - 1].codigo == CodigoOperacion.TRANSFERENCIA_SALIDA:
+            corte -= 1
+        if corte == 0:
+            return None
+
+        primer_id = transacciones[0].id
+        ultimo_id = transacciones[corte - 1].id
+        ruta = os.path.join(self.directorio, f"segmento_{primer_id:012d}_{ultimo_id:012d}.jsonl.gz")
+
+        # El segmento se escribe completo en un archivo temporal y se renombra antes de
+        # quitar nada de la memoria: una interrupción nunca deja un segmento truncado
+        cuentas = set()
+        temporal = ruta + _SUFIJO_TEMPORAL
+        with open(temporal, "wb") as crudo:
+            with gzip.open(crudo, "wt", encoding="utf-8") as archivo:
+                for indice in range(corte):
+                    transaccion = transacciones[indice]
+                    cuentas.add(transaccion.numero_cuenta)
+                    archivo.write(json.dumps(transaccion.to_dict(), ensure_ascii=False, default=str) + "\n")
+            crudo.flush()
+            os.fsync(crudo.fileno())
+        os.replace(temporal, ruta)
+
+        self.sistema._archivar_transacciones(corte)
+
+        segmento = SegmentoArchivado(ruta, primer_id, ultimo_id, corte, cuentas)
+        self.segmentos.append(segmento)
+        return segmento
+
+    def consultar_archivo(self, numero_cuenta=None, desde_id=None, hasta_id=None):
+        """
+        Consulta las transacciones archivadas, opcionalmente de una cuenta y en un
+        rango de ids. Solo se leen los segmentos que pueden contener resultados.
+        """
+        for segmento in self.segmentos:
+            if desde_id is not None and segmento.ultimo_id < desde_id:
+                continue
+            if hasta_id is not None and segmento.primer_id > hasta_id:
+                break
+            if numero_cuenta is not None and segmento.cuentas is not None and numero_cuenta not in segmento.cuentas:
+                continue
+
+            for transaccion in segmento.leer():
+                if numero_cuenta is not None and transaccion["numero_cuenta"] != numero_cuenta:
+                    continue
+                if desde_id is not None and transaccion["id"] < desde_id:
+                    continue
+                if hasta_id is not None and transaccion["id"] > hasta_id:
+                    break
+                yield transaccion
+
+    def _cargar_segmentos_existentes(self):
+        """Registra los segmentos que ya están en el directorio, en orden de id."""
+        for nombre in sorted(os.listdir(self.directorio)):
+            if not nombre.startswith("segmento_"):
+                continue  # El directorio puede contener otros archivos del usuario
+            if nombre.endswith(".jsonl.gz" + _SUFIJO_TEMPORAL):
+                os.remove(os.path.join(self.directorio, nombre))  # Escritura interrumpida
+                continue
+            partes = nombre[:-len(".jsonl.gz")].split("_")
+            if not (nombre.endswith(".jsonl.gz") and len(partes) == 3):
+                continue
+            primer_id, ultimo_id = int(partes[1]), int(partes[2])
+            self.segmentos.append(SegmentoArchivado(
+                os.path.join(self.directorio, nombre), primer_id, ultimo_id, ultimo_id - primer_id + 1, None
+            ))
+
+    def obtener_segmentos(self):
+        """
+        Obtiene la descripción de los segmentos archivados.
+        """
+        return [segmento.to_dict() for segmento in self.segmentos]
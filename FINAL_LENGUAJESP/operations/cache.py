@@ -0,0 +1,123 @@
+"""
+Módulo de caché para el Sistema de Gestión Bancaria.
+Implementa una caché LRU con invalidación por número de cuenta y por espacio
+de claves (el primer elemento de cada clave, como "cuenta" o "titular").
+"""
+
+from collections import OrderedDict
+
+
+class CacheConsultas:
+    """Caché LRU de resultados de consultas con invalidación dirigida."""
+
+    def __init__(self, capacidad=1024):
+        """
+        Inicializa la caché con una capacidad máxima de entradas.
+        """
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la caché debe ser mayor a cero")
+
+        self.capacidad = capacidad
+        self._entradas = OrderedDict()  # clave -> (valor, cuentas de las que depende)
+        self._por_cuenta = {}  # numero_cuenta -> conjunto de claves dependientes
+        self._por_espacio = {}  # primer elemento de la clave -> conjunto de claves
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave):
+        """
+        Retorna el valor almacenado para la clave o None si no existe.
+        """
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            self.fallos += 1
+            return None
+
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada[0]
+
+    def guardar(self, clave, valor, cuentas=()):
+        """
+        Guarda un valor asociado a las cuentas de las que depende.
+        """
+        if clave in self._entradas:
+            self._descartar(clave)
+
+        dependencias = frozenset(cuentas)
+        self._entradas[clave] = (valor, dependencias)
+        for numero_cuenta in dependencias:
+            self._por_cuenta.setdefault(numero_cuenta, set()).add(clave)
+        self._por_espacio.setdefault(clave[0], set()).add(clave)
+
+        while len(self._entradas) > self.capacidad:
+            clave_antigua = next(iter(self._entradas))
+            self._descartar(clave_antigua)
+            self.desalojos += 1
+
+    def invalidar_cuentas(self, numeros_cuenta):
+        """
+        Elimina las entradas que dependen de alguna de las cuentas indicadas.
+        """
+        for numero_cuenta in numeros_cuenta:
+            claves = self._por_cuenta.pop(numero_cuenta, None)
+            if not claves:
+                continue
+            for clave in list(claves):
+                if clave in self._entradas:
+                    self._descartar(clave)
+                    self.invalidaciones += 1
+
+    def invalidar_espacio(self, espacio, predicado=None):
+        """
+        Elimina las entradas del espacio de claves indicado cuya clave cumple el
+        predicado (todas si no se indica). Solo se recorren las claves del espacio.
+        """
+        claves = self._por_espacio.get(espacio)
+        if not claves:
+            return
+        for clave in [c for c in claves if predicado is None or predicado(c)]:
+            self._descartar(clave)
+            self.invalidaciones += 1
+
+    def limpiar(self):
+        """
+        Vacía la caché conservando las estadísticas.
+        """
+        self._entradas.clear()
+        self._por_cuenta.clear()
+        self._por_espacio.clear()
+
+    def estadisticas(self):
+        """
+        Retorna las estadísticas de uso de la caché.
+        """
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "capacidad": self.capacidad,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "desalojos": self.desalojos,
+            "invalidaciones": self.invalidaciones
+        }
+
+    def _descartar(self, clave):
+        """
+        Elimina una entrada y sus referencias en el índice por cuenta.
+        """
+        _, dependencias = self._entradas.pop(clave)
+        for numero_cuenta in dependencias:
+            claves = self._por_cuenta.get(numero_cuenta)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_cuenta[numero_cuenta]
+
+        claves = self._por_espacio[clave[0]]
+        claves.discard(clave)
+        if not claves:
+            del self._por_espacio[clave[0]]
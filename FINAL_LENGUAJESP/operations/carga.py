@@ -0,0 +1,293 @@
+"""
+Módulo de generación de carga para el Sistema de Gestión Bancaria.
+Genera tráfico sintético, graba y reproduce trazas de operaciones y
+reporta el rendimiento obtenido.
+
+Uso: python -m operations.carga --cuentas 10000 --operaciones 100000
+"""
+
+import argparse
+import itertools
+import json
+import random
+import time
+
+from models.banco import TIPOS_CUENTA
+
+# Proporción por defecto de cada tipo de operación
+MEZCLA_POR_DEFECTO = {
+    "deposito": 0.30,
+    "retiro": 0.20,
+    "transferencia": 0.20,
+    "consulta": 0.30
+}
+
+# Cuentas pedidas en cada consulta en lote ("consulta_lote"), si se incluye en la mezcla
+TAMANO_CONSULTA_LOTE = 100
+
+
+class GeneradorCarga:
+    """Genera operaciones sintéticas con cuentas calientes según una distribución Zipf."""
+
+    def __init__(self, total_cuentas, exponente_zipf=1.1, mezcla=None, semilla=None,
+                 primer_numero_cuenta=1000001):
+        """
+        Inicializa el generador para un rango consecutivo de cuentas.
+        """
+        if total_cuentas < 2:
+            raise ValueError("Se necesitan al menos dos cuentas para generar carga")
+
+        self.total_cuentas = total_cuentas
+        self.exponente_zipf = exponente_zipf
+        self.mezcla = dict(MEZCLA_POR_DEFECTO if mezcla is None else mezcla)
+        self.aleatorio = random.Random(semilla)
+
+        self.numeros_cuenta = list(range(primer_numero_cuenta, primer_numero_cuenta + total_cuentas))
+
+        # La cuenta de rango k recibe un peso proporcional a 1 / k^s; el rango se
+        # asigna a una permutación aleatoria para que las calientes no sean consecutivas
+        self._por_rango = self.numeros_cuenta[:]
+        self.aleatorio.shuffle(self._por_rango)
+        pesos = (1.0 / (rango ** exponente_zipf) for rango in range(1, total_cuentas + 1))
+        self._pesos_acumulados = list(itertools.accumulate(pesos))
+
+        self._operaciones = list(self.mezcla)
+        self._pesos_operaciones = list(itertools.accumulate(self.mezcla.values()))
+
+    def operaciones_apertura(self, saldo_inicial=1000.00):
+        """
+        Genera las operaciones de creación de las cuentas del rango.
+        """
+        for indice in range(self.total_cuentas):
+            yield ("crear", f"Cliente {indice + 1}", TIPOS_CUENTA[indice % len(TIPOS_CUENTA)], saldo_inicial)
+
+    def generar(self, total_operaciones, tamano_lote=1024):
+        """
+        Genera la cantidad indicada de operaciones según la mezcla configurada.
+        """
+        aleatorio = self.aleatorio
+        restantes = total_operaciones
+        while restantes > 0:
+            cantidad = min(tamano_lote, restantes)
+            restantes -= cantidad
+
+            tipos = aleatorio.choices(self._operaciones, cum_weights=self._pesos_operaciones, k=cantidad)
+            cuentas = aleatorio.choices(self._por_rango, cum_weights=self._pesos_acumulados, k=cantidad * 2)
+
+            for indice, tipo in enumerate(tipos):
+                numero_cuenta = cuentas[2 * indice]
+                if tipo == "consulta":
+                    yield ("consulta", numero_cuenta)
+                elif tipo == "consulta_lote":
+                    yield ("consulta_lote", aleatorio.choices(
+                        self._por_rango, cum_weights=self._pesos_acumulados, k=TAMANO_CONSULTA_LOTE
+                    ))
+                elif tipo == "transferencia":
+                    destino = cuentas[2 * indice + 1]
+                    if destino == numero_cuenta:
+                        destino = self.numeros_cuenta[
+                            (destino - self.numeros_cuenta[0] + 1) % self.total_cuentas
+                        ]
+                    yield ("transferencia", numero_cuenta, destino, self._monto())
+                else:
+                    yield (tipo, numero_cuenta, self._monto())
+
+    def _monto(self):
+        """Retorna un monto aleatorio con dos decimales."""
+        return round(self.aleatorio.uniform(1, 500), 2)
+
+
+class GrabadorTraza:
+    """Envoltorio que registra en una traza las operaciones realizadas sobre un destino."""
+
+    def __init__(self, destino, ruta):
+        self.destino = destino
+        self._archivo = open(ruta, "w", encoding="utf-8")
+
+    def crear_cuenta(self, titular, tipo_cuenta, saldo_inicial=0.0):
+        """Crea una cuenta en el destino y registra la operación."""
+        self._grabar(("crear", titular, tipo_cuenta, saldo_inicial))
+        return self.destino.crear_cuenta(titular, tipo_cuenta, saldo_inicial)
+
+    def depositar(self, numero_cuenta, monto):
+        """Realiza un depósito en el destino y registra la operación."""
+        self._grabar(("deposito", numero_cuenta, monto))
+        return self.destino.depositar(numero_cuenta, monto)
+
+    def retirar(self, numero_cuenta, monto):
+        """Realiza un retiro en el destino y registra la operación."""
+        self._grabar(("retiro", numero_cuenta, monto))
+        return self.destino.retirar(numero_cuenta, monto)
+
+    def transferir(self, numero_cuenta_origen, numero_cuenta_destino, monto):
+        """Realiza una transferencia en el destino y registra la operación."""
+        self._grabar(("transferencia", numero_cuenta_origen, numero_cuenta_destino, monto))
+        return self.destino.transferir(numero_cuenta_origen, numero_cuenta_destino, monto)
+
+    def buscar_cuenta(self, numero_cuenta):
+        """Consulta una cuenta en el destino y registra la operación."""
+        self._grabar(("consulta", numero_cuenta))
+        return self.destino.buscar_cuenta(numero_cuenta)
+
+    def buscar_cuentas(self, numeros_cuenta):
+        """Consulta varias cuentas en el destino y registra la operación."""
+        self._grabar(("consulta_cuentas", list(numeros_cuenta)))
+        return self.destino.buscar_cuentas(numeros_cuenta)
+
+    def saldos(self, numeros_cuenta):
+        """Consulta los saldos de varias cuentas en el destino y registra la operación."""
+        self._grabar(("consulta_lote", list(numeros_cuenta)))
+        return self.destino.saldos(numeros_cuenta)
+
+    def cerrar(self):
+        """Cierra el archivo de la traza."""
+        self._archivo.close()
+
+    def _grabar(self, operacion):
+        """Escribe una operación como una línea JSON."""
+        self._archivo.write(json.dumps(operacion, ensure_ascii=False) + "\n")
+
+
+def grabar_traza(operaciones, ruta):
+    """
+    Escribe una secuencia de operaciones en un archivo de traza.
+    Retorna la cantidad de operaciones escritas.
+    """
+    total = 0
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        for operacion in operaciones:
+            archivo.write(json.dumps(operacion, ensure_ascii=False) + "\n")
+            total += 1
+    return total
+
+
+def leer_traza(ruta):
+    """
+    Lee de forma incremental las operaciones de un archivo de traza.
+    """
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            if linea.strip():
+                yield tuple(json.loads(linea))
+
+
+def percentil(valores_ordenados, porcentaje):
+    """
+    Retorna el percentil indicado (método del rango más cercano) de una lista ordenada.
+    """
+    if not valores_ordenados:
+        return 0
+    rango = max(1, -(-len(valores_ordenados) * porcentaje // 100))
+    return valores_ordenados[int(rango) - 1]
+
+
+def ejecutar_carga(destino, operaciones):
+    """
+    Ejecuta las operaciones contra cualquier objeto con la interfaz de SistemaBancario
+    (el propio sistema o un front-end de servicio) y mide la latencia de cada una.
+    Las operaciones rechazadas con ValueError se cuentan aparte de las exitosas.
+    """
+    acciones = {
+        "crear": destino.crear_cuenta,
+        "deposito": destino.depositar,
+        "retiro": destino.retirar,
+        "transferencia": destino.transferir,
+        "consulta": destino.buscar_cuenta,
+        "consulta_cuentas": destino.buscar_cuentas,
+        "consulta_lote": destino.saldos
+    }
+    latencias = {tipo: [] for tipo in acciones}
+    rechazadas = {tipo: 0 for tipo in acciones}
+    reloj = time.perf_counter_ns
+
+    inicio = reloj()
+    for operacion in operaciones:
+        tipo = operacion[0]
+        antes = reloj()
+        try:
+            acciones[tipo](*operacion[1:])
+        except ValueError:
+            rechazadas[tipo] += 1
+        latencias[tipo].append(reloj() - antes)
+    duracion = (reloj() - inicio) / 1e9
+
+    return _construir_informe(latencias, rechazadas, duracion)
+
+
+def reproducir_traza(ruta, destino):
+    """
+    Reproduce una traza grabada contra el destino indicado.
+    """
+    return ejecutar_carga(destino, leer_traza(ruta))
+
+
+def _construir_informe(latencias, rechazadas, duracion):
+    """Resume latencias en microsegundos y el rendimiento global."""
+    informe = {"duracion_s": duracion, "operaciones": {}}
+    todas = []
+    for tipo, valores in latencias.items():
+        if not valores:
+            continue
+        valores.sort()
+        todas.extend(valores)
+        informe["operaciones"][tipo] = _resumir(valores, rechazadas[tipo])
+
+    todas.sort()
+    informe["total"] = _resumir(todas, sum(rechazadas.values()))
+    informe["operaciones_por_segundo"] = len(todas) / duracion if duracion > 0 else 0.0
+    return informe
+
+
+def _resumir(valores_ordenados, rechazadas):
+    """Calcula los percentiles de una lista ordenada de latencias en nanosegundos."""
+    return {
+        "cantidad": len(valores_ordenados),
+        "rechazadas": rechazadas,
+        "p50_us": percentil(valores_ordenados, 50) / 1000,
+        "p90_us": percentil(valores_ordenados, 90) / 1000,
+        "p99_us": percentil(valores_ordenados, 99) / 1000,
+        "max_us": valores_ordenados[-1] / 1000 if valores_ordenados else 0
+    }
+
+
+def imprimir_informe(informe):
+    """Muestra el informe de rendimiento en la consola."""
+    print(f"Duración: {informe['duracion_s']:.2f} s | "
+          f"Rendimiento: {informe['operaciones_por_segundo']:,.0f} op/s")
+    print(f"{'Operación':<15}{'Cantidad':>10}{'Rechazadas':>12}{'p50 µs':>10}{'p90 µs':>10}{'p99 µs':>10}{'máx µs':>12}")
+    filas = list(informe["operaciones"].items()) + [("total", informe["total"])]
+    for tipo, datos in filas:
+        print(f"{tipo:<15}{datos['cantidad']:>10}{datos['rechazadas']:>12}"
+              f"{datos['p50_us']:>10.1f}{datos['p90_us']:>10.1f}{datos['p99_us']:>10.1f}{datos['max_us']:>12.1f}")
+
+
+def main():
+    """Punto de entrada de la línea de comandos del generador de carga."""
+    from operations.sistema import SistemaBancario
+
+    parser = argparse.ArgumentParser(description="Generador de carga del Sistema Bancario")
+    parser.add_argument("--cuentas", type=int, default=10000, help="Cantidad de cuentas")
+    parser.add_argument("--operaciones", type=int, default=100000, help="Cantidad de operaciones")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Exponente de la distribución Zipf")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla aleatoria")
+    parser.add_argument("--grabar", metavar="RUTA", help="Graba la traza generada en lugar de ejecutarla")
+    parser.add_argument("--reproducir", metavar="RUTA", help="Reproduce una traza grabada")
+    args = parser.parse_args()
+
+    if args.reproducir:
+        imprimir_informe(reproducir_traza(args.reproducir, SistemaBancario()))
+        return
+
+    generador = GeneradorCarga(args.cuentas, args.zipf, semilla=args.semilla)
+    operaciones = itertools.chain(generador.operaciones_apertura(), generador.generar(args.operaciones))
+
+    if args.grabar:
+        total = grabar_traza(operaciones, args.grabar)
+        print(f"Traza grabada en {args.grabar}: {total} operaciones")
+        return
+
+    imprimir_informe(ejecutar_carga(SistemaBancario(), operaciones))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Módulo de conciliación de extractos externos para el Sistema de Gestión Bancaria.
+Cruza un archivo CSV de liquidación con los apuntes del libro por cuenta, monto
+y ventana de tiempo, e informa las líneas conciliadas, las discrepancias de
+monto y las partidas que faltan en cada lado.
+
+El archivo se lee una sola vez y se reparte por número de cuenta en archivos
+temporales, por lo que la memoria depende del tamaño de cada partición y no
+del archivo completo. Las particiones se concilian en paralelo; el índice de
+apuntes por cuenta del sistema hace de tabla hash del cruce.
+
+Uso: python -m operations.conciliacion extracto.csv --instantanea estado.sbin --informe informe.csv
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+from models.banco import SIGNO_OPERACION, a_centavos, a_decimal
+
+# Columnas obligatorias del extracto; el resto se conserva en el informe como referencia
+COLUMNAS_EXTRACTO = ("numero_cuenta", "fecha", "monto")
+COLUMNAS_INFORME = ("resultado", "numero_cuenta", "fecha", "monto_extracto", "id_transaccion",
+                    "fecha_libro", "monto_libro", "linea", "referencia")
+
+CONCILIADA = "conciliada"
+DISCREPANCIA = "discrepancia_monto"
+FALTA_EN_LIBRO = "falta_en_libro"
+FALTA_EN_EXTRACTO = "falta_en_extracto"
+INVALIDA = "linea_invalida"
+
+_FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+# Las fechas de un extracto se repiten mucho; se interpretan una vez por valor distinto
+_FECHAS_EN_CACHE = 65536
+
+# Sistema que heredan los procesos de trabajo al crearse
+_sistema_trabajo = None
+
+
+class ConciliadorExtractos:
+    """Concilia extractos externos contra el historial en memoria de un SistemaBancario."""
+
+    def __init__(self, sistema, ventana=timedelta(minutes=5), particiones=8, procesos=None):
+        """
+        Inicializa el conciliador.
+
+        Args:
+            sistema: SistemaBancario cuyo historial se concilia
+            ventana: Diferencia máxima entre la fecha del extracto y la del apunte
+            particiones: Cantidad de particiones por número de cuenta
+            procesos: Procesos de trabajo; por defecto uno por CPU (como máximo uno por partición)
+        """
+        if particiones <= 0:
+            raise ValueError("La cantidad de particiones debe ser mayor a cero")
+
+        self.sistema = sistema
+        self.ventana = ventana
+        self.particiones = particiones
+        self.procesos = min(procesos or os.cpu_count() or 1, particiones)
+
+    def conciliar(self, ruta_extracto, ruta_informe=None, desde=None, hasta=None):
+        """
+        Concilia un extracto CSV con columnas numero_cuenta, fecha y monto (con signo:
+        positivo para créditos y negativo para débitos).
+        Los apuntes del libro entre desde y hasta sin línea en el extracto se informan
+        como faltantes; por defecto el período es el que cubre el extracto.
+        Retorna un resumen con la cantidad de cada resultado y, si se indica
+        ruta_informe, escribe allí el detalle de cada partida no conciliada.
+        """
+        directorio = tempfile.mkdtemp(prefix="conciliacion_")
+        try:
+            lineas, invalidas, minima, maxima = self._particionar(ruta_extracto, directorio)
+            if desde is None and minima is not None:
+                desde = _formatear(datetime.fromisoformat(minima) - self.ventana)
+            if hasta is None and maxima is not None:
+                hasta = _formatear(datetime.fromisoformat(maxima) + self.ventana)
+
+            tareas = [
+                (os.path.join(directorio, f"particion_{indice}.csv"), indice, self.particiones,
+                 self.ventana.total_seconds(), desde or "", hasta or "")
+                for indice in range(self.particiones)
+            ]
+            resultados = self._ejecutar(tareas)
+
+            resumen = {
+                "lineas": lineas,
+                CONCILIADA: 0,
+                DISCREPANCIA: 0,
+                FALTA_EN_LIBRO: 0,
+                FALTA_EN_EXTRACTO: 0,
+                INVALIDA: invalidas,
+                "monto_conciliado": Decimal("0.00"),
+                "desde": desde,
+                "hasta": hasta
+            }
+            for conteos, centavos_conciliados in resultados:
+                for resultado, cantidad in conteos.items():
+                    resumen[resultado] += cantidad
+                resumen["monto_conciliado"] += a_decimal(centavos_conciliados)
+
+            if ruta_informe is not None:
+                self._unir_informes(directorio, ruta_informe)
+            return resumen
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def _particionar(self, ruta_extracto, directorio):
+        """
+        Reparte las líneas válidas del extracto por número de cuenta y anota las inválidas.
+        Retorna la cantidad de líneas, las inválidas y las fechas mínima y máxima.
+        """
+        archivos = [open(os.path.join(directorio, f"particion_{indice}.csv"), "w", newline="", encoding="utf-8")
+                    for indice in range(self.particiones)]
+        escritores = [csv.writer(archivo) for archivo in archivos]
+        lineas = 0
+        invalidas = 0
+        minima = maxima = None
+
+        try:
+            with open(ruta_extracto, newline="", encoding="utf-8") as entrada, \
+                    open(os.path.join(directorio, "invalidas.csv"), "w", newline="", encoding="utf-8") as salida:
+                lector = csv.DictReader(entrada)
+                faltantes = [columna for columna in COLUMNAS_EXTRACTO if columna not in (lector.fieldnames or ())]
+                if faltantes:
+                    raise ValueError(f"Al extracto le faltan las columnas: {', '.join(faltantes)}")
+                referencias = [columna for columna in lector.fieldnames if columna not in COLUMNAS_EXTRACTO]
+                informe_invalidas = csv.writer(salida)
+
+                for linea, fila in enumerate(lector, start=2):
+                    lineas += 1
+                    referencia = " ".join(fila[columna] or "" for columna in referencias)
+                    try:
+                        numero_cuenta = int(fila["numero_cuenta"])
+                        fecha = _normalizar_fecha(fila["fecha"])
+                        centavos = a_centavos(Decimal(fila["monto"]))
+                    except (AttributeError, TypeError, ValueError, ArithmeticError):
+                        invalidas += 1
+                        informe_invalidas.writerow((INVALIDA, fila.get("numero_cuenta"), fila.get("fecha"),
+                                                    fila.get("monto"), "", "", "", linea, referencia))
+                        continue
+
+                    if minima is None or fecha < minima:
+                        minima = fecha
+                    if maxima is None or fecha > maxima:
+                        maxima = fecha
+                    escritores[numero_cuenta % self.particiones].writerow(
+                        (numero_cuenta, fecha, centavos, linea, referencia)
+                    )
+        finally:
+            for archivo in archivos:
+                archivo.close()
+        return lineas, invalidas, minima, maxima
+
+    def _ejecutar(self, tareas):
+        """Concilia las particiones en procesos de trabajo o, si no es posible, en este proceso."""
+        global _sistema_trabajo
+        _sistema_trabajo = self.sistema
+        try:
+            if self.procesos <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+                return [_conciliar_particion(*tarea) for tarea in tareas]
+
+            # Los procesos creados con fork comparten el historial sin copiarlo ni serializarlo
+            with multiprocessing.get_context("fork").Pool(self.procesos) as grupo:
+                return grupo.starmap(_conciliar_particion, tareas)
+        finally:
+            _sistema_trabajo = None
+
+    def _unir_informes(self, directorio, ruta_informe):
+        """Concatena los informes de las particiones en un único CSV."""
+        with open(ruta_informe, "w", newline="", encoding="utf-8") as salida:
+            csv.writer(salida).writerow(COLUMNAS_INFORME)
+            nombres = ["invalidas.csv"] + [f"informe_{indice}.csv" for indice in range(self.particiones)]
+            for nombre in nombres:
+                ruta = os.path.join(directorio, nombre)
+                if os.path.exists(ruta):
+                    with open(ruta, newline="", encoding="utf-8") as parte:
+                        shutil.copyfileobj(parte, salida)
+
+
+def _conciliar_particion(ruta_particion, indice, particiones, ventana_segundos, desde, hasta):
+    """
+    Concilia una partición del extracto contra los apuntes de sus cuentas.
+    Retorna la cantidad de cada resultado y el monto conciliado en centavos.
+    """
+    historiales = _sistema_trabajo._transacciones_por_cuenta
+    usados = set()  # ids de los apuntes ya asignados a una línea del extracto
+    pendientes = []  # Líneas sin apunte del mismo monto
+    conteos = {CONCILIADA: 0, DISCREPANCIA: 0, FALTA_EN_LIBRO: 0, FALTA_EN_EXTRACTO: 0}
+    centavos_conciliados = 0
+
+    directorio = os.path.dirname(ruta_particion)
+    with open(os.path.join(directorio, f"informe_{indice}.csv"), "w", newline="", encoding="utf-8") as salida:
+        informe = csv.writer(salida)
+
+        # Primera pasada: misma cuenta, mismo monto con signo y fecha dentro de la ventana
+        with open(ruta_particion, newline="", encoding="utf-8") as entrada:
+            for numero_cuenta, fecha, centavos, linea, referencia in csv.reader(entrada):
+                numero_cuenta = int(numero_cuenta)
+                centavos = int(centavos)
+                candidatos = _apuntes_en_ventana(historiales.get(numero_cuenta), fecha, ventana_segundos)
+                for transaccion in candidatos:
+                    if transaccion.id not in usados and _centavos_con_signo(transaccion) == centavos:
+                        usados.add(transaccion.id)
+                        conteos[CONCILIADA] += 1
+                        centavos_conciliados += centavos
+                        break
+                else:
+                    pendientes.append((numero_cuenta, fecha, centavos, linea, referencia))
+
+        # Segunda pasada: las líneas restantes se emparejan con apuntes libres de otro monto
+        for numero_cuenta, fecha, centavos, linea, referencia in pendientes:
+            candidatos = _apuntes_en_ventana(historiales.get(numero_cuenta), fecha, ventana_segundos)
+            for transaccion in candidatos:
+                if transaccion.id not in usados:
+                    usados.add(transaccion.id)
+                    conteos[DISCREPANCIA] += 1
+                    informe.writerow((DISCREPANCIA, numero_cuenta, fecha, a_decimal(centavos), transaccion.id,
+                                      transaccion.fecha, a_decimal(_centavos_con_signo(transaccion)),
+                                      linea, referencia))
+                    break
+            else:
+                conteos[FALTA_EN_LIBRO] += 1
+                informe.writerow((FALTA_EN_LIBRO, numero_cuenta, fecha, a_decimal(centavos), "", "", "",
+                                  linea, referencia))
+
+        # Apuntes del período de las cuentas de esta partición sin línea en el extracto
+        for numero_cuenta, historial in historiales.items():
+            if numero_cuenta % particiones != indice:
+                continue
+            inicio = bisect_left(historial, desde, key=_fecha) if desde else 0
+            fin = bisect_right(historial, hasta, key=_fecha) if hasta else len(historial)
+            for transaccion in historial[inicio:fin]:
+                if transaccion.id not in usados:
+                    conteos[FALTA_EN_EXTRACTO] += 1
+                    informe.writerow((FALTA_EN_EXTRACTO, numero_cuenta, "", "", transaccion.id, transaccion.fecha,
+                                      a_decimal(_centavos_con_signo(transaccion)), "", ""))
+
+    return conteos, centavos_conciliados
+
+
+def _apuntes_en_ventana(historial, fecha, ventana_segundos):
+    """Retorna los apuntes de una cuenta cuya fecha está dentro de la ventana alrededor de fecha."""
+    if not historial:
+        return ()
+    # Las fechas del libro se comparan como texto, sin interpretarlas
+    primera, ultima = _limites_ventana(fecha, ventana_segundos)
+    inicio = bisect_left(historial, primera, key=_fecha)
+    fin = bisect_right(historial, ultima, key=_fecha)
+    return historial[inicio:fin]
+
+
+@lru_cache(maxsize=_FECHAS_EN_CACHE)
+def _limites_ventana(fecha, ventana_segundos):
+    """Retorna, en el formato del libro, la primera y la última fecha de la ventana."""
+    momento = datetime.fromisoformat(fecha)
+    ventana = timedelta(seconds=ventana_segundos)
+    return _formatear(momento - ventana), _formatear(momento + ventana)
+
+
+@lru_cache(maxsize=_FECHAS_EN_CACHE)
+def _normalizar_fecha(texto):
+    """Convierte una fecha ISO del extracto al formato del libro; lanza ValueError si no es válida."""
+    return _formatear(datetime.fromisoformat(texto.strip()))
+
+
+def _centavos_con_signo(transaccion):
+    """Importe del apunte en centavos, positivo si acredita la cuenta y negativo si la debita."""
+    return SIGNO_OPERACION[transaccion.codigo] * int(transaccion.monto * 100)
+
+
+def _fecha(transaccion):
+    """Clave de búsqueda de los apuntes por fecha."""
+    return transaccion.fecha
+
+
+def _formatear(momento):
+    """Formatea una fecha como en el libro."""
+    return momento.strftime(_FORMATO_FECHA)
+
+
+def main():
+    """Concilia un extracto contra el estado guardado en una instantánea."""
+    from operations.instantanea import cargar_instantanea
+
+    parser = argparse.ArgumentParser(description="Conciliación de extractos del Sistema Bancario")
+    parser.add_argument("extracto", help="Archivo CSV con columnas numero_cuenta, fecha y monto")
+    parser.add_argument("--instantanea", required=True, help="Instantánea del sistema a conciliar")
+    parser.add_argument("--informe", help="CSV donde se escriben las partidas no conciliadas")
+    parser.add_argument("--ventana", type=int, default=300, help="Ventana de tiempo en segundos")
+    parser.add_argument("--particiones", type=int, default=8, help="Particiones por número de cuenta")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos de trabajo")
+    args = parser.parse_args()
+
+    sistema = cargar_instantanea(args.instantanea)
+    conciliador = ConciliadorExtractos(
+        sistema, timedelta(seconds=args.ventana), particiones=args.particiones, procesos=args.procesos
+    )
+    print(json.dumps(conciliador.conciliar(args.extracto, args.informe), default=str, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
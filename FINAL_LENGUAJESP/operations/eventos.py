@@ -0,0 +1,201 @@
+"""
+Módulo de eventos para el Sistema de Gestión Bancaria.
+Implementa un flujo de cambios con suscripciones de cola acotada.
+"""
+
+from collections import deque
+from threading import Lock
+
+
+class EventoCuentaCreada:
+    """Evento emitido al crear una cuenta."""
+
+    __slots__ = ("secuencia", "numero_cuenta", "titular", "tipo_cuenta", "saldo")
+
+    def __init__(self, numero_cuenta, titular, tipo_cuenta, saldo):
+        self.secuencia = 0
+        self.numero_cuenta = numero_cuenta
+        self.titular = titular
+        self.tipo_cuenta = tipo_cuenta
+        self.saldo = saldo
+
+    def to_dict(self):
+        """Retorna el evento como un diccionario."""
+        return {
+            "evento": "cuenta_creada",
+            "secuencia": self.secuencia,
+            "numero_cuenta": self.numero_cuenta,
+            "titular": self.titular,
+            "tipo_cuenta": self.tipo_cuenta,
+            "saldo": self.saldo
+        }
+
+
+class EventoMovimiento:
+    """Evento emitido al registrar una transacción sobre una cuenta."""
+
+    __slots__ = ("secuencia", "id_transaccion", "numero_cuenta", "tipo", "delta", "saldo_nuevo", "codigo")
+
+    def __init__(self, id_transaccion, numero_cuenta, tipo, delta, saldo_nuevo, codigo=None):
+        self.secuencia = 0
+        self.id_transaccion = id_transaccion
+        self.numero_cuenta = numero_cuenta
+        self.tipo = tipo
+        self.delta = delta
+        self.saldo_nuevo = saldo_nuevo
+        self.codigo = codigo
+
+    def to_dict(self):
+        """Retorna el evento como un diccionario."""
+        return {
+            "evento": "movimiento",
+            "secuencia": self.secuencia,
+            "id_transaccion": self.id_transaccion,
+            "numero_cuenta": self.numero_cuenta,
+            "tipo": self.tipo,
+            "codigo": int(self.codigo) if self.codigo is not None else None,
+            "delta": self.delta,
+            "saldo_nuevo": self.saldo_nuevo
+        }
+
+
+class EventoEstadoCambiado:
+    """Evento emitido al cambiar el estado de una cuenta."""
+
+    __slots__ = ("secuencia", "numero_cuenta", "estado_anterior", "estado_nuevo")
+
+    def __init__(self, numero_cuenta, estado_anterior, estado_nuevo):
+        self.secuencia = 0
+        self.numero_cuenta = numero_cuenta
+        self.estado_anterior = estado_anterior
+        self.estado_nuevo = estado_nuevo
+
+    def to_dict(self):
+        """Retorna el evento como un diccionario."""
+        return {
+            "evento": "estado_cambiado",
+            "secuencia": self.secuencia,
+            "numero_cuenta": self.numero_cuenta,
+            "estado_anterior": self.estado_anterior,
+            "estado_nuevo": self.estado_nuevo
+        }
+
+
+class EventoHistorialArchivado:
+    """Evento emitido al archivar el prefijo más antiguo del historial en memoria."""
+
+    __slots__ = ("secuencia", "ultimo_id", "cantidad")
+
+    def __init__(self, ultimo_id, cantidad):
+        self.secuencia = 0
+        self.ultimo_id = ultimo_id
+        self.cantidad = cantidad
+
+    def to_dict(self):
+        """Retorna el evento como un diccionario."""
+        return {
+            "evento": "historial_archivado",
+            "secuencia": self.secuencia,
+            "ultimo_id": self.ultimo_id,
+            "cantidad": self.cantidad
+        }
+
+
+class Suscripcion:
+    """Cola acotada de eventos para un suscriptor."""
+
+    def __init__(self, bus, capacidad, tipos=None):
+        self._bus = bus
+        self._cola = deque(maxlen=capacidad)
+        self.tipos = tuple(tipos) if tipos else None
+        self.perdidos = 0  # Eventos descartados por desbordamiento de la cola
+        self.activa = True
+
+    def _entregar(self, evento):
+        """Encola un evento descartando el más antiguo si la cola está llena."""
+        if self.tipos is not None and not isinstance(evento, self.tipos):
+            return
+        if len(self._cola) == self._cola.maxlen:
+            self.perdidos += 1
+        self._cola.append(evento)
+
+    def obtener(self, maximo=None):
+        """
+        Extrae los eventos pendientes en orden de publicación.
+        """
+        eventos = []
+        while self._cola and (maximo is None or len(eventos) < maximo):
+            eventos.append(self._cola.popleft())
+        return eventos
+
+    def pendientes(self):
+        """Retorna la cantidad de eventos en espera."""
+        return len(self._cola)
+
+    def reiniciar_perdidos(self):
+        """
+        Retorna y pone a cero el contador de eventos perdidos.
+        """
+        perdidos = self.perdidos
+        self.perdidos = 0
+        return perdidos
+
+    def cancelar(self):
+        """Da de baja la suscripción del bus."""
+        self._bus._cancelar(self)
+        self.activa = False
+
+
+class BusEventos:
+    """Publica los cambios del sistema hacia suscriptores y oyentes."""
+
+    def __init__(self):
+        self.secuencia = 0
+        self._suscripciones = []
+        self._oyentes = []
+        self._lock = Lock()
+
+    def suscribir(self, capacidad=1000, tipos=None):
+        """
+        Crea una suscripción con una cola acotada a la capacidad indicada.
+        """
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la suscripción debe ser mayor a cero")
+
+        suscripcion = Suscripcion(self, capacidad, tipos)
+        with self._lock:
+            self._suscripciones = self._suscripciones + [suscripcion]
+        return suscripcion
+
+    def registrar_oyente(self, oyente):
+        """
+        Registra una función que se invoca de forma síncrona con cada evento.
+        """
+        with self._lock:
+            self._oyentes = self._oyentes + [oyente]
+
+    def eliminar_oyente(self, oyente):
+        """Elimina un oyente registrado previamente."""
+        with self._lock:
+            self._oyentes = [o for o in self._oyentes if o is not oyente]
+
+    def hay_receptores(self):
+        """Indica si existe algún suscriptor u oyente."""
+        return bool(self._suscripciones or self._oyentes)
+
+    def publicar(self, evento):
+        """
+        Asigna número de secuencia al evento y lo entrega a todos los receptores.
+        """
+        self.secuencia += 1
+        evento.secuencia = self.secuencia
+
+        for oyente in self._oyentes:
+            oyente(evento)
+        for suscripcion in self._suscripciones:
+            suscripcion._entregar(evento)
+
+    def _cancelar(self, suscripcion):
+        """Elimina una suscripción de la lista de receptores."""
+        with self._lock:
+            self._suscripciones = [s for s in self._suscripciones if s is not suscripcion]
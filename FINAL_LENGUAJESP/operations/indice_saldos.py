@@ -0,0 +1,277 @@
+"""
+Módulo de índice ordenado de saldos para el Sistema de Gestión Bancaria.
+Mantiene las cuentas ordenadas por saldo, en general y por tipo de cuenta,
+para responder rankings, posiciones y rangos de saldo en tiempo logarítmico.
+"""
+
+import random
+from array import array
+
+NIVEL_MAXIMO = 24
+
+# Cada clave combina saldo y posición en un solo entero: saldo_centavos * 2**32 + indice
+_BITS_INDICE = 32
+_MASCARA_INDICE = (1 << _BITS_INDICE) - 1
+
+
+class _Nodo:
+    """Nodo de la lista de saltos con un enlace y un ancho por nivel."""
+
+    __slots__ = ("clave", "siguientes", "anchos")
+
+    def __init__(self, clave, niveles):
+        self.clave = clave
+        self.siguientes = [None] * niveles
+        self.anchos = [1] * niveles  # Cantidad de elementos que salta cada enlace
+
+
+class ListaSaltos:
+    """
+    Lista de saltos indexable de claves enteras únicas.
+    Inserción, borrado, posición y acceso por índice cuestan O(log n).
+    """
+
+    def __init__(self, claves_ordenadas=(), semilla=None):
+        self._aleatorio = random.Random(semilla)
+        self._cabeza = _Nodo(None, NIVEL_MAXIMO)
+        self._tamano = 0
+        self._niveles = 1  # Niveles en uso; los superiores de la cabeza no se recorren
+        self._construir(claves_ordenadas)
+
+    def __len__(self):
+        return self._tamano
+
+    def __iter__(self):
+        nodo = self._cabeza.siguientes[0]
+        while nodo is not None:
+            yield nodo.clave
+            nodo = nodo.siguientes[0]
+
+    def insertar(self, clave):
+        """Inserta una clave que no está en la lista."""
+        anteriores = [self._cabeza] * NIVEL_MAXIMO
+        pasos = [0] * NIVEL_MAXIMO
+        nodo = self._cabeza
+        for nivel in range(self._niveles - 1, -1, -1):
+            siguiente = nodo.siguientes[nivel]
+            while siguiente is not None and siguiente.clave < clave:
+                pasos[nivel] += nodo.anchos[nivel]
+                nodo = siguiente
+                siguiente = nodo.siguientes[nivel]
+            anteriores[nivel] = nodo
+
+        niveles = self._nivel_aleatorio()
+        if niveles > self._niveles:
+            for nivel in range(self._niveles, niveles):
+                self._cabeza.anchos[nivel] = self._tamano + 1
+            self._niveles = niveles
+        nuevo = _Nodo(clave, niveles)
+        recorridos = 0
+        for nivel in range(niveles):
+            anterior = anteriores[nivel]
+            nuevo.siguientes[nivel] = anterior.siguientes[nivel]
+            anterior.siguientes[nivel] = nuevo
+            nuevo.anchos[nivel] = anterior.anchos[nivel] - recorridos
+            anterior.anchos[nivel] = recorridos + 1
+            recorridos += pasos[nivel]
+        for nivel in range(niveles, self._niveles):
+            anteriores[nivel].anchos[nivel] += 1
+        self._tamano += 1
+
+    def quitar(self, clave):
+        """Quita una clave; lanza KeyError si no está en la lista."""
+        anteriores = [None] * self._niveles
+        nodo = self._cabeza
+        for nivel in range(self._niveles - 1, -1, -1):
+            siguiente = nodo.siguientes[nivel]
+            while siguiente is not None and siguiente.clave < clave:
+                nodo = siguiente
+                siguiente = nodo.siguientes[nivel]
+            anteriores[nivel] = nodo
+
+        objetivo = anteriores[0].siguientes[0]
+        if objetivo is None or objetivo.clave != clave:
+            raise KeyError(clave)
+
+        niveles = len(objetivo.siguientes)
+        for nivel in range(niveles):
+            anterior = anteriores[nivel]
+            anterior.anchos[nivel] += objetivo.anchos[nivel] - 1
+            anterior.siguientes[nivel] = objetivo.siguientes[nivel]
+        for nivel in range(niveles, self._niveles):
+            anteriores[nivel].anchos[nivel] -= 1
+        self._tamano -= 1
+
+    def posicion(self, clave):
+        """Retorna la cantidad de claves menores que la indicada."""
+        posicion = 0
+        nodo = self._cabeza
+        for nivel in range(self._niveles - 1, -1, -1):
+            siguiente = nodo.siguientes[nivel]
+            while siguiente is not None and siguiente.clave < clave:
+                posicion += nodo.anchos[nivel]
+                nodo = siguiente
+                siguiente = nodo.siguientes[nivel]
+        return posicion
+
+    def desde(self, indice):
+        """Recorre las claves en orden a partir de la posición indicada."""
+        if indice >= self._tamano:
+            return
+        restante = indice + 1
+        nodo = self._cabeza
+        for nivel in range(self._niveles - 1, -1, -1):
+            while nodo.siguientes[nivel] is not None and nodo.anchos[nivel] <= restante:
+                restante -= nodo.anchos[nivel]
+                nodo = nodo.siguientes[nivel]
+        while nodo is not None:
+            yield nodo.clave
+            nodo = nodo.siguientes[0]
+
+    def _construir(self, claves_ordenadas):
+        """Enlaza claves ya ordenadas en tiempo lineal."""
+        ultimos = [self._cabeza] * NIVEL_MAXIMO
+        posiciones = [0] * NIVEL_MAXIMO  # Posición (base 1) del último nodo de cada nivel
+        for clave in claves_ordenadas:
+            self._tamano += 1
+            nodo = _Nodo(clave, self._nivel_aleatorio())
+            self._niveles = max(self._niveles, len(nodo.siguientes))
+            for nivel in range(len(nodo.siguientes)):
+                ultimos[nivel].siguientes[nivel] = nodo
+                ultimos[nivel].anchos[nivel] = self._tamano - posiciones[nivel]
+                ultimos[nivel] = nodo
+                posiciones[nivel] = self._tamano
+        # Los últimos enlaces de cada nivel llegan hasta el final de la lista
+        for nivel in range(self._niveles):
+            ultimos[nivel].anchos[nivel] = self._tamano + 1 - posiciones[nivel]
+
+    def _nivel_aleatorio(self):
+        """Sortea la altura de un nodo con probabilidad 1/2 por nivel."""
+        bits = self._aleatorio.getrandbits(NIVEL_MAXIMO - 1)
+        niveles = 1
+        while bits & 1:
+            niveles += 1
+            bits >>= 1
+        return niveles
+
+
+class IndiceSaldos:
+    """
+    Índice ordenado de los saldos de un AlmacenCuentas, general y por tipo de cuenta.
+    Las operaciones solo marcan las cuentas modificadas; el índice se pone al día
+    antes de cada consulta, reordenando únicamente esas cuentas.
+    """
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+        saldos = almacen.saldos
+        tipos = almacen.tipos
+        self._indexados = array("q", saldos)  # Saldo con el que cada cuenta está en el índice
+        self._pendientes = set()
+
+        claves = sorted(_clave(saldo, indice) for indice, saldo in enumerate(saldos))
+        self._general = ListaSaltos(claves)
+        self._por_tipo = [ListaSaltos(
+            [clave for clave in claves if tipos[clave & _MASCARA_INDICE] == codigo]
+        ) for codigo in range(len(almacen.nombres_tipo))]
+
+    def marcar(self, numeros_cuenta):
+        """Registra las cuentas cuyo saldo cambió desde la última consulta."""
+        self._pendientes.update(numeros_cuenta)
+
+    def mayores(self, cantidad, tipo_cuenta=None):
+        """Retorna los números de las cuentas con mayor saldo, de mayor a menor."""
+        lista = self._lista(tipo_cuenta)
+        if lista is None or cantidad <= 0:
+            return []
+        claves = list(lista.desde(max(len(lista) - cantidad, 0)))
+        claves.reverse()
+        return self._numeros(claves)
+
+    def menores(self, cantidad, tipo_cuenta=None):
+        """Retorna los números de las cuentas con menor saldo, de menor a mayor."""
+        lista = self._lista(tipo_cuenta)
+        if lista is None or cantidad <= 0:
+            return []
+        claves = lista.desde(0)
+        return self._numeros(next(claves) for _ in range(min(cantidad, len(lista))))
+
+    def posicion(self, numero_cuenta, tipo_cuenta=None):
+        """
+        Retorna la posición (1 = mayor saldo) de la cuenta y el total de cuentas comparadas.
+        """
+        lista = self._lista(tipo_cuenta)
+        indice = numero_cuenta - self.almacen.primer_numero
+        clave = _clave(self._indexados[indice], indice)
+        return len(lista) - lista.posicion(clave), len(lista)
+
+    def en_rango(self, minimo_centavos, maximo_centavos, tipo_cuenta=None, limite=None):
+        """Retorna las cuentas con saldo entre los extremos incluidos, de menor a mayor."""
+        lista = self._lista(tipo_cuenta)
+        if lista is None or minimo_centavos > maximo_centavos:
+            return []
+        tope = _clave(maximo_centavos, _MASCARA_INDICE)
+        claves = []
+        for clave in lista.desde(lista.posicion(_clave(minimo_centavos, 0))):
+            if clave > tope or len(claves) == limite:
+                break
+            claves.append(clave)
+        return self._numeros(claves)
+
+    def contar_rango(self, minimo_centavos, maximo_centavos, tipo_cuenta=None):
+        """Cuenta las cuentas con saldo entre los extremos incluidos."""
+        lista = self._lista(tipo_cuenta)
+        if lista is None or minimo_centavos > maximo_centavos:
+            return 0
+        return (lista.posicion(_clave(maximo_centavos + 1, 0))
+                - lista.posicion(_clave(minimo_centavos, 0)))
+
+    def _lista(self, tipo_cuenta):
+        """Pone el índice al día y retorna la lista general o la del tipo indicado."""
+        self._sincronizar()
+        if tipo_cuenta is None:
+            return self._general
+        codigo = self.almacen.codigo_tipo(tipo_cuenta)
+        return self._por_tipo[codigo] if codigo is not None else None
+
+    def _sincronizar(self):
+        """Reordena las cuentas modificadas e incorpora las cuentas nuevas."""
+        almacen = self.almacen
+        saldos = almacen.saldos
+        tipos = almacen.tipos
+        indexados = self._indexados
+
+        primer_numero = almacen.primer_numero
+        for numero_cuenta in self._pendientes:
+            indice = numero_cuenta - primer_numero
+            if indice >= len(indexados):
+                continue  # Cuenta nueva: se agrega más abajo con su saldo actual
+            saldo = saldos[indice]
+            if saldo != indexados[indice]:
+                anterior = _clave(indexados[indice], indice)
+                nueva = _clave(saldo, indice)
+                lista_tipo = self._por_tipo[tipos[indice]]
+                self._general.quitar(anterior)
+                lista_tipo.quitar(anterior)
+                self._general.insertar(nueva)
+                lista_tipo.insertar(nueva)
+                indexados[indice] = saldo
+        self._pendientes.clear()
+
+        for indice in range(len(indexados), len(saldos)):
+            while tipos[indice] >= len(self._por_tipo):
+                self._por_tipo.append(ListaSaltos())
+            clave = _clave(saldos[indice], indice)
+            self._general.insertar(clave)
+            self._por_tipo[tipos[indice]].insertar(clave)
+            indexados.append(saldos[indice])
+
+    def _numeros(self, claves):
+        """Convierte claves del índice en números de cuenta."""
+        primer_numero = self.almacen.primer_numero
+        return [primer_numero + (clave & _MASCARA_INDICE) for clave in claves]
+
+
+def _clave(saldo_centavos, indice):
+    """Combina saldo e índice en una clave ordenable por saldo y luego por cuenta."""
+    return (saldo_centavos << _BITS_INDICE) | indice
@@ -0,0 +1,268 @@
+"""
+Módulo de instantáneas binarias para el Sistema de Gestión Bancaria.
+Guarda el estado completo (columnas de cuentas, libro, contadores e índices)
+en un archivo versionado que se carga con lecturas en bloque sobre mmap.
+
+Formato (versión 1), todos los enteros en little-endian:
+    cabecera  "SBIN" | versión (u16) | cantidad de bloques (u32)
+    bloques   longitud (u64) seguida de los datos; los arreglos empiezan con
+              su código de tipo (1 byte) y tamaño de elemento (1 byte)
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from decimal import Decimal
+
+from models.banco import (
+    CodigoOperacion, Transaccion, ESTADOS_CUENTA, a_decimal
+)
+from operations.sistema import SistemaBancario
+
+MAGIA = b"SBIN"
+VERSION = 1
+
+_CABECERA = struct.Struct("<4sHI")
+_LONGITUD = struct.Struct("<Q")
+_SEPARADOR = "\x00"
+
+# Códigos de operación indexados por su valor entero
+_CODIGOS = {int(codigo): codigo for codigo in CodigoOperacion}
+
+
+def guardar_instantanea(sistema, ruta):
+    """
+    Escribe el estado completo del sistema en un archivo de instantánea.
+    """
+    almacen = sistema.cuentas
+    transacciones = sistema.transacciones
+
+    # Las fechas se repiten mucho: se guardan una vez y se referencian por índice
+    fechas = {}
+
+    def indice_fecha(fecha):
+        indice = fechas.get(fecha)
+        if indice is None:
+            indice = fechas[fecha] = len(fechas)
+        return indice
+
+    fechas_apertura = array("I", map(indice_fecha, almacen.fechas_apertura))
+    ultima_actividad = array("I", (
+        indice_fecha(sistema._ultima_actividad[numero]) for numero in almacen
+    ))
+
+    ids = array("q")
+    cuentas_libro = array("q")
+    codigos = array("B")
+    montos = array("q")
+    anteriores = array("q")
+    nuevos = array("q")
+    asientos = array("q")
+    contrapartes = array("q")
+    fechas_libro = array("I")
+    for transaccion in transacciones:
+        ids.append(transaccion.id)
+        cuentas_libro.append(transaccion.numero_cuenta)
+        codigos.append(transaccion.codigo)
+        montos.append(int(transaccion.monto * 100))
+        anteriores.append(int(transaccion.saldo_anterior * 100))
+        nuevos.append(int(transaccion.saldo_nuevo * 100))
+        asientos.append(transaccion.id_asiento)
+        contrapartes.append(transaccion.contraparte or 0)
+        fechas_libro.append(indice_fecha(transaccion.fecha))
+
+    meta = {
+        "primer_numero": almacen.primer_numero,
+        "siguiente_numero_cuenta": sistema.siguiente_numero_cuenta,
+        "siguiente_id_transaccion": sistema.siguiente_id_transaccion,
+        "siguiente_id_asiento": sistema.siguiente_id_asiento,
+        "nombres_tipo": almacen.nombres_tipo,
+        "saldos_contrapartida": {nombre: str(saldo) for nombre, saldo in sistema.saldos_contrapartida.items()},
+        "transacciones_archivadas": sistema.transacciones_archivadas,
+        "resumenes_archivados": {str(numero): resumen for numero, resumen in sistema.resumenes_archivados.items()},
+        "agregados": sistema.agregados.exportar()
+    }
+
+    bloques = [
+        json.dumps(meta, ensure_ascii=False, default=str).encode("utf-8"),
+        _SEPARADOR.join(fechas).encode("utf-8"),
+        _SEPARADOR.join(almacen.titulares).encode("utf-8"),
+        _codificar_arreglo(almacen.saldos),
+        _codificar_arreglo(almacen.tipos),
+        _codificar_arreglo(almacen.estados),
+        _codificar_arreglo(fechas_apertura),
+        _codificar_arreglo(ultima_actividad),
+        _codificar_arreglo(ids),
+        _codificar_arreglo(cuentas_libro),
+        _codificar_arreglo(codigos),
+        _codificar_arreglo(montos),
+        _codificar_arreglo(anteriores),
+        _codificar_arreglo(nuevos),
+        _codificar_arreglo(asientos),
+        _codificar_arreglo(contrapartes),
+        _codificar_arreglo(fechas_libro)
+    ]
+
+    # Se escribe en un archivo temporal y se renombra: una interrupción conserva la instantánea anterior
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(_CABECERA.pack(MAGIA, VERSION, len(bloques)))
+        for bloque in bloques:
+            archivo.write(_LONGITUD.pack(len(bloque)))
+            archivo.write(bloque)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+
+
+def cargar_instantanea(ruta, capacidad_cache=1024, limites=None, politicas=None):
+    """
+    Reconstruye un SistemaBancario a partir de un archivo de instantánea.
+    Lanza ValueError si el archivo no es una instantánea de una versión conocida o está truncado.
+    """
+    with open(ruta, "rb") as archivo, mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+        # Las vistas se liberan antes de cerrar el mapa; los arreglos ya son copias
+        with memoryview(datos) as vista:
+            bloques = _leer_bloques(vista)
+            meta = json.loads(bytes(bloques[0]))
+            fechas = _decodificar_textos(bloques[1])
+            titulares = _decodificar_textos(bloques[2])
+            (saldos, tipos, estados, fechas_apertura, ultima_actividad, ids, cuentas_libro,
+             codigos, montos, anteriores, nuevos, asientos, contrapartes, fechas_libro) = [
+                _decodificar_arreglo(bloque) for bloque in bloques[3:]
+            ]
+            for bloque in bloques:
+                bloque.release()
+
+    sistema = SistemaBancario(capacidad_cache=capacidad_cache, limites=limites, politicas=politicas)
+    sistema.siguiente_numero_cuenta = meta["siguiente_numero_cuenta"]
+    sistema.siguiente_id_transaccion = meta["siguiente_id_transaccion"]
+    sistema.siguiente_id_asiento = meta["siguiente_id_asiento"]
+    sistema.transacciones_archivadas = meta["transacciones_archivadas"]
+    sistema.saldos_contrapartida = {
+        nombre: Decimal(saldo) for nombre, saldo in meta["saldos_contrapartida"].items()
+    }
+    sistema.resumenes_archivados = {
+        int(numero): _resumen_desde_json(resumen) for numero, resumen in meta["resumenes_archivados"].items()
+    }
+
+    # Columnas de cuentas
+    almacen = sistema.cuentas
+    almacen.primer_numero = primer_numero = meta["primer_numero"]
+    almacen.saldos = saldos
+    almacen.tipos = tipos
+    almacen.estados = estados
+    almacen.titulares = list(map(sys.intern, titulares))
+    almacen.fechas_apertura = [fechas[indice] for indice in fechas_apertura]
+    almacen.nombres_tipo = meta["nombres_tipo"]
+    almacen._codigos_tipo = {nombre: codigo for codigo, nombre in enumerate(almacen.nombres_tipo)}
+    sistema.compilar_politicas()
+
+    # Índices derivados de las columnas
+    for indice, codigo_estado in enumerate(estados):
+        sistema.cuentas_por_estado[ESTADOS_CUENTA[codigo_estado]].add(primer_numero + indice)
+    sistema._ultima_actividad = {
+        primer_numero + indice: fechas[indice_fecha] for indice, indice_fecha in enumerate(ultima_actividad)
+    }
+
+    # Libro e índice por cuenta
+    transacciones = sistema.transacciones
+    por_cuenta = sistema._transacciones_por_cuenta
+    nueva = Transaccion.desde_valores
+    agregar = transacciones.append
+
+    # Los importes se repiten mucho: cada Decimal se crea una vez y se comparte
+    decimales = {}
+
+    def decimal(centavos):
+        valor = decimales.get(centavos)
+        if valor is None:
+            valor = decimales[centavos] = a_decimal(centavos)
+        return valor
+
+    for id_transaccion, numero_cuenta, codigo, monto, anterior, nuevo, asiento, contraparte, indice_fecha in zip(
+        ids, cuentas_libro, codigos, montos, anteriores, nuevos, asientos, contrapartes, fechas_libro
+    ):
+        transaccion = nueva(
+            id_transaccion, numero_cuenta, _CODIGOS[codigo], decimal(monto), decimal(nuevo),
+            decimal(anterior), fechas[indice_fecha], asiento, contraparte or None
+        )
+        agregar(transaccion)
+        historial = por_cuenta.get(numero_cuenta)
+        if historial is None:
+            por_cuenta[numero_cuenta] = [transaccion]
+        else:
+            historial.append(transaccion)
+
+    # Las instantáneas anteriores a los agregados por tiempo los reconstruyen desde el libro
+    if "agregados" in meta:
+        sistema.agregados.importar(meta["agregados"])
+    else:
+        for transaccion in transacciones:
+            sistema.agregados.registrar(transaccion.fecha, transaccion.codigo, int(transaccion.monto * 100))
+
+    return sistema
+
+
+def _codificar_arreglo(arreglo):
+    """Serializa un arreglo con su código de tipo y tamaño de elemento en little-endian."""
+    if sys.byteorder != "little":
+        arreglo = array(arreglo.typecode, arreglo)
+        arreglo.byteswap()
+    return arreglo.typecode.encode("ascii") + bytes([arreglo.itemsize]) + arreglo.tobytes()
+
+
+def _decodificar_arreglo(bloque):
+    """Reconstruye un arreglo con una lectura en bloque."""
+    codigo_tipo = chr(bloque[0])
+    arreglo = array(codigo_tipo)
+    if arreglo.itemsize != bloque[1]:
+        raise ValueError(f"Instantánea no compatible: el tipo '{codigo_tipo}' ocupa {bloque[1]} bytes")
+    with bloque[2:] as datos:
+        arreglo.frombytes(datos)
+    if sys.byteorder != "little":
+        arreglo.byteswap()
+    return arreglo
+
+
+def _decodificar_textos(bloque):
+    """Separa un bloque de textos unidos por el separador."""
+    texto = str(bloque, "utf-8")
+    return texto.split(_SEPARADOR) if texto else []
+
+
+def _leer_bloques(datos):
+    """Valida la cabecera y retorna una vista de cada bloque sin copiarlo."""
+    if len(datos) < _CABECERA.size:
+        raise ValueError("El archivo no es una instantánea del sistema bancario")
+    magia, version, cantidad = _CABECERA.unpack_from(datos)
+    if magia != MAGIA:
+        raise ValueError("El archivo no es una instantánea del sistema bancario")
+    if version != VERSION:
+        raise ValueError(f"Versión de instantánea no soportada: {version}")
+
+    bloques = []
+    posicion = _CABECERA.size
+    for _ in range(cantidad):
+        longitud = None
+        if posicion + _LONGITUD.size <= len(datos):
+            (longitud,) = _LONGITUD.unpack_from(datos, posicion)
+            posicion += _LONGITUD.size
+        if longitud is None or posicion + longitud > len(datos):
+            # Las vistas ya tomadas se liberan para que el mapa pueda cerrarse
+            for bloque in bloques:
+                bloque.release()
+            raise ValueError("La instantánea está truncada")
+        bloques.append(datos[posicion:posicion + longitud])
+        posicion += longitud
+    return bloques
+
+
+def _resumen_desde_json(resumen):
+    """Restaura los importes Decimal de un resumen archivado."""
+    for campo in ("saldo_inicial", "saldo_final", "total_creditos", "total_debitos"):
+        resumen[campo] = Decimal(resumen[campo])
+    return resumen
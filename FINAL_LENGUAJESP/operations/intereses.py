@@ -0,0 +1,140 @@
+"""
+Módulo de intereses y comisiones para el Sistema de Gestión Bancaria.
+Aplica en lote los intereses y las comisiones de mantenimiento por tipo de cuenta.
+Las cuentas de cada tipo se seleccionan de las columnas del almacén con máscaras
+de bytes; el cálculo por cuenta es Python puro, sin numpy.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import compress
+
+from models.banco import CodigoOperacion, ESTADO_ACTIVA, ESTADOS_CUENTA
+
+# Tasa de interés anual por tipo de cuenta, en puntos básicos (1 pb = 0.01 %)
+TASAS_INTERES_ANUAL_PB = {
+    "Ahorro": 300,
+    "Corriente": 0,
+    "Nómina": 100
+}
+
+# Comisión de mantenimiento por período, en centavos
+COMISIONES_MANTENIMIENTO = {
+    "Ahorro": 0,
+    "Corriente": 500,
+    "Nómina": 0
+}
+
+
+def calcular_intereses(saldos_centavos, tasa_pb, dias):
+    """
+    Calcula el interés en centavos de cada saldo con redondeo al centavo más cercano.
+    """
+    if tasa_pb <= 0 or dias <= 0:
+        return [0] * len(saldos_centavos)
+
+    factor = tasa_pb * dias
+    divisor = 10000 * 365
+    mitad = divisor // 2
+    return [(saldo * factor + mitad) // divisor if saldo > 0 else 0 for saldo in saldos_centavos]
+
+
+def calcular_comisiones(saldos_centavos, comision):
+    """
+    Calcula la comisión en centavos de cada saldo; no se cobra si el saldo no la cubre.
+    """
+    if comision <= 0:
+        return [0] * len(saldos_centavos)
+
+    return [comision if saldo >= comision else 0 for saldo in saldos_centavos]
+
+
+def _mascara(columna, codigo):
+    """
+    Retorna como entero la máscara de una columna de códigos de un byte:
+    un byte 1 en cada posición con el código indicado y 0 en el resto.
+    """
+    return int.from_bytes(columna.tobytes().translate(bytes(codigo) + b"\x01" + bytes(255 - codigo)), "little")
+
+
+class MotorIntereses:
+    """Motor programado de devengo de intereses y cobro de comisiones."""
+
+    def __init__(self, sistema, tasas_pb=None, comisiones=None, periodo_dias=30):
+        """
+        Inicializa el motor sobre un sistema bancario.
+        """
+        if periodo_dias <= 0:
+            raise ValueError("El período de devengo debe ser mayor a cero")
+
+        self.sistema = sistema
+        self.tasas_pb = dict(TASAS_INTERES_ANUAL_PB if tasas_pb is None else tasas_pb)
+        self.comisiones = dict(COMISIONES_MANTENIMIENTO if comisiones is None else comisiones)
+        self.periodo_dias = periodo_dias
+        self.ultima_ejecucion = None
+        self.proxima_ejecucion = None
+
+    def ejecutar(self, dias=None):
+        """
+        Aplica intereses y comisiones a todas las cuentas activas en una pasada.
+        Retorna un resumen con la cantidad de movimientos y los totales en centavos.
+        """
+        dias = self.periodo_dias if dias is None else dias
+
+        # Las cuentas activas de cada tipo se extraen de las columnas del almacén con
+        # una máscara de bytes (la intersección de dos máscaras es un AND de enteros)
+        almacen = self.sistema.cuentas
+        cantidad_cuentas = len(almacen.saldos)
+        numeros_columna = range(almacen.primer_numero, almacen.primer_numero + cantidad_cuentas)
+        activas = _mascara(almacen.estados, ESTADOS_CUENTA.index(ESTADO_ACTIVA))
+
+        movimientos = []
+        total_intereses = 0
+        total_comisiones = 0
+        for codigo, tipo_cuenta in enumerate(almacen.nombres_tipo):
+            tasa_pb = self.tasas_pb.get(tipo_cuenta, 0)
+            comision_tipo = self.comisiones.get(tipo_cuenta, 0)
+            if tasa_pb <= 0 and comision_tipo <= 0:
+                continue
+
+            selector = (_mascara(almacen.tipos, codigo) & activas).to_bytes(cantidad_cuentas, "little")
+            numeros = list(compress(numeros_columna, selector))
+            if not numeros:
+                continue
+            saldos = list(compress(almacen.saldos, selector))
+
+            intereses = calcular_intereses(saldos, tasa_pb, dias)
+            saldos_con_interes = [saldo + interes for saldo, interes in zip(saldos, intereses)]
+            comisiones = calcular_comisiones(saldos_con_interes, comision_tipo)
+
+            total_intereses += sum(intereses)
+            total_comisiones += sum(comisiones)
+
+            for numero_cuenta, saldo, interes, comision in zip(numeros, saldos, intereses, comisiones):
+                if interes:
+                    movimientos.append((numero_cuenta, CodigoOperacion.INTERES, interes, saldo, saldo + interes))
+                    saldo += interes
+                if comision:
+                    movimientos.append((numero_cuenta, CodigoOperacion.COMISION, comision, saldo, saldo - comision))
+
+        self.sistema._aplicar_movimientos_lote(movimientos)
+
+        self.ultima_ejecucion = datetime.now()
+        self.proxima_ejecucion = self.ultima_ejecucion + timedelta(days=self.periodo_dias)
+
+        return {
+            "movimientos": len(movimientos),
+            "intereses": Decimal(total_intereses).scaleb(-2),
+            "comisiones": Decimal(total_comisiones).scaleb(-2)
+        }
+
+    def ejecutar_si_corresponde(self, ahora=None):
+        """
+        Ejecuta el devengo si venció el período programado.
+        Retorna el resumen de la ejecución o None si aún no corresponde.
+        """
+        ahora = ahora or datetime.now()
+        if self.proxima_ejecucion is not None and ahora < self.proxima_ejecucion:
+            return None
+
+        return self.ejecutar()
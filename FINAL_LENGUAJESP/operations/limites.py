@@ -0,0 +1,209 @@
+"""
+Módulo de límites operativos para el Sistema de Gestión Bancaria.
+Evalúa reglas de velocidad y montos máximos con contadores de ventana deslizante.
+"""
+
+import time
+
+from models.banco import CodigoOperacion
+from operations.resultados import CodigoResultado, rechazo
+
+MINUTO = 60
+HORA = 60 * MINUTO
+DIA = 24 * HORA
+
+
+class ContadorVentana:
+    """
+    Contador de operaciones y montos en una ventana deslizante.
+    La ventana se divide en intervalos fijos y solo se guardan, en orden, los
+    intervalos con operaciones; una cuenta poco activa ocupa unas pocas
+    entradas y agregar y consultar cuesta O(1) amortizado.
+    """
+
+    __slots__ = ("ancho", "intervalos", "_activos", "cantidad", "monto")
+
+    def __init__(self, duracion, intervalos=60):
+        self.ancho = duracion / intervalos
+        self.intervalos = intervalos
+        self._activos = []  # Lista plana intervalo, cantidad, monto en orden de intervalo
+        self.cantidad = 0
+        self.monto = 0
+
+    def _avanzar(self, ahora):
+        """Descarta los intervalos que salieron de la ventana."""
+        primero_vigente = int(ahora // self.ancho) - self.intervalos + 1
+        activos = self._activos
+        vencidos = 0
+        while vencidos < len(activos) and activos[vencidos] < primero_vigente:
+            self.cantidad -= activos[vencidos + 1]
+            self.monto -= activos[vencidos + 2]
+            vencidos += 3
+        if vencidos:
+            del activos[:vencidos]
+
+    def agregar(self, ahora, monto):
+        """Registra una operación en el intervalo correspondiente a ahora."""
+        self._avanzar(ahora)
+        intervalo = int(ahora // self.ancho)
+        activos = self._activos
+        if activos and activos[-3] >= intervalo:
+            # Mismo intervalo que la última operación (o un reloj que retrocedió)
+            activos[-2] += 1
+            activos[-1] += monto
+        else:
+            activos.extend((intervalo, 1, monto))
+        self.cantidad += 1
+        self.monto += monto
+
+    def totales(self, ahora):
+        """Retorna la cantidad y el monto acumulados en la ventana."""
+        self._avanzar(ahora)
+        return self.cantidad, self.monto
+
+
+class ReglaLimite:
+    """Regla de límite sobre la cantidad o el monto de operaciones en una ventana."""
+
+    def __init__(self, nombre, ventana, max_operaciones=None, max_monto=None,
+                 codigos=(CodigoOperacion.RETIRO, CodigoOperacion.TRANSFERENCIA_SALIDA),
+                 tipo_cuenta=None, numero_cuenta=None):
+        """
+        Define una regla de límite.
+
+        Args:
+            nombre: Descripción mostrada al rechazar una operación
+            ventana: Duración de la ventana en segundos
+            max_operaciones: Cantidad máxima de operaciones en la ventana
+            max_monto: Monto máximo acumulado en la ventana
+            codigos: Operaciones a las que se aplica la regla
+            tipo_cuenta: Si se indica, la regla solo aplica a ese tipo de cuenta
+            numero_cuenta: Si se indica, la regla solo aplica a esa cuenta
+        """
+        if max_operaciones is None and max_monto is None:
+            raise ValueError("La regla debe limitar la cantidad de operaciones o el monto")
+
+        self.nombre = nombre
+        self.ventana = ventana
+        self.max_operaciones = max_operaciones
+        self.max_monto_centavos = int(round(max_monto * 100)) if max_monto is not None else None
+        self.codigos = tuple(CodigoOperacion(codigo) for codigo in codigos)
+        self.tipo_cuenta = tipo_cuenta
+        self.numero_cuenta = numero_cuenta
+
+    def aplica(self, numero_cuenta, tipo_cuenta):
+        """Indica si la regla aplica a la cuenta indicada."""
+        return ((self.tipo_cuenta is None or self.tipo_cuenta == tipo_cuenta)
+                and (self.numero_cuenta is None or self.numero_cuenta == numero_cuenta))
+
+
+# Reglas de cumplimiento sugeridas para la operación interactiva
+REGLAS_POR_DEFECTO = [
+    ReglaLimite("Límite de operaciones por minuto", MINUTO, max_operaciones=10),
+    ReglaLimite("Límite diario de retiros y transferencias", DIA, max_monto=20000),
+    ReglaLimite("Límite diario de retiros en cuentas de Ahorro", DIA, max_monto=5000,
+                codigos=(CodigoOperacion.RETIRO,), tipo_cuenta="Ahorro")
+]
+
+
+class MotorLimites:
+    """Evalúa las reglas de límite y mantiene sus contadores por cuenta."""
+
+    def __init__(self, reglas=None, reloj=time.monotonic):
+        """
+        Inicializa el motor con las reglas indicadas y una función de reloj en segundos.
+        """
+        self.reglas = list(reglas or [])
+        self.reloj = reloj
+        # Por regla: numero_cuenta -> ContadorVentana, solo de las cuentas con operaciones
+        # en la ventana; los vacíos se eliminan una vez por ventana de la regla
+        self._contadores = [{} for _ in self.reglas]
+        self._proximas_limpiezas = [float("-inf")] * len(self.reglas)
+        self._proxima_limpieza = float("-inf")
+
+        # Reglas agrupadas por código para que las operaciones sin reglas no paguen nada
+        self._reglas_por_codigo = {}
+        for indice, regla in enumerate(self.reglas):
+            for codigo in regla.codigos:
+                self._reglas_por_codigo.setdefault(codigo, []).append((indice, regla))
+
+    def evaluar(self, numero_cuenta, tipo_cuenta, codigo, monto_centavos):
+        """
+        Retorna None si la operación cumple las reglas aplicables o el
+        Resultado de rechazo de la primera regla que excede.
+        """
+        reglas = self._reglas_por_codigo.get(codigo)
+        if not reglas:
+            return None
+
+        ahora = self.reloj()
+        for indice, regla in reglas:
+            if not regla.aplica(numero_cuenta, tipo_cuenta):
+                continue
+            contador = self._contadores[indice].get(numero_cuenta)
+            cantidad, monto = contador.totales(ahora) if contador else (0, 0)
+
+            if regla.max_operaciones is not None and cantidad + 1 > regla.max_operaciones:
+                return rechazo(
+                    CodigoResultado.LIMITE_OPERACIONES,
+                    regla.nombre, regla.max_operaciones, _describir_ventana(regla.ventana)
+                )
+            if regla.max_monto_centavos is not None and monto + monto_centavos > regla.max_monto_centavos:
+                disponible = max(0, regla.max_monto_centavos - monto)
+                return rechazo(
+                    CodigoResultado.LIMITE_MONTO,
+                    regla.nombre, _describir_ventana(regla.ventana), f"{disponible // 100}.{disponible % 100:02d}"
+                )
+        return None
+
+    def registrar(self, numero_cuenta, tipo_cuenta, codigo, monto_centavos):
+        """
+        Actualiza los contadores de las reglas aplicables con una operación realizada.
+        """
+        reglas = self._reglas_por_codigo.get(codigo)
+        if not reglas:
+            return
+
+        ahora = self.reloj()
+        for indice, regla in reglas:
+            if not regla.aplica(numero_cuenta, tipo_cuenta):
+                continue
+            contadores = self._contadores[indice]
+            contador = contadores.get(numero_cuenta)
+            if contador is None:
+                contador = contadores[numero_cuenta] = ContadorVentana(regla.ventana)
+            contador.agregar(ahora, monto_centavos)
+
+        if ahora >= self._proxima_limpieza:
+            self._limpiar(ahora)
+
+    def contadores_activos(self):
+        """Retorna la cantidad de contadores de ventana en memoria."""
+        return sum(len(contadores) for contadores in self._contadores)
+
+    def _limpiar(self, ahora):
+        """
+        Elimina los contadores vacíos de las reglas cuya ventana pasó desde la última limpieza.
+        Cada regla se limpia una vez por ventana, por lo que solo recorre cuentas con
+        operaciones recientes y su costo se reparte entre esas operaciones.
+        """
+        for indice, regla in enumerate(self.reglas):
+            if ahora < self._proximas_limpiezas[indice]:
+                continue
+            contadores = self._contadores[indice]
+            vacios = [numero for numero, contador in contadores.items() if contador.totales(ahora)[0] == 0]
+            for numero in vacios:
+                del contadores[numero]
+            self._proximas_limpiezas[indice] = ahora + regla.ventana
+        self._proxima_limpieza = min(self._proximas_limpiezas)
+
+
+def _describir_ventana(segundos):
+    """Describe la duración de una ventana en texto."""
+    if segundos % DIA == 0:
+        return "24 horas" if segundos == DIA else f"{segundos // DIA} días"
+    if segundos % HORA == 0:
+        return f"{segundos // HORA} hora(s)"
+    if segundos % MINUTO == 0:
+        return "1 minuto" if segundos == MINUTO else f"{segundos // MINUTO} minutos"
+    return f"{segundos} segundos"
@@ -0,0 +1,287 @@
+"""
+Módulo de tabla de saldos en memoria compartida para el Sistema de Gestión Bancaria.
+Publica los saldos y estados de las cuentas en un segmento de memoria compartida
+que otros procesos locales leen sin copias ni peticiones, protegido por un
+contador de secuencia (seqlock): el escritor lo deja impar mientras escribe y
+los lectores repiten la lectura si cambió o estaba impar.
+
+Formato del segmento (versión 1), enteros en el orden nativo:
+    cabecera  "SALD" | versión (u16) | relleno | secuencia (u64) |
+              primer número (i64) | capacidad (i64) | cuentas publicadas (i64)
+    saldos    capacidad x i64 en centavos, indexados por numero_cuenta - primer número
+    estados   capacidad x u8 con la posición del estado en ESTADOS_CUENTA
+"""
+
+import argparse
+import json
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from models.banco import CodigoOperacion, ESTADOS_CUENTA, a_decimal
+from operations.eventos import EventoCuentaCreada, EventoMovimiento, EventoEstadoCambiado
+
+MAGIA = b"SALD"
+VERSION = 1
+
+_CABECERA = struct.Struct("=4sH2xQqqq")
+_POSICION_SECUENCIA = 8
+_POSICION_CANTIDAD = 32
+
+# Segmentos creados por este proceso; su registro de limpieza pertenece al publicador
+_CREADOS = set()
+
+
+class PublicadorSaldos:
+    """
+    Mantiene una tabla de saldos y estados de un SistemaBancario en memoria compartida.
+    Los cambios llegan como oyente del flujo de eventos; los dos apuntes de una
+    transferencia se publican en una misma escritura para que ningún lector vea
+    el dinero fuera de ambas cuentas.
+    """
+
+    def __init__(self, sistema, capacidad=None, nombre=None):
+        """
+        Crea el segmento y publica el estado actual.
+
+        Args:
+            sistema: SistemaBancario cuyos saldos se publican
+            capacidad: Cantidad máxima de cuentas del segmento; por defecto el doble
+                de las cuentas actuales (como mínimo 1024)
+            nombre: Nombre del segmento; si se omite lo elige el sistema operativo
+        """
+        almacen = sistema.cuentas
+        if capacidad is None:
+            capacidad = max(2 * len(almacen), 1024)
+        if capacidad < len(almacen):
+            raise ValueError(f"La capacidad {capacidad} es menor que las {len(almacen)} cuentas actuales")
+
+        self.sistema = sistema
+        self.capacidad = capacidad
+        self.sin_publicar = 0  # Cuentas creadas después de llenar el segmento
+        self._pendientes = set()
+
+        self._memoria = shared_memory.SharedMemory(create=True, size=_tamano_segmento(capacidad), name=nombre)
+        _CREADOS.add(self._memoria.name)
+        _CABECERA.pack_into(self._memoria.buf, 0, MAGIA, VERSION, 0, almacen.primer_numero, capacidad, 0)
+        self._secuencia, self._cantidad, self._saldos, self._estados = _vistas(self._memoria, capacidad)
+
+        self._escribir()  # Publica todas las cuentas existentes
+        sistema.eventos.registrar_oyente(self._al_publicar)
+
+    @property
+    def nombre(self):
+        """Nombre con el que los lectores abren el segmento."""
+        return self._memoria.name
+
+    def metricas(self):
+        """
+        Retorna la secuencia actual, las cuentas publicadas y las que no caben en el segmento.
+        """
+        return {
+            "nombre": self.nombre,
+            "secuencia": self._secuencia[0],
+            "cuentas_publicadas": self._cantidad[0],
+            "capacidad": self.capacidad,
+            "sin_publicar": self.sin_publicar
+        }
+
+    def cerrar(self):
+        """Deja de publicar y elimina el segmento; los lectores abiertos conservan su copia mapeada."""
+        self.sistema.eventos.eliminar_oyente(self._al_publicar)
+        for vista in (self._secuencia, self._cantidad, self._saldos, self._estados):
+            vista.release()
+        self._memoria.close()
+        self._memoria.unlink()
+        _CREADOS.discard(self._memoria.name)
+
+    def _al_publicar(self, evento):
+        """
+        Acumula la cuenta afectada y escribe salvo a mitad de una transferencia.
+        Los eventos que no cambian el saldo ni el estado de una cuenta se ignoran.
+        """
+        if not isinstance(evento, (EventoMovimiento, EventoCuentaCreada, EventoEstadoCambiado)):
+            return
+        self._pendientes.add(evento.numero_cuenta)
+        if isinstance(evento, EventoMovimiento) and evento.codigo == CodigoOperacion.TRANSFERENCIA_SALIDA:
+            return  # El apunte de entrada del mismo asiento llega a continuación
+        self._escribir()
+
+    def _escribir(self):
+        """Copia al segmento las cuentas pendientes dentro de una sección de escritura."""
+        almacen = self.sistema.cuentas
+        saldos = almacen.saldos
+        estados = almacen.estados
+        primer_numero = almacen.primer_numero
+        capacidad = self.capacidad
+
+        # Las cuentas nuevas se publican aunque no hayan generado eventos
+        publicadas = min(len(saldos), capacidad)
+        self._pendientes.update(range(primer_numero + self._cantidad[0], primer_numero + publicadas))
+
+        secuencia = self._secuencia[0] + 1
+        self._secuencia[0] = secuencia  # Impar: escritura en curso
+        for numero_cuenta in self._pendientes:
+            indice = numero_cuenta - primer_numero
+            if indice >= capacidad:
+                continue
+            self._saldos[indice] = saldos[indice]
+            self._estados[indice] = estados[indice]
+        self.sin_publicar = len(saldos) - publicadas
+        self._cantidad[0] = publicadas
+        self._secuencia[0] = secuencia + 1
+        self._pendientes.clear()
+
+
+class LectorSaldos:
+    """
+    Acceso de solo lectura a una tabla publicada por PublicadorSaldos,
+    normalmente desde otro proceso.
+    """
+
+    def __init__(self, nombre, max_reintentos=100_000):
+        """
+        Abre el segmento indicado.
+        Lanza ValueError si no contiene una tabla de saldos de una versión conocida.
+        """
+        self._memoria = _abrir_segmento(nombre)
+        magia, version, _, self.primer_numero, self.capacidad, _ = _CABECERA.unpack_from(self._memoria.buf)
+        if magia != MAGIA:
+            self._memoria.close()
+            raise ValueError(f"El segmento {nombre} no es una tabla de saldos")
+        if version != VERSION:
+            self._memoria.close()
+            raise ValueError(f"Versión de tabla de saldos no soportada: {version}")
+
+        self.max_reintentos = max_reintentos
+        self.reintentos = 0  # Lecturas repetidas por coincidir con una escritura
+        self._secuencia, self._cantidad, self._saldos, self._estados = _vistas(self._memoria, self.capacidad)
+
+    def saldo(self, numero_cuenta):
+        """Retorna el saldo publicado de una cuenta o None si no está publicada."""
+        lectura = self.leer(numero_cuenta)
+        return lectura[0] if lectura is not None else None
+
+    def leer(self, numero_cuenta):
+        """Retorna el par (saldo, estado) de una cuenta o None si no está publicada."""
+        indice = numero_cuenta - self.primer_numero
+
+        def lectura():
+            if 0 <= indice < self._cantidad[0]:
+                return self._saldos[indice], self._estados[indice]
+            return None
+
+        valores = self._leer_consistente(lectura)
+        if valores is None:
+            return None
+        return a_decimal(valores[0]), ESTADOS_CUENTA[valores[1]]
+
+    def saldos(self, numeros_cuenta):
+        """
+        Lee de forma consistente varias cuentas.
+        Retorna columnas paralelas (numero_cuenta, saldo, estado) y los números no publicados,
+        como SistemaBancario.saldos.
+        """
+        primer_numero = self.primer_numero
+
+        def lectura():
+            cantidad = self._cantidad[0]
+            encontrados, valores, estados, no_encontradas = [], [], [], []
+            for numero_cuenta in numeros_cuenta:
+                indice = numero_cuenta - primer_numero
+                if 0 <= indice < cantidad:
+                    encontrados.append(numero_cuenta)
+                    valores.append(self._saldos[indice])
+                    estados.append(self._estados[indice])
+                else:
+                    no_encontradas.append(numero_cuenta)
+            return encontrados, valores, estados, no_encontradas
+
+        encontrados, valores, estados, no_encontradas = self._leer_consistente(lectura)
+        return {
+            "numero_cuenta": encontrados,
+            "saldo": [a_decimal(valor) for valor in valores],
+            "estado": [ESTADOS_CUENTA[estado] for estado in estados],
+            "no_encontradas": no_encontradas
+        }
+
+    def saldo_total(self):
+        """Suma de forma consistente los saldos de todas las cuentas publicadas."""
+        return a_decimal(self._leer_consistente(lambda: sum(self._saldos[:self._cantidad[0]])))
+
+    def secuencia(self):
+        """Retorna la secuencia de la última escritura completa."""
+        return self._leer_consistente(lambda: self._secuencia[0])
+
+    def cerrar(self):
+        """Libera el segmento en este proceso."""
+        for vista in (self._secuencia, self._cantidad, self._saldos, self._estados):
+            vista.release()
+        self._memoria.close()
+
+    def _leer_consistente(self, lectura):
+        """Repite la lectura hasta que ninguna escritura se cruce con ella."""
+        for _ in range(self.max_reintentos):
+            inicio = self._secuencia[0]
+            if not inicio & 1:
+                resultado = lectura()
+                if self._secuencia[0] == inicio:
+                    return resultado
+            self.reintentos += 1
+            time.sleep(0)
+        raise TimeoutError("La tabla de saldos no dejó de cambiar durante la lectura")
+
+
+def _tamano_segmento(capacidad):
+    """Bytes necesarios para la cabecera, los saldos y los estados."""
+    return _CABECERA.size + 9 * capacidad
+
+
+def _vistas(memoria, capacidad):
+    """Retorna las vistas tipadas de secuencia, cantidad, saldos y estados del segmento."""
+    buf = memoria.buf
+    inicio_saldos = _CABECERA.size
+    inicio_estados = inicio_saldos + 8 * capacidad
+    return (
+        buf[_POSICION_SECUENCIA:_POSICION_SECUENCIA + 8].cast("Q"),
+        buf[_POSICION_CANTIDAD:_POSICION_CANTIDAD + 8].cast("q"),
+        buf[inicio_saldos:inicio_estados].cast("q"),
+        buf[inicio_estados:inicio_estados + capacidad]
+    )
+
+
+def _abrir_segmento(nombre):
+    """Abre un segmento existente sin que este proceso lo elimine al terminar."""
+    try:
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    except TypeError:
+        # Antes de Python 3.13 el proceso lector registra el segmento como propio
+        memoria = shared_memory.SharedMemory(name=nombre)
+        if memoria.name not in _CREADOS:
+            resource_tracker.unregister(memoria._name, "shared_memory")
+        return memoria
+
+
+def main():
+    """Lee una tabla de saldos publicada desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Lector de la tabla de saldos compartida")
+    parser.add_argument("nombre", help="Nombre del segmento de memoria compartida")
+    parser.add_argument("cuentas", type=int, nargs="*", help="Números de cuenta a consultar")
+    parser.add_argument("--esperar-secuencia", type=int, default=0, metavar="N",
+                        help="Espera a que el escritor alcance la secuencia indicada")
+    args = parser.parse_args()
+
+    lector = LectorSaldos(args.nombre)
+    try:
+        while lector.secuencia() < args.esperar_secuencia:
+            time.sleep(0.01)
+        estado = lector.saldos(args.cuentas)
+        estado["saldo_total"] = lector.saldo_total()
+        estado["secuencia"] = lector.secuencia()
+        print(json.dumps(estado, default=str))
+    finally:
+        lector.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Módulo de órdenes permanentes para el Sistema de Gestión Bancaria.
+Programa transferencias periódicas y ejecuta en un solo lote todas las que vencen.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+
+from models.banco import CodigoOperacion, ESTADOS_CUENTA, ESTADO_ACTIVA, a_centavos, a_decimal
+
+_CODIGO_ACTIVA = ESTADOS_CUENTA.index(ESTADO_ACTIVA)
+
+
+class OrdenPermanente:
+    """Transferencia periódica entre dos cuentas."""
+
+    __slots__ = ("id_orden", "origen", "destino", "monto_centavos", "intervalo",
+                 "fecha_periodo", "proxima_ejecucion", "restantes", "reintentos", "activa")
+
+    def __init__(self, id_orden, origen, destino, monto_centavos, intervalo, proxima_ejecucion, restantes=None):
+        self.id_orden = id_orden
+        self.origen = origen
+        self.destino = destino
+        self.monto_centavos = monto_centavos
+        self.intervalo = intervalo
+        self.fecha_periodo = proxima_ejecucion  # Fecha programada del período en curso
+        self.proxima_ejecucion = proxima_ejecucion  # Incluye la espera de los reintentos
+        self.restantes = restantes  # None para una orden sin fin
+        self.reintentos = 0
+        self.activa = True
+
+    def to_dict(self):
+        """Retorna la orden como un diccionario."""
+        return {
+            "id_orden": self.id_orden,
+            "origen": self.origen,
+            "destino": self.destino,
+            "monto": a_decimal(self.monto_centavos),
+            "intervalo_dias": self.intervalo.days,
+            "proxima_ejecucion": self.proxima_ejecucion.strftime("%Y-%m-%d %H:%M:%S"),
+            "restantes": self.restantes,
+            "reintentos": self.reintentos,
+            "activa": self.activa
+        }
+
+
+class ProgramadorOrdenes:
+    """
+    Programador de órdenes permanentes sobre un SistemaBancario.
+    Las órdenes se guardan en un montículo ordenado por fecha de ejecución;
+    cada ciclo extrae todas las vencidas y las aplica como un solo lote.
+    Las órdenes están autorizadas de antemano por el cliente, por lo que no se
+    evalúan las reglas de límite, aunque sus movimientos sí suman a los contadores.
+    """
+
+    def __init__(self, sistema, max_reintentos=3, espera_reintento=timedelta(hours=1)):
+        """
+        Inicializa el programador.
+
+        Args:
+            sistema: SistemaBancario sobre el que se ejecutan las órdenes
+            max_reintentos: Reintentos por saldo insuficiente antes de omitir una ejecución
+            espera_reintento: Tiempo hasta el siguiente reintento
+        """
+        self.sistema = sistema
+        self.max_reintentos = max_reintentos
+        self.espera_reintento = espera_reintento
+        self.ordenes = {}  # id_orden -> OrdenPermanente
+        self._monticulo = []  # (proxima_ejecucion, id_orden)
+        self.siguiente_id_orden = 1
+
+    def crear_orden(self, numero_cuenta_origen, numero_cuenta_destino, monto, intervalo_dias=30,
+                    primera_ejecucion=None, repeticiones=None):
+        """
+        Programa una transferencia periódica y retorna la orden como diccionario.
+        """
+        if monto <= 0:
+            raise ValueError("El monto de la orden debe ser mayor a cero")
+
+        if intervalo_dias <= 0:
+            raise ValueError("El intervalo de la orden debe ser mayor a cero")
+
+        if repeticiones is not None and repeticiones <= 0:
+            raise ValueError("La cantidad de repeticiones debe ser mayor a cero")
+
+        if numero_cuenta_origen == numero_cuenta_destino:
+            raise ValueError("No se puede transferir a la misma cuenta")
+
+        if numero_cuenta_origen not in self.sistema.cuentas:
+            raise ValueError(f"La cuenta origen {numero_cuenta_origen} no existe")
+
+        if numero_cuenta_destino not in self.sistema.cuentas:
+            raise ValueError(f"La cuenta destino {numero_cuenta_destino} no existe")
+
+        orden = OrdenPermanente(
+            self.siguiente_id_orden,
+            numero_cuenta_origen,
+            numero_cuenta_destino,
+            a_centavos(monto),
+            timedelta(days=intervalo_dias),
+            primera_ejecucion or datetime.now(),
+            repeticiones
+        )
+        self.siguiente_id_orden += 1
+        self.ordenes[orden.id_orden] = orden
+        heapq.heappush(self._monticulo, (orden.proxima_ejecucion, orden.id_orden))
+        return orden.to_dict()
+
+    def cancelar_orden(self, id_orden):
+        """
+        Cancela una orden; su entrada en el montículo se descarta al vencer.
+        """
+        orden = self.ordenes.pop(id_orden, None)
+        if orden is None:
+            raise ValueError(f"La orden {id_orden} no existe")
+
+        orden.activa = False
+        return orden.to_dict()
+
+    def obtener_ordenes(self):
+        """
+        Obtiene las órdenes activas ordenadas por id.
+        """
+        return [self.ordenes[id_orden].to_dict() for id_orden in sorted(self.ordenes)]
+
+    def pendientes(self):
+        """Retorna la cantidad de órdenes activas programadas."""
+        return len(self.ordenes)
+
+    def ejecutar_pendientes(self, ahora=None):
+        """
+        Ejecuta como un solo lote todas las órdenes vencidas a la fecha indicada.
+        Las órdenes sin saldo suficiente se reprograman para reintentarse; tras
+        agotar los reintentos, o si alguna cuenta no está activa, la ejecución
+        se omite y la orden pasa a su siguiente período.
+        Retorna un resumen con las órdenes ejecutadas, reprogramadas y omitidas.
+        """
+        ahora = ahora or datetime.now()
+        almacen = self.sistema.cuentas
+        saldos = almacen.saldos
+        estados = almacen.estados
+        tipos = almacen.tipos
+        primer_numero = almacen.primer_numero
+        tablas = self.sistema._tablas_politicas
+        salida = CodigoOperacion.TRANSFERENCIA_SALIDA
+
+        transferencias = []
+        saldos_lote = {}  # Saldos en centavos de las cuentas ya tocadas en este lote
+        reprogramadas = []
+        reintentos = 0
+        omitidas = 0
+
+        while self._monticulo and self._monticulo[0][0] <= ahora:
+            fecha, id_orden = heapq.heappop(self._monticulo)
+            orden = self.ordenes.get(id_orden)
+            if orden is None or orden.proxima_ejecucion != fecha:
+                continue  # Orden cancelada
+
+            indice_origen = orden.origen - primer_numero
+            indice_destino = orden.destino - primer_numero
+            if estados[indice_origen] != _CODIGO_ACTIVA or estados[indice_destino] != _CODIGO_ACTIVA:
+                omitidas += 1
+                self._avanzar_periodo(orden, reprogramadas)
+                continue
+
+            saldo_origen = saldos_lote.get(orden.origen)
+            if saldo_origen is None:
+                saldo_origen = saldos[indice_origen]
+            monto = orden.monto_centavos
+
+            if tablas[tipos[indice_origen]][salida](saldo_origen, monto) is not None:
+                if orden.reintentos < self.max_reintentos:
+                    orden.reintentos += 1
+                    reintentos += 1
+                    orden.proxima_ejecucion = ahora + self.espera_reintento
+                    reprogramadas.append(orden)
+                else:
+                    omitidas += 1
+                    self._avanzar_periodo(orden, reprogramadas)
+                continue
+
+            saldo_destino = saldos_lote.get(orden.destino)
+            if saldo_destino is None:
+                saldo_destino = saldos[indice_destino]
+            transferencias.append((orden.origen, orden.destino, monto, saldo_origen, saldo_destino))
+            saldos_lote[orden.origen] = saldo_origen - monto
+            saldos_lote[orden.destino] = saldo_destino + monto
+            self._avanzar_periodo(orden, reprogramadas)
+
+        self.sistema._aplicar_transferencias_lote(transferencias)
+
+        # Se reinsertan al final para no volver a extraerlas en este mismo ciclo
+        for orden in reprogramadas:
+            heapq.heappush(self._monticulo, (orden.proxima_ejecucion, orden.id_orden))
+
+        return {
+            "ejecutadas": len(transferencias),
+            "reintentos": reintentos,
+            "omitidas": omitidas,
+            "monto_total": a_decimal(sum(transferencia[2] for transferencia in transferencias))
+        }
+
+    def _avanzar_periodo(self, orden, reprogramadas):
+        """Pasa la orden a su siguiente período o la da por terminada."""
+        orden.reintentos = 0
+        if orden.restantes is not None:
+            orden.restantes -= 1
+            if orden.restantes == 0:
+                orden.activa = False
+                del self.ordenes[orden.id_orden]
+                return
+
+        # El período se cuenta desde la fecha programada, no desde los reintentos
+        orden.fecha_periodo += orden.intervalo
+        orden.proxima_ejecucion = orden.fecha_periodo
+        reprogramadas.append(orden)
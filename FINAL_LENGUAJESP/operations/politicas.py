@@ -0,0 +1,115 @@
+"""
+Módulo de políticas por tipo de cuenta para el Sistema de Gestión Bancaria.
+Declara el saldo mínimo, el sobregiro permitido y el retiro máximo de cada tipo
+de cuenta y los compila en tablas de despacho, de modo que validar un débito
+cuesta una sola búsqueda por tipo de cuenta y código de operación.
+"""
+
+from models.banco import CodigoOperacion, a_centavos, a_decimal
+from operations.resultados import CodigoResultado, rechazo
+
+# Operaciones que debitan la cuenta y el rechazo por saldo que corresponde a cada una
+_DEBITOS = {
+    CodigoOperacion.RETIRO: CodigoResultado.SALDO_INSUFICIENTE,
+    CodigoOperacion.TRANSFERENCIA_SALIDA: CodigoResultado.SALDO_INSUFICIENTE_ORIGEN
+}
+
+_CODIGOS_TABLA = max(CodigoOperacion) + 1
+
+
+class PoliticaCuenta:
+    """Reglas de saldo de un tipo de cuenta."""
+
+    def __init__(self, tipo_cuenta, saldo_minimo=0, sobregiro=0, max_retiro=None):
+        """
+        Define la política de un tipo de cuenta.
+
+        Args:
+            tipo_cuenta: Tipo de cuenta al que se aplica
+            saldo_minimo: Saldo que debe quedar en la cuenta después de un débito
+            sobregiro: Monto en que el saldo puede quedar por debajo de cero
+            max_retiro: Monto máximo de cada retiro en efectivo
+        """
+        if saldo_minimo < 0 or sobregiro < 0:
+            raise ValueError("El saldo mínimo y el sobregiro no pueden ser negativos")
+        if saldo_minimo and sobregiro:
+            raise ValueError("Una política no puede exigir saldo mínimo y permitir sobregiro a la vez")
+        if max_retiro is not None and max_retiro <= 0:
+            raise ValueError("El retiro máximo debe ser mayor a cero")
+
+        self.tipo_cuenta = tipo_cuenta
+        self.saldo_minimo = saldo_minimo
+        self.sobregiro = sobregiro
+        self.max_retiro = max_retiro
+
+    @property
+    def piso_centavos(self):
+        """Saldo más bajo, en centavos, en que puede quedar la cuenta tras un débito."""
+        return a_centavos(self.saldo_minimo) - a_centavos(self.sobregiro)
+
+
+# Políticas sugeridas para la operación interactiva
+POLITICAS_POR_DEFECTO = [
+    PoliticaCuenta("Ahorro", saldo_minimo=10, max_retiro=2000),
+    PoliticaCuenta("Corriente", sobregiro=500),
+    PoliticaCuenta("Nómina")
+]
+
+
+class MotorPoliticas:
+    """
+    Compila las políticas en una tabla por código de tipo de cuenta con un
+    validador por código de operación. Los tipos sin política no pueden quedar
+    con saldo negativo.
+    """
+
+    def __init__(self, politicas=None):
+        self.politicas = {politica.tipo_cuenta: politica for politica in politicas or []}
+
+    def compilar(self, nombres_tipo):
+        """
+        Retorna las tablas de despacho de los tipos de cuenta indicados, en el
+        orden de sus códigos (codigo_tipo -> validadores por CodigoOperacion).
+        """
+        return [self.compilar_tipo(nombre) for nombre in nombres_tipo]
+
+    def compilar_tipo(self, tipo_cuenta):
+        """Construye la tabla de validadores de un tipo de cuenta."""
+        politica = self.politicas.get(tipo_cuenta)
+        tabla = [_aceptar] * _CODIGOS_TABLA
+        piso = politica.piso_centavos if politica is not None else 0
+        for codigo, codigo_saldo in _DEBITOS.items():
+            tabla[codigo] = _validador_saldo(piso, codigo_saldo)
+
+        if politica is not None and politica.max_retiro is not None:
+            tabla[CodigoOperacion.RETIRO] = _validador_retiro(
+                piso, a_centavos(politica.max_retiro), politica.tipo_cuenta
+            )
+        return tabla
+
+
+def _aceptar(saldo_centavos, monto_centavos):
+    """Validador de las operaciones que la política no restringe."""
+    return None
+
+
+def _validador_saldo(piso, codigo_saldo):
+    """Crea el validador de un débito que no puede dejar la cuenta por debajo del piso."""
+    def validar(saldo_centavos, monto_centavos):
+        if saldo_centavos - monto_centavos < piso:
+            return rechazo(codigo_saldo, a_decimal(max(saldo_centavos - piso, 0)))
+        return None
+    return validar
+
+
+def _validador_retiro(piso, maximo, tipo_cuenta):
+    """Crea el validador de un retiro con monto máximo por operación."""
+    maximo_decimal = a_decimal(maximo)
+
+    def validar(saldo_centavos, monto_centavos):
+        if monto_centavos > maximo:
+            return rechazo(CodigoResultado.RETIRO_EXCEDE_MAXIMO, tipo_cuenta, maximo_decimal)
+        if saldo_centavos - monto_centavos < piso:
+            return rechazo(CodigoResultado.SALDO_INSUFICIENTE, a_decimal(max(saldo_centavos - piso, 0)))
+        return None
+    return validar
@@ -0,0 +1,524 @@
+"""
+Módulo de replicación para el Sistema de Gestión Bancaria.
+Un líder envía su diario ordenado de cambios (cuentas creadas, apuntes y cambios
+de estado) por un socket local a seguidores que lo aplican sobre su propio
+SistemaBancario, atienden consultas de solo lectura y pueden ser promovidos.
+El diario también lleva los resúmenes del historial archivado y cada nueva
+compactación, y descarta los registros que ya confirmaron todos los seguidores;
+un seguidor nuevo que llega tarde parte de una instantánea del líder.
+
+Uso:
+    python -m operations.replicacion --lider 9100 --cuentas 1000
+    python -m operations.replicacion --seguir 127.0.0.1:9100
+"""
+
+import argparse
+import json
+import socket
+import threading
+import time
+
+from models.banco import ESTADO_ACTIVA, a_decimal
+from operations.eventos import (
+    EventoCuentaCreada, EventoMovimiento, EventoEstadoCambiado, EventoHistorialArchivado
+)
+from operations.instantanea import guardar_instantanea
+from operations.sistema import SistemaBancario
+
+# Métodos de SistemaBancario que una réplica puede atender
+METODOS_LECTURA = frozenset({
+    "buscar_cuenta", "buscar_cuentas", "saldos", "buscar_cuentas_por_titular",
+    "obtener_todas_cuentas", "obtener_cuentas_por_estado", "obtener_transacciones_cuenta",
+    "contar_transacciones_cuenta", "obtener_pagina_transacciones_cuenta",
+    "obtener_transacciones_por_id", "obtener_todas_transacciones", "obtener_estadisticas",
+    "obtener_resumen_archivado", "obtener_estadisticas_cache"
+})
+
+# Importes de un resumen archivado, que el diario lleva en centavos
+_IMPORTES_RESUMEN = frozenset({"saldo_inicial", "saldo_final", "total_creditos", "total_debitos"})
+
+
+def registro_cuenta(cuenta_obj, saldo_centavos=0):
+    """Crea el registro de diario de una cuenta nueva."""
+    return {
+        "op": "cuenta",
+        "numero": cuenta_obj.numero_cuenta,
+        "titular": cuenta_obj.titular,
+        "tipo": cuenta_obj.tipo_cuenta,
+        "saldo": saldo_centavos,
+        "fecha": cuenta_obj.fecha_apertura
+    }
+
+
+def registro_apunte(transaccion):
+    """Crea el registro de diario de un apunte con sus importes en centavos."""
+    return {
+        "op": "apunte",
+        "id": transaccion.id,
+        "asiento": transaccion.id_asiento,
+        "cuenta": transaccion.numero_cuenta,
+        "codigo": int(transaccion.codigo),
+        "monto": int(transaccion.monto * 100),
+        "anterior": int(transaccion.saldo_anterior * 100),
+        "nuevo": int(transaccion.saldo_nuevo * 100),
+        "fecha": transaccion.fecha,
+        "contraparte": transaccion.contraparte
+    }
+
+
+def registro_estado(numero_cuenta, estado):
+    """Crea el registro de diario de un cambio de estado."""
+    return {"op": "estado", "cuenta": numero_cuenta, "estado": estado}
+
+
+def registro_archivo(sistema):
+    """
+    Crea el registro de diario con los resúmenes del historial ya archivado y
+    los saldos de las cuentas internas, que incluyen lo archivado.
+    """
+    return {
+        "op": "archivo",
+        "transacciones": sistema.transacciones_archivadas,
+        "contrapartida": {nombre: int(saldo * 100) for nombre, saldo in sistema.saldos_contrapartida.items()},
+        "resumenes": {
+            str(numero_cuenta): {
+                campo: int(valor * 100) if campo in _IMPORTES_RESUMEN else valor
+                for campo, valor in resumen.items()
+            }
+            for numero_cuenta, resumen in sistema.resumenes_archivados.items()
+        }
+    }
+
+
+def registro_archivado(ultimo_id):
+    """Crea el registro de diario de una compactación hasta la transacción indicada."""
+    return {"op": "archivar", "hasta": ultimo_id}
+
+
+def aplicar_registro(sistema, registro):
+    """
+    Aplica un registro del diario del líder sobre un sistema seguidor.
+    Lanza ValueError si el registro no continúa el estado del seguidor.
+    """
+    operacion = registro["op"]
+    if operacion == "cuenta":
+        if registro["numero"] != sistema.siguiente_numero_cuenta:
+            raise ValueError(f"Registro fuera de orden: se esperaba la cuenta {sistema.siguiente_numero_cuenta}")
+        numero_cuenta = sistema.crear_cuenta(registro["titular"], registro["tipo"], 0)["numero_cuenta"]
+        indice = sistema.cuentas.indice(numero_cuenta)
+        sistema.cuentas.fechas_apertura[indice] = registro["fecha"]
+        sistema.cuentas.saldos[indice] = registro["saldo"]
+        sistema._ultima_actividad[numero_cuenta] = registro["fecha"]
+
+    elif operacion == "apunte":
+        if registro["id"] < sistema.siguiente_id_transaccion:
+            raise ValueError(f"Registro fuera de orden: la transacción {registro['id']} ya fue aplicada")
+        numero_cuenta = registro["cuenta"]
+        sistema.cuentas.saldos[sistema.cuentas.indice(numero_cuenta)] = registro["nuevo"]
+        sistema.siguiente_id_transaccion = registro["id"]
+        sistema._registrar_transaccion(
+            numero_cuenta,
+            registro["codigo"],
+            a_decimal(registro["monto"]),
+            a_decimal(registro["nuevo"]),
+            a_decimal(registro["anterior"]),
+            registro["asiento"],
+            registro["contraparte"],
+            registro["fecha"]
+        )
+        sistema.siguiente_id_asiento = max(sistema.siguiente_id_asiento, registro["asiento"] + 1)
+
+    elif operacion == "estado":
+        sistema._cambiar_estado(sistema.cuentas[registro["cuenta"]], registro["estado"])
+
+    elif operacion == "archivo":
+        sistema.transacciones_archivadas = registro["transacciones"]
+        sistema.saldos_contrapartida.update(
+            (nombre, a_decimal(saldo)) for nombre, saldo in registro["contrapartida"].items()
+        )
+        sistema.resumenes_archivados = {
+            int(numero_cuenta): {
+                campo: a_decimal(valor) if campo in _IMPORTES_RESUMEN else valor
+                for campo, valor in resumen.items()
+            }
+            for numero_cuenta, resumen in registro["resumenes"].items()
+        }
+
+    elif operacion == "archivar":
+        transacciones = sistema.transacciones
+        if not transacciones or registro["hasta"] < transacciones[0].id:
+            raise ValueError(f"Registro fuera de orden: la transacción {registro['hasta']} ya fue archivada")
+        sistema._archivar_transacciones(registro["hasta"] - transacciones[0].id + 1)
+
+    else:
+        raise ValueError(f"Operación de diario desconocida: {operacion}")
+
+
+class LiderReplicacion:
+    """Publica el diario de cambios de un SistemaBancario a los seguidores conectados."""
+
+    def __init__(self, sistema, host="127.0.0.1", puerto=0, intervalo_latido=0.5, max_diario=100_000):
+        """
+        Inicia el servidor de replicación.
+        El diario comienza con el estado actual del sistema y sigue con cada cambio.
+        Al superar max_diario registros se descartan los confirmados por todos los
+        seguidores, conservando como máximo la mitad más reciente.
+        """
+        if max_diario < 2:
+            raise ValueError("El diario debe conservar al menos dos registros")
+
+        self.sistema = sistema
+        self.intervalo_latido = intervalo_latido
+        self.max_diario = max_diario
+        self.diario = []  # Registros codificados; la posición + base + 1 es su número de secuencia
+        self._base = 0  # Secuencia del último registro descartado del diario
+        self._condicion = threading.Condition()
+        self._confirmados = {}  # "host:puerto" del seguidor -> última secuencia confirmada
+        self._conexiones = set()
+        self.activo = True
+
+        self._registrar_estado_actual()
+        sistema.eventos.registrar_oyente(self._al_publicar)
+
+        self._servidor = socket.create_server((host, puerto))
+        self.direccion = self._servidor.getsockname()[:2]
+        threading.Thread(target=self._aceptar, daemon=True).start()
+
+    def metricas(self):
+        """
+        Retorna la última secuencia del diario y el retraso de cada seguidor.
+        """
+        with self._condicion:
+            ultimo = self._base + len(self.diario)
+            return {
+                "ultima_secuencia": ultimo,
+                "primera_secuencia": self._base + 1,
+                "registros_en_diario": len(self.diario),
+                "seguidores": [
+                    {"seguidor": seguidor, "confirmado": confirmado, "retraso_registros": ultimo - confirmado}
+                    for seguidor, confirmado in self._confirmados.items()
+                ]
+            }
+
+    def detener(self):
+        """Deja de publicar cambios y cierra las conexiones."""
+        self.activo = False
+        self.sistema.eventos.eliminar_oyente(self._al_publicar)
+        self._servidor.close()
+        with self._condicion:
+            self._condicion.notify_all()
+            conexiones = list(self._conexiones)
+        for conexion in conexiones:
+            _cerrar(conexion)
+
+    def guardar_instantanea(self, ruta):
+        """
+        Guarda una instantánea del sistema y retorna la secuencia del diario que
+        refleja, desde la que debe continuar un seguidor cargado con ella.
+        Se llama desde el hilo que opera el sistema, entre dos operaciones.
+        """
+        with self._condicion:
+            guardar_instantanea(self.sistema, ruta)
+            return self._base + len(self.diario)
+
+    def _registrar_estado_actual(self):
+        """
+        Agrega al diario las cuentas, el historial en memoria, los resúmenes
+        archivados y los estados actuales. Cada cuenta parte del saldo previo a
+        su primer apunte en memoria, que es el saldo final de su resumen archivado.
+        """
+        historiales = self.sistema._transacciones_por_cuenta
+        for cuenta_obj in self.sistema.cuentas.values():
+            historial = historiales.get(cuenta_obj.numero_cuenta)
+            saldo_inicial = historial[0].saldo_anterior if historial else cuenta_obj.saldo
+            self._agregar(registro_cuenta(cuenta_obj, int(saldo_inicial * 100)))
+        for transaccion in self.sistema.transacciones:
+            self._agregar(registro_apunte(transaccion))
+        if self.sistema.transacciones_archivadas:
+            # Va después de los apuntes: fija las cuentas internas en sus saldos actuales
+            self._agregar(registro_archivo(self.sistema))
+        for cuenta_obj in self.sistema.cuentas.values():
+            if cuenta_obj.estado != ESTADO_ACTIVA:
+                self._agregar(registro_estado(cuenta_obj.numero_cuenta, cuenta_obj.estado))
+
+    def _al_publicar(self, evento):
+        """Convierte un evento del sistema en un registro del diario."""
+        if isinstance(evento, EventoMovimiento):
+            transacciones = self.sistema.transacciones
+            self._agregar(registro_apunte(transacciones[evento.id_transaccion - transacciones[0].id]))
+        elif isinstance(evento, EventoCuentaCreada):
+            self._agregar(registro_cuenta(self.sistema.cuentas[evento.numero_cuenta]))
+        elif isinstance(evento, EventoEstadoCambiado):
+            self._agregar(registro_estado(evento.numero_cuenta, evento.estado_nuevo))
+        elif isinstance(evento, EventoHistorialArchivado):
+            self._agregar(registro_archivado(evento.ultimo_id))
+
+    def _agregar(self, registro):
+        """Numera un registro, lo agrega al diario y despierta a los emisores."""
+        with self._condicion:
+            registro["seq"] = self._base + len(self.diario) + 1
+            registro["ts"] = time.time()
+            self.diario.append((json.dumps(registro, ensure_ascii=False) + "\n").encode("utf-8"))
+            if len(self.diario) > self.max_diario:
+                self._compactar()
+            self._condicion.notify_all()
+
+    def _compactar(self):
+        """
+        Descarta los registros que confirmaron todos los seguidores y, como
+        máximo, conserva la mitad más reciente del diario. Se llama con la
+        condición adquirida.
+        """
+        ultimo = self._base + len(self.diario)
+        corte = max(min(self._confirmados.values(), default=0), ultimo - self.max_diario // 2)
+        del self.diario[:corte - self._base]
+        self._base = corte
+
+    def _aceptar(self):
+        """Acepta seguidores hasta que el líder se detiene."""
+        while self.activo:
+            try:
+                conexion, direccion = self._servidor.accept()
+            except OSError:
+                break
+            with self._condicion:
+                self._conexiones.add(conexion)
+            threading.Thread(target=self._atender, args=(conexion, direccion), daemon=True).start()
+
+    def _atender(self, conexion, direccion):
+        """Envía el diario a un seguidor desde la secuencia que solicita."""
+        seguidor = f"{direccion[0]}:{direccion[1]}"
+        archivo = conexion.makefile("rb")
+        try:
+            posicion = json.loads(archivo.readline())["desde"]
+            with self._condicion:
+                if posicion >= self._base:
+                    self._confirmados[seguidor] = posicion
+            threading.Thread(target=self._leer_confirmaciones, args=(archivo, seguidor), daemon=True).start()
+
+            while self.activo:
+                with self._condicion:
+                    if posicion >= self._base + len(self.diario):
+                        self._condicion.wait(self.intervalo_latido)
+                    inicio = posicion - self._base
+                    lote = self.diario[inicio:] if inicio >= 0 else None
+                    ultimo = self._base + len(self.diario)
+
+                if lote is None:
+                    # Los registros que necesita el seguidor ya se descartaron del diario
+                    error = {
+                        "op": "error", "seq": posicion, "ts": time.time(),
+                        "mensaje": f"La secuencia {posicion + 1} ya no está en el diario del líder; "
+                                   f"inicie la réplica desde una instantánea"
+                    }
+                    conexion.sendall((json.dumps(error, ensure_ascii=False) + "\n").encode("utf-8"))
+                    break
+                if lote:
+                    conexion.sendall(b"".join(lote))
+                    posicion += len(lote)
+                else:
+                    latido = {"op": "latido", "seq": ultimo, "ts": time.time()}
+                    conexion.sendall((json.dumps(latido) + "\n").encode("utf-8"))
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._condicion:
+                self._confirmados.pop(seguidor, None)
+                self._conexiones.discard(conexion)
+            _cerrar(conexion)
+
+    def _leer_confirmaciones(self, archivo, seguidor):
+        """Actualiza la última secuencia aplicada que confirma un seguidor."""
+        try:
+            for linea in archivo:
+                confirmado = json.loads(linea)["ack"]
+                with self._condicion:
+                    if seguidor in self._confirmados:
+                        self._confirmados[seguidor] = confirmado
+        except (OSError, ValueError):
+            pass
+
+
+class VistaSoloLectura:
+    """Acceso a las consultas de un sistema replicado, serializado con el hilo de replicación."""
+
+    def __init__(self, sistema, bloqueo):
+        self._sistema = sistema
+        self._bloqueo = bloqueo
+
+    def __getattr__(self, nombre):
+        if nombre not in METODOS_LECTURA:
+            raise ValueError(f"La réplica es de solo lectura: '{nombre}' no está permitido")
+
+        metodo = getattr(self._sistema, nombre)
+
+        def consultar(*args, **kwargs):
+            with self._bloqueo:
+                return metodo(*args, **kwargs)
+
+        return consultar
+
+
+class SeguidorReplicacion:
+    """Réplica que aplica el diario de un líder sobre su propio SistemaBancario."""
+
+    # Registros aplicados entre confirmaciones enviadas al líder
+    CONFIRMAR_CADA = 256
+
+    def __init__(self, host, puerto, sistema=None, desde=0):
+        """
+        Crea la réplica. Si el sistema se cargó de una instantánea del líder,
+        desde es la secuencia que retornó LiderReplicacion.guardar_instantanea.
+        """
+        self.host = host
+        self.puerto = puerto
+        self.sistema = sistema if sistema is not None else SistemaBancario()
+        self.aplicados = desde  # Secuencia del último registro aplicado
+        self.ultimo_lider = 0  # Última secuencia conocida del líder
+        self.retraso_segundos = 0.0
+        self.conectado = False
+        self.error = None
+        self._condicion = threading.Condition(threading.RLock())
+        self.consulta = VistaSoloLectura(self.sistema, self._condicion)
+        self._socket = None
+        self._hilo = None
+
+    def iniciar(self):
+        """Se conecta al líder y comienza a aplicar su diario en segundo plano."""
+        self._socket = socket.create_connection((self.host, self.puerto))
+        self._socket.sendall((json.dumps({"desde": self.aplicados}) + "\n").encode("utf-8"))
+        self.conectado = True
+        self._hilo = threading.Thread(target=self._recibir, daemon=True)
+        self._hilo.start()
+        return self
+
+    def esperar(self, secuencia, tiempo_maximo=10.0):
+        """
+        Espera hasta aplicar la secuencia indicada. Retorna True si se alcanzó.
+        """
+        limite = time.monotonic() + tiempo_maximo
+        with self._condicion:
+            while self.aplicados < secuencia and self.conectado:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                self._condicion.wait(restante)
+            return self.aplicados >= secuencia
+
+    def metricas(self):
+        """
+        Retorna las métricas de retraso de la réplica.
+        """
+        with self._condicion:
+            return {
+                "conectado": self.conectado,
+                "aplicados": self.aplicados,
+                "ultimo_lider": self.ultimo_lider,
+                "retraso_registros": max(0, self.ultimo_lider - self.aplicados),
+                "retraso_segundos": self.retraso_segundos
+            }
+
+    def detener(self):
+        """Se desconecta del líder y espera a que termine el hilo de replicación."""
+        if self._socket is not None:
+            _cerrar(self._socket)
+        if self._hilo is not None:
+            self._hilo.join()
+        self.conectado = False
+
+    def promover(self, host="127.0.0.1", puerto=0):
+        """
+        Deja de seguir al líder y convierte la réplica en un nuevo líder.
+        Retorna el LiderReplicacion que publica sus cambios.
+        """
+        self.detener()
+        return LiderReplicacion(self.sistema, host, puerto)
+
+    def _recibir(self):
+        """Aplica los registros del líder en orden y confirma periódicamente."""
+        sin_confirmar = 0
+        try:
+            for linea in self._socket.makefile("rb"):
+                registro = json.loads(linea)
+                if registro["op"] == "error":
+                    raise ValueError(registro["mensaje"])
+                with self._condicion:
+                    self.ultimo_lider = max(self.ultimo_lider, registro["seq"])
+                    if registro["op"] != "latido":
+                        aplicar_registro(self.sistema, registro)
+                        self.aplicados = registro["seq"]
+                        self.retraso_segundos = max(0.0, time.time() - registro["ts"])
+                        sin_confirmar += 1
+                    else:
+                        self.retraso_segundos = 0.0 if self.aplicados >= registro["seq"] else self.retraso_segundos
+                    self._condicion.notify_all()
+
+                if sin_confirmar >= self.CONFIRMAR_CADA or (registro["op"] == "latido" and sin_confirmar):
+                    self._socket.sendall((json.dumps({"ack": self.aplicados}) + "\n").encode("utf-8"))
+                    sin_confirmar = 0
+        except OSError:
+            pass
+        except ValueError as e:
+            self.error = str(e)
+        finally:
+            with self._condicion:
+                self.conectado = False
+                self._condicion.notify_all()
+
+
+def _cerrar(conexion):
+    """Cierra un socket ignorando los errores de una conexión ya cerrada."""
+    try:
+        conexion.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    conexion.close()
+
+
+def main():
+    """Inicia un líder de demostración o un seguidor desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Replicación del Sistema Bancario")
+    parser.add_argument("--lider", type=int, metavar="PUERTO", help="Inicia un líder en el puerto indicado")
+    parser.add_argument("--cuentas", type=int, default=0, help="Cuentas de prueba del líder")
+    parser.add_argument("--seguir", metavar="HOST:PUERTO", help="Sigue al líder indicado")
+    parser.add_argument("--hasta", type=int, metavar="SECUENCIA",
+                        help="Termina al aplicar la secuencia indicada y muestra el estado de la réplica")
+    args = parser.parse_args()
+
+    if args.lider is not None:
+        sistema = SistemaBancario()
+        for i in range(args.cuentas):
+            sistema.crear_cuenta(f"Cliente {i + 1}", "Ahorro", 100 + i % 1000)
+        lider = LiderReplicacion(sistema, puerto=args.lider)
+        print(f"Líder escuchando en {lider.direccion[0]}:{lider.direccion[1]}")
+        try:
+            while True:
+                time.sleep(5)
+                print(json.dumps(lider.metricas()))
+        except KeyboardInterrupt:
+            lider.detener()
+        return
+
+    if args.seguir:
+        host, puerto = args.seguir.rsplit(":", 1)
+        seguidor = SeguidorReplicacion(host, int(puerto)).iniciar()
+        if args.hasta is not None:
+            alcanzado = seguidor.esperar(args.hasta, tiempo_maximo=30)
+            estado = {"alcanzado": alcanzado, "metricas": seguidor.metricas(),
+                      "estadisticas": seguidor.consulta.obtener_estadisticas()}
+            print(json.dumps(estado, default=str))
+            seguidor.detener()
+            return
+        try:
+            while seguidor.conectado:
+                time.sleep(5)
+                print(json.dumps(seguidor.metricas()))
+        except KeyboardInterrupt:
+            seguidor.detener()
+        return
+
+    parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
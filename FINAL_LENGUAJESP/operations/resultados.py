@@ -0,0 +1,83 @@
+"""
+Módulo de resultados de operaciones para el Sistema de Gestión Bancaria.
+Representa los rechazos con códigos compactos y formatea el mensaje solo cuando se pide.
+"""
+
+from enum import IntEnum
+
+
+class CodigoResultado(IntEnum):
+    """Códigos de resultado de las operaciones sobre cuentas."""
+    OK = 0
+    MONTO_NO_POSITIVO = 1
+    CUENTA_NO_EXISTE = 2
+    CUENTA_ORIGEN_NO_EXISTE = 3
+    CUENTA_DESTINO_NO_EXISTE = 4
+    CUENTA_NO_ACTIVA = 5
+    CUENTAS_NO_ACTIVAS = 6
+    MISMA_CUENTA = 7
+    SALDO_INSUFICIENTE = 8
+    SALDO_INSUFICIENTE_ORIGEN = 9
+    LIMITE_OPERACIONES = 10
+    LIMITE_MONTO = 11
+    RETIRO_EXCEDE_MAXIMO = 12
+
+
+# Plantillas de los mensajes; los datos del resultado se insertan en orden
+MENSAJES_RESULTADO = {
+    CodigoResultado.MONTO_NO_POSITIVO: "El monto a {} debe ser mayor a cero",
+    CodigoResultado.CUENTA_NO_EXISTE: "La cuenta {} no existe",
+    CodigoResultado.CUENTA_ORIGEN_NO_EXISTE: "La cuenta origen {} no existe",
+    CodigoResultado.CUENTA_DESTINO_NO_EXISTE: "La cuenta destino {} no existe",
+    CodigoResultado.CUENTA_NO_ACTIVA: "La cuenta no está activa",
+    CodigoResultado.CUENTAS_NO_ACTIVAS: "Ambas cuentas deben estar activas",
+    CodigoResultado.MISMA_CUENTA: "No se puede transferir a la misma cuenta",
+    CodigoResultado.SALDO_INSUFICIENTE: "Saldo insuficiente. Saldo disponible: ${}",
+    CodigoResultado.SALDO_INSUFICIENTE_ORIGEN: "Saldo insuficiente en cuenta origen. Saldo disponible: ${}",
+    CodigoResultado.LIMITE_OPERACIONES: "{} excedido: máximo {} operaciones en {}",
+    CodigoResultado.LIMITE_MONTO: "{} excedido. Disponible en {}: ${}",
+    CodigoResultado.RETIRO_EXCEDE_MAXIMO: "El retiro máximo en cuentas de {} es de ${}"
+}
+
+
+class Resultado:
+    """
+    Resultado de una operación: un código, los datos del mensaje y, si tuvo
+    éxito, el valor producido (por ejemplo, la transacción registrada).
+    """
+
+    __slots__ = ("codigo", "datos", "valor")
+
+    def __init__(self, codigo, datos=(), valor=None):
+        self.codigo = codigo
+        self.datos = datos
+        self.valor = valor
+
+    @property
+    def ok(self):
+        """Indica si la operación se realizó."""
+        return self.codigo == CodigoResultado.OK
+
+    def __bool__(self):
+        return self.codigo == CodigoResultado.OK
+
+    @property
+    def mensaje(self):
+        """Mensaje legible del rechazo, formateado al consultarlo."""
+        if self.codigo == CodigoResultado.OK:
+            return ""
+        return MENSAJES_RESULTADO[self.codigo].format(*self.datos)
+
+    def valor_o_error(self):
+        """Retorna el valor del resultado o lanza ValueError con su mensaje."""
+        if self.codigo != CodigoResultado.OK:
+            raise ValueError(self.mensaje)
+        return self.valor
+
+    def __repr__(self):
+        return f"Resultado({self.codigo.name}, {self.datos!r})"
+
+
+def rechazo(codigo, *datos):
+    """Crea un resultado de rechazo con los datos de su mensaje."""
+    return Resultado(codigo, datos)
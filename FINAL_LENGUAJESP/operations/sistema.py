@@ -3,20 +3,91 @@ Módulo de lógica de negocio para el Sistema de Gestión Bancaria.
 Contiene las funciones para manipular cuentas, transacciones y operaciones bancarias.
 """
 
+from bisect import bisect_left
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
-from models.banco import Cuenta, Transaccion
+from itertools import compress
+from models.banco import (
+    AlmacenCuentas, Cuenta, Transaccion, CodigoOperacion, SIGNO_OPERACION, CONTRAPARTIDA_OPERACION,
+    ESTADOS_CUENTA, ESTADO_ACTIVA, ESTADO_BLOQUEADA, ESTADO_CERRADA, a_centavos
+)
+from operations.agregados import AgregadosTiempo, RESOLUCIONES
+from operations.cache import CacheConsultas
+from operations.indice_saldos import IndiceSaldos
+from operations.limites import MotorLimites
+from operations.politicas import MotorPoliticas
+from operations.resultados import CodigoResultado, Resultado, rechazo
+from operations.eventos import (
+    BusEventos, EventoCuentaCreada, EventoMovimiento, EventoEstadoCambiado, EventoHistorialArchivado
+)
+
+# Rechazos sin datos variables, compartidos para no crear un objeto en cada operación
+_CUENTA_NO_ACTIVA = Resultado(CodigoResultado.CUENTA_NO_ACTIVA)
+_CUENTAS_NO_ACTIVAS = Resultado(CodigoResultado.CUENTAS_NO_ACTIVAS)
+_MISMA_CUENTA = Resultado(CodigoResultado.MISMA_CUENTA)
 
 
 class SistemaBancario:
     """Clase para gestionar el sistema bancario completo."""
 
-    def __init__(self):
-        """Inicializa el sistema bancario con listas vacías."""
-        self.cuentas = {}  # Usar diccionario para acceso rápido por numero_cuenta
-        self.transacciones = []
+    def __init__(self, capacidad_cache=1024, limites=None, politicas=None):
+        """
+        Inicializa el sistema bancario con listas vacías.
+        Si se indica un MotorLimites, sus reglas se evalúan en cada operación;
+        si se indica un MotorPoliticas, sus políticas validan los débitos de cada tipo de cuenta.
+        """
         self.siguiente_numero_cuenta = 1000001
+        # Almacén denso: los números de cuenta consecutivos se usan como posiciones
+        self.cuentas = AlmacenCuentas(self.siguiente_numero_cuenta)
+        self.transacciones = []
         self.siguiente_id_transaccion = 1
+        self.siguiente_id_asiento = 1
+
+        # Saldos de las cuentas internas que reciben la contrapartida de cada asiento
+        self.saldos_contrapartida = {
+            nombre: Decimal("0.00") for nombre in set(CONTRAPARTIDA_OPERACION.values())
+        }
+
+        self.cache = CacheConsultas(capacidad_cache)
+        self.eventos = BusEventos()
+        self.limites = limites if limites is not None else MotorLimites()
+        # Tablas de despacho de las políticas, compiladas por código de tipo de cuenta
+        self.cuentas.al_agregar_tipo = self._compilar_politica_tipo
+        self.politicas = politicas if politicas is not None else MotorPoliticas()
+
+        # Índices de cuentas particionados por estado
+        self.cuentas_por_estado = {estado: set() for estado in ESTADOS_CUENTA}
+        self._ultima_actividad = {}  # numero_cuenta -> fecha del último movimiento
+        self._transacciones_por_cuenta = {}  # numero_cuenta -> transacciones en orden de id
+
+        # Historial compactado: los apuntes archivados se reemplazan por un resumen por cuenta
+        self.resumenes_archivados = {}  # numero_cuenta -> resumen del historial archivado
+        self.transacciones_archivadas = 0
+
+        # Índice ordenado de saldos; se construye con la primera consulta de ranking
+        self._indice_saldos = None
+
+        # Cantidad y monto por tipo de operación en cubetas de minuto, hora y día
+        self.agregados = AgregadosTiempo()
+
+    @property
+    def politicas(self):
+        """MotorPoliticas que valida los débitos de cada tipo de cuenta."""
+        return self._politicas
+
+    @politicas.setter
+    def politicas(self, politicas):
+        """Asigna el motor de políticas y compila sus tablas para los tipos del almacén."""
+        self._politicas = politicas
+        self.compilar_politicas()
+
+    def compilar_politicas(self):
+        """Compila las tablas de despacho de todos los tipos de cuenta del almacén."""
+        self._tablas_politicas = self._politicas.compilar(self.cuentas.nombres_tipo)
+
+    def _compilar_politica_tipo(self, tipo_cuenta):
+        """Agrega la tabla de despacho de un tipo de cuenta recién registrado."""
+        self._tablas_politicas.append(self._politicas.compilar_tipo(tipo_cuenta))
 
     def crear_cuenta(self, titular, tipo_cuenta, saldo_inicial=0.0):
         """
@@ -28,23 +99,34 @@ class SistemaBancario:
         if saldo_inicial < 0:
             raise ValueError("El saldo inicial no puede ser negativo")
 
-        nueva_cuenta = Cuenta(
-            self.siguiente_numero_cuenta,
-            titular.strip(),
-            tipo_cuenta,
-            saldo_inicial
-        )
+        nueva_cuenta = self.cuentas.agregar(titular.strip(), tipo_cuenta)
 
-        self.cuentas[nueva_cuenta.numero_cuenta] = nueva_cuenta
+        self.cuentas_por_estado[nueva_cuenta.estado].add(nueva_cuenta.numero_cuenta)
+        self._ultima_actividad[nueva_cuenta.numero_cuenta] = nueva_cuenta.fecha_apertura
         self.siguiente_numero_cuenta += 1
 
-        # Registrar transacción de apertura si hay saldo inicial
+        # Las búsquedas por titular que coinciden con la nueva cuenta quedan obsoletas
+        titular_minusculas = nueva_cuenta.titular.lower()
+        self.cache.invalidar_espacio("titular", lambda clave: clave[1] in titular_minusculas)
+
+        if self.eventos.hay_receptores():
+            self.eventos.publicar(EventoCuentaCreada(
+                nueva_cuenta.numero_cuenta,
+                nueva_cuenta.titular,
+                nueva_cuenta.tipo_cuenta,
+                nueva_cuenta.saldo
+            ))
+
+        # Registrar el asiento de apertura si hay saldo inicial
         if saldo_inicial > 0:
+            saldo_anterior = nueva_cuenta.saldo
+            nueva_cuenta.saldo = Decimal(str(saldo_inicial)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
             self._registrar_transaccion(
                 nueva_cuenta.numero_cuenta,
-                "Depósito Inicial",
-                saldo_inicial,
-                nueva_cuenta.saldo
+                CodigoOperacion.APERTURA,
+                nueva_cuenta.saldo,
+                nueva_cuenta.saldo,
+                saldo_anterior
             )
 
         return nueva_cuenta.to_dict()
@@ -53,95 +135,230 @@ class SistemaBancario:
         """
         Busca una cuenta por su número.
         """
-        cuenta_obj = self.cuentas.get(numero_cuenta)
-        return cuenta_obj.to_dict() if cuenta_obj else None
+        clave = ("cuenta", numero_cuenta)
+        resultado = self.cache.obtener(clave)
+        if resultado is None:
+            cuenta_obj = self.cuentas.get(numero_cuenta)
+            if not cuenta_obj:
+                return None
+            resultado = cuenta_obj.to_dict()
+            self.cache.guardar(clave, resultado, (numero_cuenta,))
+
+        # Se entrega una copia para que el llamador no altere la entrada en caché
+        return dict(resultado)
+
+    def buscar_cuentas(self, numeros_cuenta):
+        """
+        Busca varias cuentas en una sola llamada.
+        Retorna un diccionario de columnas paralelas (numero_cuenta, titular,
+        tipo_cuenta, saldo, estado) y la lista de números no encontrados.
+        """
+        almacen = self.cuentas
+        indices, no_encontradas = self._indices_cuentas(numeros_cuenta)
+        nombres_tipo = almacen.nombres_tipo
+        return {
+            "numero_cuenta": [almacen.primer_numero + indice for indice in indices],
+            "titular": [almacen.titulares[indice] for indice in indices],
+            "tipo_cuenta": [nombres_tipo[almacen.tipos[indice]] for indice in indices],
+            "saldo": [Decimal(almacen.saldos[indice]).scaleb(-2) for indice in indices],
+            "estado": [ESTADOS_CUENTA[almacen.estados[indice]] for indice in indices],
+            "no_encontradas": no_encontradas
+        }
+
+    def saldos(self, numeros_cuenta):
+        """
+        Obtiene el saldo y el estado de varias cuentas en una sola llamada.
+        Retorna columnas paralelas (numero_cuenta, saldo, estado) y los números no encontrados.
+        """
+        almacen = self.cuentas
+        indices, no_encontradas = self._indices_cuentas(numeros_cuenta)
+        return {
+            "numero_cuenta": [almacen.primer_numero + indice for indice in indices],
+            "saldo": [Decimal(almacen.saldos[indice]).scaleb(-2) for indice in indices],
+            "estado": [ESTADOS_CUENTA[almacen.estados[indice]] for indice in indices],
+            "no_encontradas": no_encontradas
+        }
+
+    def cuentas_mayor_saldo(self, cantidad=10, tipo_cuenta=None):
+        """
+        Obtiene las cuentas con mayor saldo, de mayor a menor, en general o de un tipo.
+        """
+        numeros = self._obtener_indice_saldos().mayores(cantidad, tipo_cuenta)
+        return [self.cuentas[numero].to_dict() for numero in numeros]
+
+    def cuentas_menor_saldo(self, cantidad=10, tipo_cuenta=None):
+        """
+        Obtiene las cuentas con menor saldo, de menor a mayor, en general o de un tipo.
+        """
+        numeros = self._obtener_indice_saldos().menores(cantidad, tipo_cuenta)
+        return [self.cuentas[numero].to_dict() for numero in numeros]
+
+    def cuentas_en_rango_saldo(self, saldo_minimo, saldo_maximo, tipo_cuenta=None, limite=None):
+        """
+        Obtiene las cuentas con saldo entre los extremos indicados (incluidos),
+        de menor a mayor saldo, en general o de un tipo.
+        """
+        numeros = self._obtener_indice_saldos().en_rango(
+            a_centavos(saldo_minimo), a_centavos(saldo_maximo), tipo_cuenta, limite
+        )
+        return [self.cuentas[numero].to_dict() for numero in numeros]
+
+    def contar_cuentas_en_rango_saldo(self, saldo_minimo, saldo_maximo, tipo_cuenta=None):
+        """
+        Cuenta las cuentas con saldo entre los extremos indicados sin recorrerlas.
+        """
+        return self._obtener_indice_saldos().contar_rango(
+            a_centavos(saldo_minimo), a_centavos(saldo_maximo), tipo_cuenta
+        )
+
+    def posicion_saldo(self, numero_cuenta, tipo_cuenta=None):
+        """
+        Obtiene la posición de una cuenta en el ranking de saldos (1 = mayor saldo),
+        entre todas las cuentas o entre las de su tipo si se indica tipo_cuenta.
+        """
+        cuenta_obj = self._obtener_cuenta_existente(numero_cuenta)
+        if tipo_cuenta is not None and tipo_cuenta != cuenta_obj.tipo_cuenta:
+            raise ValueError(f"La cuenta {numero_cuenta} no es de tipo {tipo_cuenta}")
+
+        posicion, total = self._obtener_indice_saldos().posicion(numero_cuenta, tipo_cuenta)
+        return {
+            "numero_cuenta": numero_cuenta,
+            "saldo": cuenta_obj.saldo,
+            "posicion": posicion,
+            "total": total
+        }
 
     def depositar(self, numero_cuenta, monto):
         """
         Realiza un depósito en una cuenta.
         """
+        return self.intentar_depositar(numero_cuenta, monto).valor_o_error().to_dict()
+
+    def retirar(self, numero_cuenta, monto):
+        """
+        Realiza un retiro de una cuenta.
+        """
+        return self.intentar_retirar(numero_cuenta, monto).valor_o_error().to_dict()
+
+    def transferir(self, numero_cuenta_origen, numero_cuenta_destino, monto):
+        """
+        Realiza una transferencia entre dos cuentas.
+        """
+        trans_origen, trans_destino = self.intentar_transferir(
+            numero_cuenta_origen, numero_cuenta_destino, monto
+        ).valor_o_error()
+        return (trans_origen.to_dict(), trans_destino.to_dict())
+
+    def intentar_depositar(self, numero_cuenta, monto):
+        """
+        Realiza un depósito sin lanzar excepciones.
+        Retorna un Resultado cuyo valor es la Transaccion registrada.
+        """
         if monto <= 0:
-            raise ValueError("El monto a depositar debe ser mayor a cero")
+            return rechazo(CodigoResultado.MONTO_NO_POSITIVO, "depositar")
 
         cuenta_obj = self.cuentas.get(numero_cuenta)
         if not cuenta_obj:
-            raise ValueError(f"La cuenta {numero_cuenta} no existe")
+            return rechazo(CodigoResultado.CUENTA_NO_EXISTE, numero_cuenta)
 
-        if cuenta_obj.estado != "Activa":
-            raise ValueError("La cuenta no está activa")
+        if cuenta_obj.estado != ESTADO_ACTIVA:
+            return _CUENTA_NO_ACTIVA
 
-        saldo_anterior = cuenta_obj.saldo
         monto_decimal = Decimal(str(monto)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        if self.limites.reglas:
+            limite = self._evaluar_limites(cuenta_obj, CodigoOperacion.DEPOSITO, monto_decimal)
+            if limite is not None:
+                return limite
+
+        saldo_anterior = cuenta_obj.saldo
         cuenta_obj.saldo += monto_decimal
 
         transaccion = self._registrar_transaccion(
             numero_cuenta,
-            "Depósito",
+            CodigoOperacion.DEPOSITO,
             monto_decimal,
             cuenta_obj.saldo,
             saldo_anterior
         )
 
-        return transaccion.to_dict()
+        return Resultado(CodigoResultado.OK, valor=transaccion)
 
-    def retirar(self, numero_cuenta, monto):
+    def intentar_retirar(self, numero_cuenta, monto):
         """
-        Realiza un retiro de una cuenta.
+        Realiza un retiro sin lanzar excepciones.
+        Retorna un Resultado cuyo valor es la Transaccion registrada.
         """
         if monto <= 0:
-            raise ValueError("El monto a retirar debe ser mayor a cero")
+            return rechazo(CodigoResultado.MONTO_NO_POSITIVO, "retirar")
 
         cuenta_obj = self.cuentas.get(numero_cuenta)
         if not cuenta_obj:
-            raise ValueError(f"La cuenta {numero_cuenta} no existe")
+            return rechazo(CodigoResultado.CUENTA_NO_EXISTE, numero_cuenta)
 
-        if cuenta_obj.estado != "Activa":
-            raise ValueError("La cuenta no está activa")
+        if cuenta_obj.estado != ESTADO_ACTIVA:
+            return _CUENTA_NO_ACTIVA
 
         monto_decimal = Decimal(str(monto)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
-        if cuenta_obj.saldo < monto_decimal:
-            raise ValueError(f"Saldo insuficiente. Saldo disponible: ${cuenta_obj.saldo}")
+        rechazo_politica = self._validar_debito(cuenta_obj, CodigoOperacion.RETIRO, monto_decimal)
+        if rechazo_politica is not None:
+            return rechazo_politica
+
+        if self.limites.reglas:
+            limite = self._evaluar_limites(cuenta_obj, CodigoOperacion.RETIRO, monto_decimal)
+            if limite is not None:
+                return limite
 
         saldo_anterior = cuenta_obj.saldo
         cuenta_obj.saldo -= monto_decimal
 
         transaccion = self._registrar_transaccion(
             numero_cuenta,
-            "Retiro",
+            CodigoOperacion.RETIRO,
             monto_decimal,
             cuenta_obj.saldo,
             saldo_anterior
         )
 
-        return transaccion.to_dict()
+        return Resultado(CodigoResultado.OK, valor=transaccion)
 
-    def transferir(self, numero_cuenta_origen, numero_cuenta_destino, monto):
+    def intentar_transferir(self, numero_cuenta_origen, numero_cuenta_destino, monto):
         """
-        Realiza una transferencia entre dos cuentas.
+        Realiza una transferencia sin lanzar excepciones.
+        Retorna un Resultado cuyo valor es el par de transacciones (salida, entrada).
         """
         if monto <= 0:
-            raise ValueError("El monto a transferir debe ser mayor a cero")
+            return rechazo(CodigoResultado.MONTO_NO_POSITIVO, "transferir")
 
         if numero_cuenta_origen == numero_cuenta_destino:
-            raise ValueError("No se puede transferir a la misma cuenta")
+            return _MISMA_CUENTA
 
         cuenta_origen_obj = self.cuentas.get(numero_cuenta_origen)
         cuenta_destino_obj = self.cuentas.get(numero_cuenta_destino)
 
         if not cuenta_origen_obj:
-            raise ValueError(f"La cuenta origen {numero_cuenta_origen} no existe")
+            return rechazo(CodigoResultado.CUENTA_ORIGEN_NO_EXISTE, numero_cuenta_origen)
 
         if not cuenta_destino_obj:
-            raise ValueError(f"La cuenta destino {numero_cuenta_destino} no existe")
+            return rechazo(CodigoResultado.CUENTA_DESTINO_NO_EXISTE, numero_cuenta_destino)
 
-        if cuenta_origen_obj.estado != "Activa" or cuenta_destino_obj.estado != "Activa":
-            raise ValueError("Ambas cuentas deben estar activas")
+        if cuenta_origen_obj.estado != ESTADO_ACTIVA or cuenta_destino_obj.estado != ESTADO_ACTIVA:
+            return _CUENTAS_NO_ACTIVAS
 
         monto_decimal = Decimal(str(monto)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
-        if cuenta_origen_obj.saldo < monto_decimal:
-            raise ValueError(f"Saldo insuficiente en cuenta origen. Saldo disponible: ${cuenta_origen_obj.saldo}")
+        rechazo_politica = self._validar_debito(cuenta_origen_obj, CodigoOperacion.TRANSFERENCIA_SALIDA, monto_decimal)
+        if rechazo_politica is not None:
+            return rechazo_politica
+
+        if self.limites.reglas:
+            # Un Resultado de rechazo es falso: cada lado se compara con None
+            limite = self._evaluar_limites(cuenta_origen_obj, CodigoOperacion.TRANSFERENCIA_SALIDA, monto_decimal)
+            if limite is not None:
+                return limite
+            limite = self._evaluar_limites(cuenta_destino_obj, CodigoOperacion.TRANSFERENCIA_ENTRADA, monto_decimal)
+            if limite is not None:
+                return limite
 
         # Realizar el retiro de la cuenta origen
         saldo_anterior_origen = cuenta_origen_obj.saldo
@@ -151,24 +368,120 @@ class SistemaBancario:
         saldo_anterior_destino = cuenta_destino_obj.saldo
         cuenta_destino_obj.saldo += monto_decimal
 
-        # Registrar ambas transacciones
+        # Registrar ambos apuntes en un mismo asiento
+        id_asiento = self._nuevo_asiento()
         trans_origen = self._registrar_transaccion(
             numero_cuenta_origen,
-            f"Transferencia a {numero_cuenta_destino}",
+            CodigoOperacion.TRANSFERENCIA_SALIDA,
             monto_decimal,
             cuenta_origen_obj.saldo,
-            saldo_anterior_origen
+            saldo_anterior_origen,
+            id_asiento,
+            numero_cuenta_destino
         )
 
         trans_destino = self._registrar_transaccion(
             numero_cuenta_destino,
-            f"Transferencia desde {numero_cuenta_origen}",
+            CodigoOperacion.TRANSFERENCIA_ENTRADA,
             monto_decimal,
             cuenta_destino_obj.saldo,
-            saldo_anterior_destino
+            saldo_anterior_destino,
+            id_asiento,
+            numero_cuenta_origen
         )
 
-        return (trans_origen.to_dict(), trans_destino.to_dict())
+        return Resultado(CodigoResultado.OK, valor=(trans_origen, trans_destino))
+
+    def bloquear_cuenta(self, numero_cuenta):
+        """
+        Bloquea una cuenta activa impidiendo nuevas operaciones.
+        """
+        cuenta_obj = self._obtener_cuenta_existente(numero_cuenta)
+        if cuenta_obj.estado != ESTADO_ACTIVA:
+            raise ValueError(f"Solo se pueden bloquear cuentas activas. Estado actual: {cuenta_obj.estado}")
+
+        self._cambiar_estado(cuenta_obj, ESTADO_BLOQUEADA)
+        return cuenta_obj.to_dict()
+
+    def cerrar_cuenta(self, numero_cuenta):
+        """
+        Cierra una cuenta activa o bloqueada sin saldo.
+        """
+        cuenta_obj = self._obtener_cuenta_existente(numero_cuenta)
+        if cuenta_obj.estado == ESTADO_CERRADA:
+            raise ValueError("La cuenta ya está cerrada")
+
+        if cuenta_obj.saldo != 0:
+            raise ValueError(f"Solo se pueden cerrar cuentas con saldo cero. Saldo actual: ${cuenta_obj.saldo}")
+
+        self._cambiar_estado(cuenta_obj, ESTADO_CERRADA)
+        return cuenta_obj.to_dict()
+
+    def reactivar_cuenta(self, numero_cuenta):
+        """
+        Reactiva una cuenta bloqueada o cerrada.
+        """
+        cuenta_obj = self._obtener_cuenta_existente(numero_cuenta)
+        if cuenta_obj.estado == ESTADO_ACTIVA:
+            raise ValueError("La cuenta ya está activa")
+
+        self._cambiar_estado(cuenta_obj, ESTADO_ACTIVA)
+        return cuenta_obj.to_dict()
+
+    def cambiar_estado_lote(self, numeros_cuenta, estado):
+        """
+        Cambia el estado de varias cuentas en una sola pasada.
+        Las cuentas inexistentes, ya en el estado destino o que no cumplen
+        las reglas de la transición se omiten. Retorna los números modificados.
+        """
+        if estado not in self.cuentas_por_estado:
+            raise ValueError(f"Estado de cuenta no válido: {estado}")
+
+        destino = self.cuentas_por_estado[estado]
+        modificadas = []
+        for numero_cuenta in numeros_cuenta:
+            cuenta_obj = self.cuentas.get(numero_cuenta)
+            if not cuenta_obj or cuenta_obj.estado == estado:
+                continue
+            if estado == ESTADO_BLOQUEADA and cuenta_obj.estado != ESTADO_ACTIVA:
+                continue
+            if estado == ESTADO_CERRADA and cuenta_obj.saldo != 0:
+                continue
+
+            self.cuentas_por_estado[cuenta_obj.estado].discard(numero_cuenta)
+            destino.add(numero_cuenta)
+            estado_anterior = cuenta_obj.estado
+            cuenta_obj.estado = estado
+            modificadas.append(numero_cuenta)
+
+            if self.eventos.hay_receptores():
+                self.eventos.publicar(EventoEstadoCambiado(numero_cuenta, estado_anterior, estado))
+
+        self.cache.invalidar_cuentas(modificadas)
+        return modificadas
+
+    def bloquear_cuentas_inactivas(self, fecha_limite):
+        """
+        Bloquea las cuentas activas sin movimientos desde la fecha límite.
+        Acepta un datetime o una cadena con formato "%Y-%m-%d %H:%M:%S".
+        """
+        if isinstance(fecha_limite, datetime):
+            fecha_limite = fecha_limite.strftime("%Y-%m-%d %H:%M:%S")
+
+        inactivas = [
+            numero_cuenta for numero_cuenta in self.cuentas_por_estado[ESTADO_ACTIVA]
+            if self._ultima_actividad[numero_cuenta] < fecha_limite
+        ]
+        return self.cambiar_estado_lote(inactivas, ESTADO_BLOQUEADA)
+
+    def obtener_cuentas_por_estado(self, estado):
+        """
+        Obtiene las cuentas que se encuentran en el estado indicado.
+        """
+        if estado not in self.cuentas_por_estado:
+            raise ValueError(f"Estado de cuenta no válido: {estado}")
+
+        return [self.cuentas[numero].to_dict() for numero in sorted(self.cuentas_por_estado[estado])]
 
     def obtener_todas_cuentas(self):
         """
@@ -180,11 +493,62 @@ class SistemaBancario:
         """
         Obtiene todas las transacciones de una cuenta específica.
         """
-        transacciones_cuenta = []
-        for trans in self.transacciones:
-            if trans.numero_cuenta == numero_cuenta:
-                transacciones_cuenta.append(trans.to_dict())
-        return transacciones_cuenta
+        clave = ("transacciones", numero_cuenta)
+        transacciones_cuenta = self.cache.obtener(clave)
+        if transacciones_cuenta is None:
+            transacciones_cuenta = [
+                trans.to_dict() for trans in self._transacciones_por_cuenta.get(numero_cuenta, ())
+            ]
+            self.cache.guardar(clave, transacciones_cuenta, (numero_cuenta,))
+
+        # Se entregan copias para que el llamador no altere la entrada en caché
+        return [dict(trans) for trans in transacciones_cuenta]
+
+    def contar_transacciones_cuenta(self, numero_cuenta):
+        """
+        Retorna la cantidad de transacciones de una cuenta.
+        """
+        return len(self._transacciones_por_cuenta.get(numero_cuenta, ()))
+
+    def obtener_pagina_transacciones_cuenta(self, numero_cuenta, limite=20, antes_de_id=None):
+        """
+        Obtiene una página de transacciones de una cuenta, de la más reciente a la más antigua.
+        Si se indica antes_de_id, solo se incluyen transacciones con id menor.
+        Retorna un diccionario con las transacciones y el id desde el cual pedir
+        la página siguiente (None si no hay más).
+        """
+        if limite <= 0:
+            raise ValueError("El límite de la página debe ser mayor a cero")
+
+        historial = self._transacciones_por_cuenta.get(numero_cuenta, [])
+        fin = len(historial)
+        if antes_de_id is not None:
+            fin = bisect_left(historial, antes_de_id, key=lambda trans: trans.id)
+
+        inicio = max(0, fin - limite)
+        pagina = [historial[i].to_dict() for i in range(fin - 1, inicio - 1, -1)]
+
+        return {
+            "transacciones": pagina,
+            "siguiente_antes_de_id": historial[inicio].id if inicio > 0 else None
+        }
+
+    def obtener_transacciones_por_id(self, ids_transaccion):
+        """
+        Obtiene las transacciones con los identificadores indicados.
+        """
+        if not self.transacciones:
+            return []
+
+        # Los identificadores son consecutivos, por lo que se accede por posición
+        primer_id = self.transacciones[0].id
+        total = len(self.transacciones)
+        resultado = []
+        for id_transaccion in ids_transaccion:
+            indice = id_transaccion - primer_id
+            if 0 <= indice < total:
+                resultado.append(self.transacciones[indice].to_dict())
+        return resultado
 
     def obtener_todas_transacciones(self):
         """
@@ -200,45 +564,416 @@ class SistemaBancario:
             return self.obtener_todas_cuentas()
 
         termino = nombre_titular.strip().lower()
-        cuentas_encontradas = []
-
-        for cuenta in self.cuentas.values():
-            if termino in cuenta.titular.lower():
-                cuentas_encontradas.append(cuenta.to_dict())
+        clave = ("titular", termino)
+        cuentas_encontradas = self.cache.obtener(clave)
+        if cuentas_encontradas is None:
+            cuentas_encontradas = []
+
+            # Recorrer solo la columna de titulares
+            for indice, titular in enumerate(self.cuentas.titulares):
+                if termino in titular.lower():
+                    cuentas_encontradas.append(Cuenta(self.cuentas, indice).to_dict())
+
+            self.cache.guardar(
+                clave,
+                cuentas_encontradas,
+                [cuenta["numero_cuenta"] for cuenta in cuentas_encontradas]
+            )
 
-        return cuentas_encontradas
+        # Se entregan copias para que el llamador no altere la entrada en caché
+        return [dict(cuenta) for cuenta in cuentas_encontradas]
 
     def obtener_estadisticas(self):
         """
         Obtiene estadísticas generales del sistema bancario.
         """
         total_cuentas = len(self.cuentas)
-        total_transacciones = len(self.transacciones)
-        saldo_total = sum(cuenta.saldo for cuenta in self.cuentas.values())
-
-        cuentas_activas = sum(1 for cuenta in self.cuentas.values() if cuenta.estado == "Activa")
+        total_transacciones = len(self.transacciones) + self.transacciones_archivadas
+        saldo_total = Decimal(sum(self.cuentas.saldos)).scaleb(-2)
 
         return {
             "total_cuentas": total_cuentas,
-            "cuentas_activas": cuentas_activas,
+            "cuentas_activas": len(self.cuentas_por_estado[ESTADO_ACTIVA]),
+            "cuentas_bloqueadas": len(self.cuentas_por_estado[ESTADO_BLOQUEADA]),
+            "cuentas_cerradas": len(self.cuentas_por_estado[ESTADO_CERRADA]),
             "total_transacciones": total_transacciones,
             "saldo_total_sistema": saldo_total
         }
 
-    def _registrar_transaccion(self, numero_cuenta, tipo, monto, saldo_nuevo, saldo_anterior=None):
+    def obtener_totales_por_tipo(self):
+        """
+        Obtiene la cantidad de cuentas y el saldo total de cada tipo de cuenta con cuentas.
+        Se calcula sobre las columnas de tipos y saldos, sin crear un objeto por cuenta.
+        """
+        almacen = self.cuentas
+        tipos = almacen.tipos.tobytes()
+        totales = {}
+        for codigo, tipo_cuenta in enumerate(almacen.nombres_tipo):
+            cantidad = tipos.count(codigo)
+            if cantidad:
+                # Selector de un byte por cuenta: 1 solo en las cuentas del tipo
+                selector = tipos.translate(bytes(codigo) + b"\x01" + bytes(255 - codigo))
+                saldo = sum(compress(almacen.saldos, selector))
+                totales[tipo_cuenta] = {"cantidad": cantidad, "saldo_total": Decimal(saldo).scaleb(-2)}
+        return totales
+
+    def obtener_volumen(self, resolucion="hora", desde=None, hasta=None):
+        """
+        Obtiene la serie de volumen de operaciones por minuto, hora o día entre
+        dos fechas, leída de los agregados mantenidos en cada apunte.
+        """
+        if resolucion not in RESOLUCIONES:
+            raise ValueError(f"Resolución no válida: {resolucion}")
+        return self.agregados.serie(resolucion, desde, hasta)
+
+    def obtener_resumen_archivado(self, numero_cuenta):
+        """
+        Obtiene el resumen del historial archivado de una cuenta o None si no tiene.
+        """
+        resumen = self.resumenes_archivados.get(numero_cuenta)
+        return dict(resumen) if resumen is not None else None
+
+    def suscribir_eventos(self, capacidad=1000, tipos=None):
+        """
+        Crea una suscripción al flujo de cambios del sistema.
+        """
+        return self.eventos.suscribir(capacidad, tipos)
+
+    def obtener_estadisticas_cache(self):
+        """
+        Obtiene las estadísticas de aciertos y fallos de la caché de consultas.
+        """
+        return self.cache.estadisticas()
+
+    def _nuevo_asiento(self):
+        """
+        Reserva un identificador de asiento contable.
         """
-        Registra una transacción en el historial.
+        id_asiento = self.siguiente_id_asiento
+        self.siguiente_id_asiento += 1
+        return id_asiento
+
+    def _registrar_transaccion(self, numero_cuenta, codigo, monto, saldo_nuevo, saldo_anterior=None,
+                               id_asiento=None, contraparte=None, fecha=None):
         """
+        Registra un apunte en el historial. Si no se indica asiento se abre uno
+        nuevo cuya contrapartida es la cuenta interna asociada a la operación.
+        """
+        if id_asiento is None:
+            id_asiento = self._nuevo_asiento()
+
         transaccion = Transaccion(
             self.siguiente_id_transaccion,
             numero_cuenta,
-            tipo,
+            codigo,
             monto,
             saldo_nuevo,
-            saldo_anterior
+            saldo_anterior,
+            fecha,
+            id_asiento=id_asiento,
+            contraparte=contraparte
         )
 
         self.transacciones.append(transaccion)
+        self._transacciones_por_cuenta.setdefault(numero_cuenta, []).append(transaccion)
         self.siguiente_id_transaccion += 1
+        self._ultima_actividad[numero_cuenta] = transaccion.fecha
+
+        contrapartida = CONTRAPARTIDA_OPERACION.get(transaccion.codigo)
+        if contrapartida is not None:
+            self.saldos_contrapartida[contrapartida] -= transaccion.importe
+
+        monto_centavos = int(transaccion.monto * 100)
+        self.agregados.registrar(transaccion.fecha, transaccion.codigo, monto_centavos)
+
+        # Actualizar los contadores de las reglas de límite
+        if self.limites.reglas:
+            self.limites.registrar(
+                numero_cuenta, self.cuentas[numero_cuenta].tipo_cuenta, transaccion.codigo, monto_centavos
+            )
+
+        # Invalidar solo las consultas que dependen de la cuenta afectada
+        self.cache.invalidar_cuentas((numero_cuenta,))
+        if self._indice_saldos is not None:
+            self._indice_saldos.marcar((numero_cuenta,))
+
+        if self.eventos.hay_receptores():
+            self.eventos.publicar(EventoMovimiento(
+                transaccion.id,
+                numero_cuenta,
+                transaccion.tipo,
+                transaccion.saldo_nuevo - transaccion.saldo_anterior,
+                transaccion.saldo_nuevo,
+                transaccion.codigo
+            ))
 
         return transaccion
+
+    def _aplicar_movimientos_lote(self, movimientos):
+        """
+        Aplica en bloque movimientos ya validados y registra sus transacciones,
+        cada una en su propio asiento contra la cuenta interna de la operación.
+        Cada movimiento es (numero_cuenta, codigo, monto, saldo_anterior, saldo_nuevo)
+        con el código como CodigoOperacion y los importes en centavos enteros.
+        """
+        if not movimientos:
+            return []
+
+        fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        id_transaccion = self.siguiente_id_transaccion
+        publicar = self.eventos.hay_receptores()
+        limites = self.limites if self.limites.reglas else None
+        saldos = self.cuentas.saldos
+        primer_numero = self.cuentas.primer_numero
+        agregar = self.transacciones.append
+        por_cuenta = self._transacciones_por_cuenta
+        inicio = len(self.transacciones)
+        contrapartidas = {}  # nombre -> variación en centavos
+        totales = {}  # codigo -> [cantidad, centavos] para los agregados por tiempo
+
+        for numero_cuenta, codigo, monto, saldo_anterior, saldo_nuevo in movimientos:
+            saldo_anterior_decimal = Decimal(saldo_anterior).scaleb(-2)
+            saldo_nuevo_decimal = Decimal(saldo_nuevo).scaleb(-2)
+            saldos[numero_cuenta - primer_numero] = saldo_nuevo
+
+            transaccion = Transaccion.desde_valores(
+                id_transaccion,
+                numero_cuenta,
+                codigo,
+                Decimal(monto).scaleb(-2),
+                saldo_nuevo_decimal,
+                saldo_anterior_decimal,
+                fecha,
+                self.siguiente_id_asiento,
+                None
+            )
+            agregar(transaccion)
+            por_cuenta.setdefault(numero_cuenta, []).append(transaccion)
+            id_transaccion += 1
+            self.siguiente_id_transaccion = id_transaccion
+            self.siguiente_id_asiento += 1
+
+            contrapartida = CONTRAPARTIDA_OPERACION[transaccion.codigo]
+            contrapartidas[contrapartida] = contrapartidas.get(contrapartida, 0) - monto * SIGNO_OPERACION[codigo]
+
+            total = totales.get(codigo)
+            if total is None:
+                totales[codigo] = [1, monto]
+            else:
+                total[0] += 1
+                total[1] += monto
+
+            if limites is not None:
+                limites.registrar(numero_cuenta, self.cuentas[numero_cuenta].tipo_cuenta, codigo, monto)
+
+            if publicar:
+                self.eventos.publicar(EventoMovimiento(
+                    transaccion.id,
+                    numero_cuenta,
+                    transaccion.tipo,
+                    saldo_nuevo_decimal - saldo_anterior_decimal,
+                    saldo_nuevo_decimal,
+                    transaccion.codigo
+                ))
+
+        for contrapartida, variacion in contrapartidas.items():
+            self.saldos_contrapartida[contrapartida] += Decimal(variacion).scaleb(-2)
+        self.agregados.registrar_totales(fecha, totales)
+
+        afectadas = {movimiento[0] for movimiento in movimientos}
+        for numero_cuenta in afectadas:
+            self._ultima_actividad[numero_cuenta] = fecha
+        self.cache.invalidar_cuentas(afectadas)
+        if self._indice_saldos is not None:
+            self._indice_saldos.marcar(afectadas)
+
+        return self.transacciones[inicio:]
+
+    def _aplicar_transferencias_lote(self, transferencias):
+        """
+        Aplica en bloque transferencias ya validadas; cada una genera un asiento
+        con sus apuntes de salida y de entrada. Cada transferencia es
+        (origen, destino, monto, saldo_origen, saldo_destino) con los importes
+        en centavos enteros y los saldos previos a la transferencia.
+        """
+        if not transferencias:
+            return []
+
+        fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        publicar = self.eventos.hay_receptores()
+        limites = self.limites if self.limites.reglas else None
+        saldos = self.cuentas.saldos
+        primer_numero = self.cuentas.primer_numero
+        agregar = self.transacciones.append
+        por_cuenta = self._transacciones_por_cuenta
+        inicio = len(self.transacciones)
+        id_transaccion = self.siguiente_id_transaccion
+        id_asiento = self.siguiente_id_asiento
+        salida = CodigoOperacion.TRANSFERENCIA_SALIDA
+        entrada = CodigoOperacion.TRANSFERENCIA_ENTRADA
+
+        for origen, destino, monto, saldo_origen, saldo_destino in transferencias:
+            monto_decimal = Decimal(monto).scaleb(-2)
+            apuntes = (
+                (origen, salida, saldo_origen, saldo_origen - monto, destino),
+                (destino, entrada, saldo_destino, saldo_destino + monto, origen)
+            )
+            for numero_cuenta, codigo, saldo_anterior, saldo_nuevo, contraparte in apuntes:
+                saldos[numero_cuenta - primer_numero] = saldo_nuevo
+                transaccion = Transaccion(
+                    id_transaccion,
+                    numero_cuenta,
+                    codigo,
+                    monto_decimal,
+                    Decimal(saldo_nuevo).scaleb(-2),
+                    Decimal(saldo_anterior).scaleb(-2),
+                    fecha,
+                    id_asiento,
+                    contraparte
+                )
+                agregar(transaccion)
+                por_cuenta.setdefault(numero_cuenta, []).append(transaccion)
+                id_transaccion += 1
+
+                if limites is not None:
+                    limites.registrar(numero_cuenta, self.cuentas[numero_cuenta].tipo_cuenta, codigo, monto)
+
+                if publicar:
+                    self.eventos.publicar(EventoMovimiento(
+                        transaccion.id,
+                        numero_cuenta,
+                        transaccion.tipo,
+                        transaccion.saldo_nuevo - transaccion.saldo_anterior,
+                        transaccion.saldo_nuevo,
+                        transaccion.codigo
+                    ))
+            id_asiento += 1
+
+        self.siguiente_id_transaccion = id_transaccion
+        self.siguiente_id_asiento = id_asiento
+
+        monto_total = sum(transferencia[2] for transferencia in transferencias)
+        self.agregados.registrar_totales(fecha, {
+            salida: (len(transferencias), monto_total),
+            entrada: (len(transferencias), monto_total)
+        })
+
+        afectadas = {transferencia[0] for transferencia in transferencias}
+        afectadas.update(transferencia[1] for transferencia in transferencias)
+        for numero_cuenta in afectadas:
+            self._ultima_actividad[numero_cuenta] = fecha
+        self.cache.invalidar_cuentas(afectadas)
+        if self._indice_saldos is not None:
+            self._indice_saldos.marcar(afectadas)
+
+        return self.transacciones[inicio:]
+
+    def _archivar_transacciones(self, cantidad):
+        """
+        Quita del historial en memoria las primeras transacciones indicadas y
+        acumula sus totales en el resumen archivado de cada cuenta.
+        Retorna las transacciones quitadas.
+        """
+        archivadas = self.transacciones[:cantidad]
+        if not archivadas:
+            return []
+
+        por_cuenta = {}
+        for transaccion in archivadas:
+            por_cuenta.setdefault(transaccion.numero_cuenta, []).append(transaccion)
+
+        for numero_cuenta, apuntes in por_cuenta.items():
+            resumen = self.resumenes_archivados.get(numero_cuenta)
+            if resumen is None:
+                resumen = self.resumenes_archivados[numero_cuenta] = {
+                    "saldo_inicial": apuntes[0].saldo_anterior,
+                    "saldo_final": apuntes[0].saldo_anterior,
+                    "movimientos": 0,
+                    "total_creditos": Decimal("0.00"),
+                    "total_debitos": Decimal("0.00"),
+                    "ultimo_id": None,
+                    "ultima_fecha": None
+                }
+            for transaccion in apuntes:
+                if SIGNO_OPERACION[transaccion.codigo] > 0:
+                    resumen["total_creditos"] += transaccion.monto
+                else:
+                    resumen["total_debitos"] += transaccion.monto
+            resumen["movimientos"] += len(apuntes)
+            resumen["saldo_final"] = apuntes[-1].saldo_nuevo
+            resumen["ultimo_id"] = apuntes[-1].id
+            resumen["ultima_fecha"] = apuntes[-1].fecha
+
+            # El historial de la cuenta está en orden de id, por lo que se recorta su prefijo
+            historial = self._transacciones_por_cuenta[numero_cuenta]
+            del historial[:len(apuntes)]
+            if not historial:
+                del self._transacciones_por_cuenta[numero_cuenta]
+
+        del self.transacciones[:cantidad]
+        self.transacciones_archivadas += len(archivadas)
+        self.cache.invalidar_cuentas(por_cuenta)
+        if self.eventos.hay_receptores():
+            self.eventos.publicar(EventoHistorialArchivado(archivadas[-1].id, len(archivadas)))
+        return archivadas
+
+    def _evaluar_limites(self, cuenta_obj, codigo, monto_decimal):
+        """
+        Retorna el Resultado de rechazo si la operación excede alguna regla de límite de la cuenta.
+        """
+        return self.limites.evaluar(cuenta_obj.numero_cuenta, cuenta_obj.tipo_cuenta, codigo, int(monto_decimal * 100))
+
+    def _validar_debito(self, cuenta_obj, codigo, monto_decimal):
+        """
+        Retorna el Resultado de rechazo si la política del tipo de la cuenta no admite el débito.
+        """
+        almacen = self.cuentas
+        indice = cuenta_obj.numero_cuenta - almacen.primer_numero
+        validar = self._tablas_politicas[almacen.tipos[indice]][codigo]
+        return validar(almacen.saldos[indice], int(monto_decimal * 100))
+
+    def _indices_cuentas(self, numeros_cuenta):
+        """
+        Convierte números de cuenta en posiciones del almacén.
+        Retorna las posiciones de las existentes y los números que no existen.
+        """
+        indice = self.cuentas.indice
+        indices = []
+        no_encontradas = []
+        for numero_cuenta in numeros_cuenta:
+            posicion = indice(numero_cuenta)
+            if posicion < 0:
+                no_encontradas.append(numero_cuenta)
+            else:
+                indices.append(posicion)
+        return indices, no_encontradas
+
+    def _obtener_indice_saldos(self):
+        """
+        Retorna el índice ordenado de saldos, construyéndolo la primera vez.
+        """
+        if self._indice_saldos is None:
+            self._indice_saldos = IndiceSaldos(self.cuentas)
+        return self._indice_saldos
+
+    def _obtener_cuenta_existente(self, numero_cuenta):
+        """
+        Retorna el objeto de la cuenta o lanza un error si no existe.
+        """
+        cuenta_obj = self.cuentas.get(numero_cuenta)
+        if not cuenta_obj:
+            raise ValueError(f"La cuenta {numero_cuenta} no existe")
+        return cuenta_obj
+
+    def _cambiar_estado(self, cuenta_obj, estado):
+        """
+        Mueve una cuenta entre los índices de estado y notifica el cambio.
+        """
+        estado_anterior = cuenta_obj.estado
+        self.cuentas_por_estado[estado_anterior].discard(cuenta_obj.numero_cuenta)
+        self.cuentas_por_estado[estado].add(cuenta_obj.numero_cuenta)
+        cuenta_obj.estado = estado
+
+        self.cache.invalidar_cuentas((cuenta_obj.numero_cuenta,))
+        if self.eventos.hay_receptores():
+            self.eventos.publicar(EventoEstadoCambiado(cuenta_obj.numero_cuenta, estado_anterior, estado))
@@ -0,0 +1,120 @@
+"""
+Módulo de trazas de rendimiento para el Sistema de Gestión Bancaria.
+Mide intervalos (spans) anidados de las acciones de la interfaz y de las llamadas
+al sistema, y los guarda en el formato de eventos de trazas de Chrome, que abren
+chrome://tracing, Perfetto y speedscope.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class Trazador:
+    """Registro opcional de intervalos temporizados."""
+
+    def __init__(self, umbral_lento_ms=200, al_detectar_lento=None, capacidad=1_000_000):
+        """
+        Inicializa el trazador.
+
+        Args:
+            umbral_lento_ms: Duración a partir de la cual una acción de primer nivel se considera lenta
+            al_detectar_lento: Función llamada con (nombre, duracion_ms) para cada acción lenta
+            capacidad: Cantidad máxima de intervalos guardados; se descartan los más antiguos
+        """
+        self.umbral_lento_ms = umbral_lento_ms
+        self.al_detectar_lento = al_detectar_lento
+        self.eventos = deque(maxlen=capacidad)
+        self.acciones_lentas = 0
+        self._inicio = time.perf_counter_ns()
+        self._profundidad = 0
+        self._instrumentados = []  # (objeto, nombre, original) para poder restaurarlos
+        self._pid = os.getpid()
+
+    def envolver(self, funcion, nombre, categoria):
+        """
+        Retorna una versión de la función que registra cada llamada como un intervalo.
+        """
+        @functools.wraps(funcion)
+        def envoltorio(*args, **kwargs):
+            reloj = time.perf_counter_ns
+            self._profundidad += 1
+            inicio = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                fin = reloj()
+                self._profundidad -= 1
+                self._registrar(nombre, categoria, inicio, fin)
+
+        return envoltorio
+
+    def instrumentar(self, objeto, nombres, categoria):
+        """
+        Reemplaza los métodos indicados del objeto (instancia o clase) por versiones trazadas.
+        """
+        for nombre in nombres:
+            if isinstance(objeto, type):
+                original = objeto.__dict__[nombre]
+                etiqueta = f"{objeto.__name__}.{nombre}"
+            else:
+                original = objeto.__dict__.get(nombre, _AUSENTE)
+                etiqueta = f"{type(objeto).__name__}.{nombre}"
+            setattr(objeto, nombre, self.envolver(getattr(objeto, nombre), etiqueta, categoria))
+            self._instrumentados.append((objeto, nombre, original))
+
+    def restaurar(self):
+        """Deshace todas las instrumentaciones en orden inverso."""
+        while self._instrumentados:
+            objeto, nombre, original = self._instrumentados.pop()
+            if original is _AUSENTE:
+                delattr(objeto, nombre)
+            else:
+                setattr(objeto, nombre, original)
+
+    def guardar(self, ruta):
+        """
+        Escribe los intervalos registrados en un archivo JSON de trazas de Chrome.
+        """
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump({"traceEvents": list(self.eventos), "displayTimeUnit": "ms"}, archivo, ensure_ascii=False)
+
+    def resumen(self):
+        """
+        Agrupa los intervalos por nombre con su cantidad y tiempo total en milisegundos,
+        ordenados del más costoso al menos costoso.
+        """
+        totales = {}
+        for evento in self.eventos:
+            cantidad, duracion = totales.get(evento["name"], (0, 0.0))
+            totales[evento["name"]] = (cantidad + 1, duracion + evento["dur"] / 1000)
+        return sorted(
+            ({"nombre": nombre, "cantidad": cantidad, "total_ms": total} for nombre, (cantidad, total) in totales.items()),
+            key=lambda fila: fila["total_ms"],
+            reverse=True
+        )
+
+    def _registrar(self, nombre, categoria, inicio, fin):
+        """Guarda un intervalo completo y avisa si es una acción lenta de primer nivel."""
+        self.eventos.append({
+            "name": nombre,
+            "cat": categoria,
+            "ph": "X",
+            "ts": (inicio - self._inicio) / 1000,
+            "dur": (fin - inicio) / 1000,
+            "pid": self._pid,
+            "tid": threading.get_ident()
+        })
+
+        duracion_ms = (fin - inicio) / 1e6
+        if self._profundidad == 0 and duracion_ms >= self.umbral_lento_ms:
+            self.acciones_lentas += 1
+            if self.al_detectar_lento is not None:
+                self.al_detectar_lento(nombre, duracion_ms)
+
+
+# Marca de un método que no estaba definido en la propia instancia
+_AUSENTE = object()
@@ -0,0 +1,189 @@
+"""
+Módulo de verificación de integridad del libro contable.
+Comprueba de forma incremental y por bloques paralelos que cada asiento
+cuadre y que la cadena de saldos de cada cuenta sea consistente.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from models.banco import CodigoOperacion, SIGNO_OPERACION, CONTRAPARTIDA_OPERACION
+
+# Tablas con claves enteras para que los procesos trabajadores no dependan del Enum
+_SIGNOS = {int(codigo): signo for codigo, signo in SIGNO_OPERACION.items()}
+_CODIGOS_EXTERNOS = frozenset(int(codigo) for codigo in CONTRAPARTIDA_OPERACION)
+_SALIDA = int(CodigoOperacion.TRANSFERENCIA_SALIDA)
+_ENTRADA = int(CodigoOperacion.TRANSFERENCIA_ENTRADA)
+
+
+def _formatear(centavos):
+    """Formatea un importe en centavos como texto monetario."""
+    signo = "-" if centavos < 0 else ""
+    centavos = abs(centavos)
+    return f"{signo}${centavos // 100}.{centavos % 100:02d}"
+
+
+def verificar_cadenas(apuntes, saldos_previos):
+    """
+    Verifica la cadena saldo_anterior → saldo_nuevo de un grupo de cuentas.
+    Cada apunte es (id, cuenta, codigo, monto, saldo_anterior, saldo_nuevo) en
+    centavos y en orden de id. Retorna los errores y el último saldo de cada cuenta.
+    """
+    errores = []
+    ultimos = dict(saldos_previos)
+    for id_transaccion, cuenta, codigo, monto, anterior, nuevo in apuntes:
+        if nuevo - anterior != _SIGNOS[codigo] * monto:
+            errores.append(
+                f"Transacción {id_transaccion}: el saldo de la cuenta {cuenta} varía "
+                f"{_formatear(nuevo - anterior)} para un apunte de {_formatear(monto)}"
+            )
+        esperado = ultimos.get(cuenta, 0)
+        if anterior != esperado:
+            errores.append(
+                f"Transacción {id_transaccion}: el saldo anterior {_formatear(anterior)} de la cuenta "
+                f"{cuenta} no coincide con su saldo previo {_formatear(esperado)}"
+            )
+        ultimos[cuenta] = nuevo
+    return errores, ultimos
+
+
+def verificar_asientos(apuntes):
+    """
+    Verifica que la suma de los apuntes de cada asiento, incluida la contrapartida
+    interna de las operaciones externas, sea cero.
+    Cada apunte es (id_asiento, id, cuenta, codigo, monto) en centavos.
+    Retorna los errores y la cantidad de asientos verificados.
+    """
+    asientos = {}
+    for apunte in apuntes:
+        asientos.setdefault(apunte[0], []).append(apunte)
+
+    errores = []
+    for id_asiento, lineas in asientos.items():
+        if len(lineas) == 1:
+            if lineas[0][3] not in _CODIGOS_EXTERNOS:
+                errores.append(f"Asiento {id_asiento}: la transferencia no tiene apunte de contrapartida")
+            continue
+
+        codigos = sorted(linea[3] for linea in lineas)
+        suma = sum(_SIGNOS[linea[3]] * linea[4] for linea in lineas)
+        if codigos != [_SALIDA, _ENTRADA] or lineas[0][2] == lineas[1][2]:
+            errores.append(f"Asiento {id_asiento}: combinación de apuntes no válida")
+        elif suma != 0:
+            errores.append(f"Asiento {id_asiento}: los apuntes no suman cero ({_formatear(suma)})")
+
+    return errores, len(asientos)
+
+
+class VerificadorLibro:
+    """Verificador incremental de la integridad del libro de un SistemaBancario."""
+
+    def __init__(self, sistema, procesos=1, minimo_paralelo=50000):
+        """
+        Inicializa el verificador.
+
+        Args:
+            sistema: SistemaBancario a verificar
+            procesos: Cantidad de procesos para verificar bloques en paralelo
+            minimo_paralelo: Apuntes pendientes a partir de los cuales se usan procesos
+        """
+        self.sistema = sistema
+        self.procesos = max(1, procesos)
+        self.minimo_paralelo = minimo_paralelo
+        self.ultimo_id_verificado = 0
+        self._saldos_verificados = {}  # cuenta -> saldo_nuevo del último apunte verificado
+
+    def verificar(self, comprobar_conservacion=True):
+        """
+        Verifica los apuntes registrados desde la última verificación.
+        Si comprobar_conservacion es True también comprueba que la suma de los
+        saldos de clientes y cuentas internas sea cero.
+        """
+        pendientes = self._apuntes_pendientes()
+
+        # Un asiento de transferencia con un solo apunte visible se deja para la próxima vez
+        while pendientes and int(pendientes[-1].codigo) == _SALIDA:
+            pendientes.pop()
+
+        # Una sola pasada convierte a centavos y reparte los apuntes entre los bloques:
+        # por cuenta para las cadenas de saldos y por asiento para la partida doble
+        particiones = self.procesos if len(pendientes) >= self.minimo_paralelo else 1
+        bloques_cadenas = [[] for _ in range(particiones)]
+        bloques_asientos = [[] for _ in range(particiones)]
+        for t in pendientes:
+            cuenta = t.numero_cuenta
+            codigo = int(t.codigo)
+            monto = int(t.monto * 100)
+            bloques_cadenas[cuenta % particiones].append(
+                (t.id, cuenta, codigo, monto, int(t.saldo_anterior * 100), int(t.saldo_nuevo * 100))
+            )
+            bloques_asientos[t.id_asiento % particiones].append((t.id_asiento, t.id, cuenta, codigo, monto))
+        saldos_previos = [
+            {cuenta: self._saldos_verificados[cuenta] for cuenta in {a[1] for a in bloque}
+             if cuenta in self._saldos_verificados}
+            for bloque in bloques_cadenas
+        ]
+
+        if particiones > 1:
+            with ProcessPoolExecutor(max_workers=particiones) as ejecutor:
+                futuros_cadenas = [
+                    ejecutor.submit(verificar_cadenas, bloque, previos)
+                    for bloque, previos in zip(bloques_cadenas, saldos_previos)
+                ]
+                futuros_asientos = [ejecutor.submit(verificar_asientos, bloque) for bloque in bloques_asientos]
+                resultados_cadenas = [futuro.result() for futuro in futuros_cadenas]
+                resultados_asientos = [futuro.result() for futuro in futuros_asientos]
+        else:
+            resultados_cadenas = [verificar_cadenas(bloques_cadenas[0], saldos_previos[0])]
+            resultados_asientos = [verificar_asientos(bloques_asientos[0])]
+
+        errores = []
+        for errores_bloque, ultimos in resultados_cadenas:
+            errores.extend(errores_bloque)
+            self._saldos_verificados.update(ultimos)
+        asientos_verificados = 0
+        for errores_bloque, cantidad in resultados_asientos:
+            errores.extend(errores_bloque)
+            asientos_verificados += cantidad
+
+        # El último apunte de cada cuenta debe coincidir con su saldo actual
+        for cuenta in {t.numero_cuenta for t in pendientes}:
+            saldo_actual = self.sistema.cuentas[cuenta].saldo_centavos
+            if self._saldos_verificados[cuenta] != saldo_actual:
+                errores.append(
+                    f"Cuenta {cuenta}: el saldo actual {_formatear(saldo_actual)} no coincide con "
+                    f"el último apunte {_formatear(self._saldos_verificados[cuenta])}"
+                )
+
+        if comprobar_conservacion:
+            total = sum(self.sistema.cuentas.saldos)
+            total += sum(_centavos(saldo) for saldo in self.sistema.saldos_contrapartida.values())
+            if total != 0:
+                errores.append(f"El dinero no se conserva: la suma de todos los saldos es {_formatear(total)}")
+
+        if pendientes:
+            self.ultimo_id_verificado = pendientes[-1].id
+
+        return {
+            "apuntes_verificados": len(pendientes),
+            "asientos_verificados": asientos_verificados,
+            "errores": errores,
+            "correcto": not errores
+        }
+
+    def _apuntes_pendientes(self):
+        """Retorna las transacciones posteriores a la última verificada."""
+        transacciones = self.sistema.transacciones
+        if not transacciones:
+            return []
+        if transacciones[0].id > self.ultimo_id_verificado + 1:
+            # Se archivaron apuntes sin verificar: la cadena continúa desde el resumen archivado
+            for cuenta, resumen in self.sistema.resumenes_archivados.items():
+                if resumen["ultimo_id"] > self.ultimo_id_verificado:
+                    self._saldos_verificados[cuenta] = _centavos(resumen["saldo_final"])
+        inicio = max(0, self.ultimo_id_verificado - transacciones[0].id + 1)
+        return transacciones[inicio:]
+
+
+def _centavos(valor):
+    """Convierte un importe decimal con dos decimales a centavos enteros."""
+    return int(valor * 100)
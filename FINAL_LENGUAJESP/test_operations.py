@@ -3,7 +3,33 @@ Script de prueba completo para el Sistema de Gestión Bancaria.
 Prueba todas las funcionalidades del sistema.
 """
 
-from logic import SistemaBancario
+import csv
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from models.banco import CodigoOperacion
+from operations.sistema import SistemaBancario
+from operations.intereses import MotorIntereses
+from operations.verificacion import VerificadorLibro
+from operations.resultados import CodigoResultado
+from operations.ordenes import ProgramadorOrdenes
+from operations.trazas import Trazador
+from operations.archivo import CompactadorLibro
+from operations.replicacion import LiderReplicacion, SeguidorReplicacion
+from operations.instantanea import guardar_instantanea, cargar_instantanea
+from operations.agregados import AgregadosTiempo
+from operations.memoria_compartida import PublicadorSaldos, LectorSaldos
+from operations.conciliacion import ConciliadorExtractos
+from operations.politicas import MotorPoliticas, PoliticaCuenta
+from operations.limites import ContadorVentana, MotorLimites, ReglaLimite, MINUTO, DIA
+from operations.carga import GeneradorCarga, GrabadorTraza, ejecutar_carga, reproducir_traza
 
 
 def test_sistema_bancario():
@@ -157,5 +183,979 @@ def test_sistema_bancario():
     print("\n✓ El sistema está listo para usarse")
 
 
+def test_cache_consultas():
+    """Prueba la caché de consultas y su invalidación por cuenta."""
+    sistema = SistemaBancario(capacidad_cache=4)
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 100.00)
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 50.00)
+
+    primera = sistema.buscar_cuenta(cuenta1['numero_cuenta'])
+    aciertos = sistema.obtener_estadisticas_cache()['aciertos']
+    assert sistema.buscar_cuenta(cuenta1['numero_cuenta']) == primera
+    assert sistema.obtener_estadisticas_cache()['aciertos'] == aciertos + 1
+    assert len(sistema.buscar_cuentas_por_titular("pérez")) == 1
+    sistema.obtener_transacciones_cuenta(cuenta2['numero_cuenta'])
+
+    # Modificar un resultado no altera la entrada en caché
+    primera['saldo'] = 0
+    sistema.buscar_cuentas_por_titular("pérez").append({})
+    sistema.obtener_transacciones_cuenta(cuenta2['numero_cuenta'])[0]['monto'] = 0
+    assert str(sistema.buscar_cuenta(cuenta1['numero_cuenta'])['saldo']) == "100.00"
+    assert len(sistema.buscar_cuentas_por_titular("pérez")) == 1
+    assert str(sistema.obtener_transacciones_cuenta(cuenta2['numero_cuenta'])[0]['monto']) == "50.00"
+
+    # Un depósito en la cuenta 1 no debe invalidar las consultas de la cuenta 2
+    sistema.depositar(cuenta1['numero_cuenta'], 25.00)
+    stats = sistema.obtener_estadisticas_cache()
+    assert stats['invalidaciones'] == 2
+    assert str(sistema.buscar_cuenta(cuenta1['numero_cuenta'])['saldo']) == "125.00"
+    assert sistema.buscar_cuentas_por_titular("pérez")[0]['saldo'] == sistema.buscar_cuenta(cuenta1['numero_cuenta'])['saldo']
+
+    fallos = sistema.obtener_estadisticas_cache()['fallos']
+    sistema.obtener_transacciones_cuenta(cuenta2['numero_cuenta'])
+    assert sistema.obtener_estadisticas_cache()['fallos'] == fallos
+
+    # Una cuenta nueva invalida solo las búsquedas por titular que la incluirían
+    invalidaciones = sistema.obtener_estadisticas_cache()['invalidaciones']
+    sistema.crear_cuenta("Ana Torres", "Nómina", 0.00)
+    assert sistema.obtener_estadisticas_cache()['invalidaciones'] == invalidaciones
+    sistema.crear_cuenta("Pedro Pérez", "Nómina", 0.00)
+    assert sistema.obtener_estadisticas_cache()['invalidaciones'] == invalidaciones + 1
+    assert len(sistema.buscar_cuentas_por_titular("pérez")) == 2
+
+    # La capacidad se respeta desalojando las entradas menos usadas
+    for numero in range(cuenta1['numero_cuenta'], cuenta1['numero_cuenta'] + 3):
+        sistema.obtener_transacciones_cuenta(numero)
+    stats = sistema.obtener_estadisticas_cache()
+    assert stats['entradas'] <= 4
+    assert stats['desalojos'] > 0
+
+
+def test_flujo_eventos():
+    """Prueba la suscripción al flujo de cambios del sistema."""
+    sistema = SistemaBancario()
+    suscripcion = sistema.suscribir_eventos(capacidad=3)
+
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 0.00)
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 300.00)
+    eventos = suscripcion.obtener()
+    assert [e.to_dict()['evento'] for e in eventos] == ["cuenta_creada", "cuenta_creada", "movimiento"]
+    assert [e.secuencia for e in eventos] == [1, 2, 3]
+
+    sistema.transferir(cuenta2['numero_cuenta'], cuenta1['numero_cuenta'], 120.00)
+    origen, destino = suscripcion.obtener()
+    assert (origen.numero_cuenta, str(origen.delta), str(origen.saldo_nuevo)) == (cuenta2['numero_cuenta'], "-120.00", "180.00")
+    assert (destino.numero_cuenta, str(destino.delta), str(destino.saldo_nuevo)) == (cuenta1['numero_cuenta'], "120.00", "120.00")
+    assert sistema.obtener_transacciones_por_id([origen.id_transaccion])[0]['tipo'] == f"Transferencia a {cuenta1['numero_cuenta']}"
+
+    # La cola acotada descarta los eventos más antiguos y lo informa
+    for _ in range(5):
+        sistema.depositar(cuenta1['numero_cuenta'], 1.00)
+    assert suscripcion.pendientes() == 3
+    assert suscripcion.reiniciar_perdidos() == 2
+
+    suscripcion.cancelar()
+    sistema.depositar(cuenta1['numero_cuenta'], 1.00)
+    assert suscripcion.pendientes() == 3
+
+
+def test_ciclo_vida_cuentas():
+    """Prueba el bloqueo, cierre y reactivación de cuentas."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 100.00)
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)
+    cuenta3 = sistema.crear_cuenta("Carlos Rodríguez", "Nómina", 0.00)
+
+    sistema.bloquear_cuenta(cuenta1['numero_cuenta'])
+    try:
+        sistema.depositar(cuenta1['numero_cuenta'], 10)
+        assert False, "Debería rechazar depósitos en cuentas bloqueadas"
+    except ValueError:
+        pass
+    assert sistema.buscar_cuenta(cuenta1['numero_cuenta'])['estado'] == "Bloqueada"
+
+    try:
+        sistema.cerrar_cuenta(cuenta1['numero_cuenta'])
+        assert False, "Debería rechazar el cierre de cuentas con saldo"
+    except ValueError:
+        pass
+
+    sistema.cerrar_cuenta(cuenta2['numero_cuenta'])
+    stats = sistema.obtener_estadisticas()
+    assert (stats['cuentas_activas'], stats['cuentas_bloqueadas'], stats['cuentas_cerradas']) == (1, 1, 1)
+    assert [c['numero_cuenta'] for c in sistema.obtener_cuentas_por_estado("Cerrada")] == [cuenta2['numero_cuenta']]
+
+    sistema.reactivar_cuenta(cuenta2['numero_cuenta'])
+    assert sistema.obtener_estadisticas()['cuentas_activas'] == 2
+
+    # El barrido de cuentas inactivas bloquea en lote solo a las activas sin movimientos
+    modificadas = sistema.bloquear_cuentas_inactivas("9999-12-31 23:59:59")
+    assert sorted(modificadas) == [cuenta2['numero_cuenta'], cuenta3['numero_cuenta']]
+    assert sistema.obtener_estadisticas()['cuentas_activas'] == 0
+    assert sistema.bloquear_cuentas_inactivas("2000-01-01 00:00:00") == []
+
+
+def test_motor_intereses():
+    """Prueba el devengo de intereses y el cobro de comisiones por tipo de cuenta."""
+    sistema = SistemaBancario()
+    ahorro = sistema.crear_cuenta("Juan Pérez", "Ahorro", 10000.00)
+    corriente = sistema.crear_cuenta("María González", "Corriente", 3.00)
+    nomina = sistema.crear_cuenta("Carlos Rodríguez", "Nómina", 3650.00)
+    bloqueada = sistema.crear_cuenta("Ana Martínez", "Ahorro", 500.00)
+    sistema.bloquear_cuenta(bloqueada['numero_cuenta'])
+    sistema.depositar(corriente['numero_cuenta'], 7.00)
+
+    motor = MotorIntereses(sistema, periodo_dias=365)
+    resumen = motor.ejecutar()
+    assert resumen['movimientos'] == 3
+    assert str(resumen['intereses']) == "336.50"
+    assert str(resumen['comisiones']) == "5.00"
+
+    assert str(sistema.buscar_cuenta(ahorro['numero_cuenta'])['saldo']) == "10300.00"
+    assert str(sistema.buscar_cuenta(corriente['numero_cuenta'])['saldo']) == "5.00"
+    assert str(sistema.buscar_cuenta(nomina['numero_cuenta'])['saldo']) == "3686.50"
+    assert str(sistema.buscar_cuenta(bloqueada['numero_cuenta'])['saldo']) == "500.00"
+
+    ultima = sistema.obtener_transacciones_cuenta(corriente['numero_cuenta'])[-1]
+    assert (ultima['tipo'], str(ultima['saldo_anterior']), str(ultima['saldo_nuevo'])) == ("Comisión de Mantenimiento", "10.00", "5.00")
+
+    # El motor programado no vuelve a ejecutarse antes de que venza el período
+    assert motor.ejecutar_si_corresponde() is None
+
+
+def test_generador_carga():
+    """Prueba la generación de carga sintética y la reproducción de trazas."""
+    generador = GeneradorCarga(50, exponente_zipf=1.2, semilla=7)
+    operaciones = list(itertools.chain(generador.operaciones_apertura(), generador.generar(2000)))
+    assert len(operaciones) == 2050
+    assert all(op[1] != op[2] for op in operaciones if op[0] == "transferencia")
+
+    # Con distribución Zipf las cuentas más calientes concentran la mayoría del tráfico
+    frecuencias = {}
+    for op in operaciones[50:]:
+        frecuencias[op[1]] = frecuencias.get(op[1], 0) + 1
+    mas_frecuentes = sorted(frecuencias.values(), reverse=True)[:5]
+    assert sum(mas_frecuentes) > 2000 * 0.4
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "traza.jsonl")
+        sistema_original = SistemaBancario()
+        grabador = GrabadorTraza(sistema_original, ruta)
+        informe = ejecutar_carga(grabador, operaciones)
+        grabador.cerrar()
+        assert informe['total']['cantidad'] == 2050
+        assert informe['total']['p50_us'] <= informe['total']['p99_us']
+
+        # Reproducir la traza en un sistema nuevo debe llevar al mismo estado
+        sistema_replica = SistemaBancario()
+        informe_replica = reproducir_traza(ruta, sistema_replica)
+        assert informe_replica['total']['rechazadas'] == informe['total']['rechazadas']
+        assert sistema_replica.obtener_estadisticas() == sistema_original.obtener_estadisticas()
+
+
+def test_extracto_paginado():
+    """Prueba la obtención del historial de una cuenta por páginas."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 0.00)
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)
+    for i in range(1, 26):
+        sistema.depositar(cuenta1['numero_cuenta'], i)
+        sistema.depositar(cuenta2['numero_cuenta'], i)
+
+    assert sistema.contar_transacciones_cuenta(cuenta1['numero_cuenta']) == 25
+
+    montos = []
+    antes_de_id = None
+    paginas = 0
+    while True:
+        pagina = sistema.obtener_pagina_transacciones_cuenta(cuenta1['numero_cuenta'], 10, antes_de_id)
+        montos.extend(int(trans['monto']) for trans in pagina['transacciones'])
+        paginas += 1
+        antes_de_id = pagina['siguiente_antes_de_id']
+        if antes_de_id is None:
+            break
+
+    assert paginas == 3
+    assert montos == list(range(25, 0, -1))
+    assert sistema.obtener_pagina_transacciones_cuenta(999999)['transacciones'] == []
+
+
+def test_libro_partida_doble():
+    """Prueba los asientos de partida doble y su verificación incremental."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)
+
+    salida, entrada = sistema.transferir(cuenta1['numero_cuenta'], cuenta2['numero_cuenta'], 250.00)
+    assert salida['id_asiento'] == entrada['id_asiento']
+    assert (salida['codigo'], entrada['codigo']) == (4, 5)
+    assert salida['tipo'] == f"Transferencia a {cuenta2['numero_cuenta']}"
+
+    apertura = sistema.obtener_transacciones_cuenta(cuenta1['numero_cuenta'])[0]
+    assert (apertura['tipo'], str(apertura['saldo_anterior'])) == ("Depósito Inicial", "0.00")
+
+    verificador = VerificadorLibro(sistema, procesos=2, minimo_paralelo=0)
+    resultado = verificador.verificar()
+    assert resultado['correcto'], resultado['errores']
+    assert (resultado['apuntes_verificados'], resultado['asientos_verificados']) == (3, 2)
+
+    # La siguiente verificación solo revisa los apuntes nuevos
+    sistema.retirar(cuenta2['numero_cuenta'], 50.00)
+    sistema.depositar(cuenta1['numero_cuenta'], 10.00)
+    resultado = verificador.verificar()
+    assert resultado['correcto'], resultado['errores']
+    assert resultado['apuntes_verificados'] == 2
+
+    # Una alteración del libro se detecta en la cadena de saldos y en la conservación del dinero
+    sistema.depositar(cuenta2['numero_cuenta'], 5.00)
+    sistema.transacciones[-1].saldo_anterior += 1
+    sistema.cuentas[cuenta2['numero_cuenta']].saldo += 1
+    resultado = VerificadorLibro(sistema).verificar()
+    assert not resultado['correcto']
+    assert len(resultado['errores']) == 4
+
+
+def test_arranque_sin_interfaz():
+    """Prueba que el modo sin interfaz no importa Tkinter ni la GUI."""
+    codigo = (
+        "import sys, main; main.main_sin_interfaz(3); "
+        "print('tkinter' in sys.modules, 'gui' in sys.modules)"
+    )
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.splitlines()
+    assert salida[0].startswith("Sistema Activo | Cuentas: 3")
+    assert salida[-1] == "False False"
+
+
+def test_limites_velocidad():
+    """Prueba las reglas de límite con ventanas deslizantes."""
+    contador = ContadorVentana(MINUTO)
+    contador.agregar(0, 100)
+    contador.agregar(30, 200)
+    assert contador.totales(59) == (2, 300)
+    assert contador.totales(61) == (1, 200)
+    assert contador.totales(1000) == (0, 0)
+
+    reloj = [0.0]
+    limites = MotorLimites([
+        ReglaLimite("Límite de retiros por minuto", MINUTO, max_operaciones=2),
+        ReglaLimite("Límite diario de Ahorro", DIA, max_monto=300, tipo_cuenta="Ahorro")
+    ], reloj=lambda: reloj[0])
+    sistema = SistemaBancario(limites=limites)
+    ahorro = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)['numero_cuenta']
+    corriente = sistema.crear_cuenta("María González", "Corriente", 1000.00)['numero_cuenta']
+
+    sistema.retirar(ahorro, 100.00)
+    sistema.transferir(ahorro, corriente, 150.00)
+    try:
+        sistema.retirar(ahorro, 10.00)
+        assert False, "Debería exceder el límite por minuto"
+    except ValueError as e:
+        assert "por minuto" in str(e)
+    assert sistema.buscar_cuenta(ahorro)['saldo'] == 750
+
+    # Al avanzar la ventana se liberan operaciones, pero no el monto diario
+    reloj[0] = 120.0
+    try:
+        sistema.retirar(ahorro, 60.00)
+        assert False, "Debería exceder el límite diario"
+    except ValueError as e:
+        assert "Disponible en 24 horas: $50.00" in str(e)
+    sistema.retirar(ahorro, 50.00)
+
+    # Las reglas por tipo no afectan a otras cuentas y los depósitos no tienen límite
+    sistema.retirar(corriente, 500.00)
+    sistema.depositar(ahorro, 1000.00)
+    reloj[0] = DIA + 200.0
+    sistema.retirar(ahorro, 300.00)
+
+    # Los contadores cuya ventana quedó vacía se eliminan al pasar la ventana de su regla
+    assert limites.contadores_activos() == 2
+    reloj[0] = 3 * DIA
+    sistema.retirar(corriente, 1.00)
+    assert limites.contadores_activos() == 1
+
+    # El rechazo del límite de la cuenta origen detiene la transferencia
+    limites = MotorLimites([ReglaLimite("Límite por minuto", MINUTO, max_operaciones=1)], reloj=lambda: 0.0)
+    sistema = SistemaBancario(limites=limites)
+    origen = sistema.crear_cuenta("Juan Pérez", "Ahorro", 100.00)['numero_cuenta']
+    destino = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+    assert sistema.intentar_transferir(origen, destino, 10.00).ok
+    resultado = sistema.intentar_transferir(origen, destino, 10.00)
+    assert resultado.codigo == CodigoResultado.LIMITE_OPERACIONES
+    assert sistema.buscar_cuenta(origen)['saldo'] == 90
+
+
+def test_resultados_sin_excepciones():
+    """Prueba la API de operaciones que retorna códigos de resultado."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 100.00)['numero_cuenta']
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+
+    resultado = sistema.intentar_retirar(cuenta1, 500.00)
+    assert not resultado.ok
+    assert resultado.codigo == CodigoResultado.SALDO_INSUFICIENTE
+    assert resultado.mensaje == "Saldo insuficiente. Saldo disponible: $100.00"
+
+    assert sistema.intentar_depositar(999, 10).codigo == CodigoResultado.CUENTA_NO_EXISTE
+    assert sistema.intentar_depositar(cuenta1, 0).mensaje == "El monto a depositar debe ser mayor a cero"
+    assert sistema.intentar_transferir(cuenta1, cuenta1, 10).codigo == CodigoResultado.MISMA_CUENTA
+    sistema.bloquear_cuenta(cuenta2)
+    assert sistema.intentar_transferir(cuenta1, cuenta2, 10).codigo == CodigoResultado.CUENTAS_NO_ACTIVAS
+    sistema.reactivar_cuenta(cuenta2)
+
+    resultado = sistema.intentar_transferir(cuenta1, cuenta2, 40.00)
+    assert resultado.ok and resultado.mensaje == ""
+    salida, entrada = resultado.valor
+    assert (salida.saldo_nuevo, entrada.saldo_nuevo) == (60, 40)
+    assert len(sistema.transacciones) == 3
+
+    # Los métodos que lanzan excepciones conservan sus mensajes
+    try:
+        sistema.retirar(cuenta2, 100.00)
+        assert False, "Debería lanzar ValueError"
+    except ValueError as e:
+        assert str(e) == "Saldo insuficiente. Saldo disponible: $40.00"
+
+
+def test_almacen_cuentas_denso():
+    """Prueba el almacén de cuentas indexado por número consecutivo."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.50)
+    cuenta2 = sistema.crear_cuenta("Juan Pérez", "Empresarial", 0)
+    almacen = sistema.cuentas
+
+    assert cuenta2['numero_cuenta'] == cuenta1['numero_cuenta'] + 1
+    assert len(almacen) == 2 and list(almacen) == [cuenta1['numero_cuenta'], cuenta2['numero_cuenta']]
+    assert almacen.saldos[0] == 100050
+    assert almacen.titulares[0] is almacen.titulares[1]
+    assert cuenta2['tipo_cuenta'] == "Empresarial"
+    assert almacen.get(999) is None and 1000000 not in almacen and cuenta1['numero_cuenta'] in almacen
+
+    # La vista lee y escribe en las columnas del almacén
+    vista = almacen[cuenta1['numero_cuenta']]
+    vista.saldo = 1000
+    assert almacen.saldos[0] == 100000
+    assert sistema.buscar_cuenta(cuenta1['numero_cuenta'])['saldo'] == 1000
+    sistema.bloquear_cuenta(cuenta2['numero_cuenta'])
+    assert almacen[cuenta2['numero_cuenta']].to_dict()['estado'] == "Bloqueada"
+    assert sistema.obtener_estadisticas()['saldo_total_sistema'] == 1000
+
+
+def test_ordenes_permanentes():
+    """Prueba la ejecución en lote de órdenes permanentes y sus reintentos."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 100.00)['numero_cuenta']
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+    cuenta3 = sistema.crear_cuenta("Carlos López", "Nómina", 0.00)['numero_cuenta']
+
+    inicio = datetime(2025, 1, 1)
+    programador = ProgramadorOrdenes(sistema, max_reintentos=1, espera_reintento=timedelta(hours=1))
+    programador.crear_orden(cuenta1, cuenta2, 60.00, intervalo_dias=30, primera_ejecucion=inicio)
+    orden = programador.crear_orden(cuenta1, cuenta3, 50.00, intervalo_dias=7, primera_ejecucion=inicio,
+                                    repeticiones=2)
+
+    assert programador.ejecutar_pendientes(inicio - timedelta(days=1))['ejecutadas'] == 0
+
+    # Ambas vencen en el mismo ciclo; la segunda no tiene saldo y se reintenta
+    resumen = programador.ejecutar_pendientes(inicio)
+    assert (resumen['ejecutadas'], resumen['reintentos'], resumen['omitidas']) == (1, 1, 0)
+    salida, entrada = sistema.transacciones[-2:]
+    assert salida.id_asiento == entrada.id_asiento and entrada.numero_cuenta == cuenta2
+    assert sistema.buscar_cuenta(cuenta1)['saldo'] == 40
+
+    # Con saldo suficiente el reintento se ejecuta y la orden vuelve a su calendario
+    sistema.depositar(cuenta1, 100.00)
+    resumen = programador.ejecutar_pendientes(inicio + timedelta(hours=1))
+    assert resumen['ejecutadas'] == 1
+    assert programador.ordenes[orden['id_orden']].proxima_ejecucion == inicio + timedelta(days=7)
+
+    # Agotados los reintentos se omite la ejecución; tras la última repetición la orden termina
+    sistema.retirar(cuenta1, 90.00)
+    assert programador.ejecutar_pendientes(inicio + timedelta(days=7))['reintentos'] == 1
+    assert programador.ejecutar_pendientes(inicio + timedelta(days=8))['omitidas'] == 1
+    assert programador.pendientes() == 1
+
+    programador.cancelar_orden(1)
+    assert programador.ejecutar_pendientes(inicio + timedelta(days=60))['ejecutadas'] == 0
+    assert VerificadorLibro(sistema).verificar()['correcto']
+
+
+def test_trazas_rendimiento():
+    """Prueba los intervalos anidados del trazador y su archivo de trazas."""
+    sistema = SistemaBancario()
+    lentas = []
+    trazador = Trazador(umbral_lento_ms=0, al_detectar_lento=lambda nombre, ms: lentas.append(nombre))
+    trazador.instrumentar(sistema, ("crear_cuenta", "depositar", "intentar_depositar"), "sistema")
+
+    numero_cuenta = sistema.crear_cuenta("Juan Pérez", "Ahorro", 0)['numero_cuenta']
+    sistema.depositar(numero_cuenta, 10.00)
+
+    nombres = [evento["name"] for evento in trazador.eventos]
+    assert nombres == ["SistemaBancario.crear_cuenta", "SistemaBancario.intentar_depositar",
+                       "SistemaBancario.depositar"]
+    interno, externo = list(trazador.eventos)[1:]
+    assert externo["ts"] <= interno["ts"] and interno["dur"] <= externo["dur"]
+    # Solo las llamadas de primer nivel se avisan como lentas
+    assert lentas == ["SistemaBancario.crear_cuenta", "SistemaBancario.depositar"]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "traza.json")
+        trazador.guardar(ruta)
+        with open(ruta, encoding="utf-8") as archivo:
+            traza = json.load(archivo)
+    assert len(traza["traceEvents"]) == 3 and traza["traceEvents"][0]["ph"] == "X"
+
+    trazador.restaurar()
+    assert "depositar" not in vars(sistema)
+    sistema.depositar(numero_cuenta, 1.00)
+    assert len(trazador.eventos) == 3
+
+
+def test_consulta_cuentas_lote():
+    """Prueba las consultas de varias cuentas en una sola llamada."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 100.00)['numero_cuenta']
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 25.50)['numero_cuenta']
+    sistema.bloquear_cuenta(cuenta2)
+
+    resultado = sistema.saldos([cuenta2, 999, cuenta1])
+    assert resultado['numero_cuenta'] == [cuenta2, cuenta1]
+    assert [str(saldo) for saldo in resultado['saldo']] == ["25.50", "100.00"]
+    assert resultado['estado'] == ["Bloqueada", "Activa"]
+    assert resultado['no_encontradas'] == [999]
+
+    cuentas = sistema.buscar_cuentas([cuenta1, cuenta2])
+    assert cuentas['titular'] == ["Juan Pérez", "María González"]
+    assert cuentas['tipo_cuenta'] == ["Ahorro", "Corriente"]
+    assert cuentas['saldo'][0] == sistema.buscar_cuenta(cuenta1)['saldo']
+
+    # El generador de carga y el grabador de trazas admiten la consulta en lote
+    generador = GeneradorCarga(50, mezcla={"consulta_lote": 1.0}, semilla=3)
+    with tempfile.TemporaryDirectory() as directorio:
+        destino = SistemaBancario()
+        grabador = GrabadorTraza(destino, os.path.join(directorio, "traza.jsonl"))
+        ejecutar_carga(grabador, generador.operaciones_apertura())
+        informe = ejecutar_carga(grabador, generador.generar(20))
+        grabador.cerrar()
+        assert informe['operaciones']['consulta_lote']['cantidad'] == 20
+        repetido = reproducir_traza(os.path.join(directorio, "traza.jsonl"), SistemaBancario())
+        assert repetido['operaciones']['consulta_lote']['rechazadas'] == 0
+
+
+def test_compactacion_libro():
+    """Prueba el archivo del historial antiguo en segmentos comprimidos."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)['numero_cuenta']
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+    sistema.transferir(cuenta1, cuenta2, 300.00)
+    sistema.retirar(cuenta2, 50.00)
+    verificador = VerificadorLibro(sistema)
+    assert verificador.verificar()['correcto']
+
+    # Simular que los primeros apuntes son antiguos
+    for transaccion in sistema.transacciones[:3]:
+        transaccion.fecha = "2020-01-01 00:00:00"
+
+    with tempfile.TemporaryDirectory() as directorio:
+        compactador = CompactadorLibro(sistema, directorio, retencion_dias=365)
+        segmento = compactador.compactar()
+        assert (segmento.primer_id, segmento.ultimo_id) == (1, 3)
+        assert compactador.compactar() is None
+
+        assert [t.id for t in sistema.transacciones] == [4]
+        assert sistema.obtener_estadisticas()['total_transacciones'] == 4
+        assert [t['id'] for t in sistema.obtener_transacciones_cuenta(cuenta2)] == [4]
+        resumen = sistema.obtener_resumen_archivado(cuenta1)
+        assert (resumen['saldo_inicial'], resumen['saldo_final'], resumen['movimientos']) == (0, 700, 2)
+        assert (resumen['total_creditos'], resumen['total_debitos']) == (1000, 300)
+
+        archivadas = list(compactador.consultar_archivo(numero_cuenta=cuenta2))
+        assert [(t['id'], t['monto']) for t in archivadas] == [(3, 300)]
+
+        # Un nuevo compactador encuentra los segmentos ya escritos y descarta las escrituras interrumpidas
+        assert os.listdir(directorio) == [os.path.basename(segmento.ruta)]
+        interrumpido = os.path.join(directorio, "segmento_000000000004_000000000009.jsonl.gz.tmp")
+        with open(interrumpido, "wb") as archivo:
+            archivo.write(b"\x1f\x8b")
+        ajeno = os.path.join(directorio, "notas.tmp")
+        with open(ajeno, "w") as archivo:
+            archivo.write("no pertenece al archivo")
+        segmentos = CompactadorLibro(sistema, directorio).obtener_segmentos()
+        assert len(segmentos) == 1 and segmentos[0]['cantidad'] == 3
+        assert not os.path.exists(interrumpido)
+        assert os.path.exists(ajeno)
+
+    sistema.depositar(cuenta2, 10.00)
+    assert verificador.verificar()['correcto']
+    assert VerificadorLibro(sistema).verificar()['correcto']
+
+
+def test_replicacion_lider_seguidor():
+    """Prueba la replicación del diario a seguidores locales y la promoción."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)['numero_cuenta']
+    lider = LiderReplicacion(sistema)
+    host, puerto = lider.direccion
+    seguidor = SeguidorReplicacion(host, puerto).iniciar()
+    try:
+        cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+        sistema.transferir(cuenta1, cuenta2, 250.00)
+        sistema.bloquear_cuenta(cuenta2)
+        assert seguidor.esperar(lider.metricas()['ultima_secuencia'])
+
+        replica = seguidor.consulta
+        assert replica.buscar_cuenta(cuenta2)['saldo'] == 250
+        assert replica.buscar_cuenta(cuenta2)['estado'] == "Bloqueada"
+        assert replica.obtener_todas_transacciones() == sistema.obtener_todas_transacciones()
+        assert seguidor.metricas()['retraso_registros'] == 0
+        try:
+            replica.depositar(cuenta1, 10)
+            assert False, "La réplica debería ser de solo lectura"
+        except ValueError as e:
+            assert "solo lectura" in str(e)
+
+        # Un seguidor en otro proceso recibe el mismo estado
+        salida = subprocess.run(
+            [sys.executable, "-m", "operations.replicacion", "--seguir", f"{host}:{puerto}",
+             "--hasta", str(lider.metricas()['ultima_secuencia'])],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True, timeout=60
+        ).stdout
+        estado = json.loads(salida)
+        assert estado['alcanzado']
+        assert estado['estadisticas']['saldo_total_sistema'] == "1000.00"
+        assert estado['estadisticas']['cuentas_bloqueadas'] == 1
+
+        # La réplica promovida acepta escrituras y las publica a sus propios seguidores
+        lider.detener()
+        nuevo_lider = seguidor.promover()
+        try:
+            seguidor.sistema.depositar(cuenta1, 5.00)
+            otro = SeguidorReplicacion(*nuevo_lider.direccion).iniciar()
+            assert otro.esperar(nuevo_lider.metricas()['ultima_secuencia'])
+            assert otro.consulta.buscar_cuenta(cuenta1)['saldo'] == 755
+            otro.detener()
+        finally:
+            nuevo_lider.detener()
+    finally:
+        lider.detener()
+        seguidor.detener()
+
+
+def test_replicacion_diario_acotado():
+    """Prueba el descarte de registros confirmados y el arranque de réplicas desde una instantánea."""
+    sistema = SistemaBancario()
+    cuenta = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)['numero_cuenta']
+    lider = LiderReplicacion(sistema, max_diario=10)
+    host, puerto = lider.direccion
+    seguidor = SeguidorReplicacion(host, puerto).iniciar()
+    try:
+        for _ in range(10):
+            for _ in range(3):
+                sistema.depositar(cuenta, 1.00)
+            assert seguidor.esperar(lider.metricas()['ultima_secuencia'])
+
+        metricas = lider.metricas()
+        assert metricas['ultima_secuencia'] == 32
+        assert metricas['registros_en_diario'] <= 10 and metricas['primera_secuencia'] > 1
+        assert seguidor.consulta.buscar_cuenta(cuenta)['saldo'] == 1030
+
+        # Un seguidor nuevo ya no encuentra el comienzo del diario
+        tardio = SeguidorReplicacion(host, puerto).iniciar()
+        assert not tardio.esperar(1, tiempo_maximo=5)
+        assert "instantánea" in tardio.error
+        tardio.detener()
+
+        # Las conexiones cerradas se descartan
+        limite = time.monotonic() + 5
+        while len(lider._conexiones) > 1 and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert len(lider._conexiones) == 1
+
+        # Desde una instantánea del líder, la réplica continúa con el resto del diario
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "lider.bin")
+            secuencia = lider.guardar_instantanea(ruta)
+            nuevo = SeguidorReplicacion(host, puerto, cargar_instantanea(ruta), desde=secuencia).iniciar()
+        try:
+            sistema.depositar(cuenta, 5.00)
+            assert nuevo.esperar(lider.metricas()['ultima_secuencia'])
+            assert nuevo.consulta.buscar_cuenta(cuenta)['saldo'] == 1035
+            assert nuevo.consulta.obtener_todas_transacciones() == sistema.obtener_todas_transacciones()
+        finally:
+            nuevo.detener()
+    finally:
+        lider.detener()
+        seguidor.detener()
+
+
+def test_replicacion_historial_archivado():
+    """Prueba la replicación de los resúmenes archivados y de las compactaciones del líder."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)['numero_cuenta']
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+    sistema.transferir(cuenta1, cuenta2, 300.00)
+    sistema.retirar(cuenta2, 50.00)
+    for transaccion in sistema.transacciones[:3]:
+        transaccion.fecha = "2020-01-01 00:00:00"
+
+    with tempfile.TemporaryDirectory() as directorio:
+        compactador = CompactadorLibro(sistema, directorio, retencion_dias=365)
+        compactador.compactar()
+
+        lider = LiderReplicacion(sistema)
+        seguidor = SeguidorReplicacion(*lider.direccion).iniciar()
+        try:
+            assert seguidor.esperar(lider.metricas()['ultima_secuencia'])
+            replica = seguidor.consulta
+            assert replica.obtener_resumen_archivado(cuenta1) == sistema.obtener_resumen_archivado(cuenta1)
+            assert replica.obtener_estadisticas() == sistema.obtener_estadisticas()
+            assert replica.buscar_cuenta(cuenta2)['saldo'] == 250
+
+            # Una compactación posterior del líder se repite en la réplica
+            sistema.depositar(cuenta1, 100.00)
+            sistema.transacciones[0].fecha = "2020-01-02 00:00:00"
+            compactador.compactar()
+            assert seguidor.esperar(lider.metricas()['ultima_secuencia'])
+            assert [t['id'] for t in replica.obtener_todas_transacciones()] == [5]
+            # La fecha del apunte se cambió en el líder después de replicarlo
+            resumen = replica.obtener_resumen_archivado(cuenta2)
+            assert (resumen['saldo_final'], resumen['movimientos'], resumen['ultimo_id']) == (250, 2, 4)
+            assert replica.obtener_estadisticas() == sistema.obtener_estadisticas()
+            assert VerificadorLibro(seguidor.sistema).verificar()['correcto']
+        finally:
+            lider.detener()
+            seguidor.detener()
+
+
+def test_instantanea_binaria():
+    """Prueba el guardado y la carga del estado completo en una instantánea."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)['numero_cuenta']
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+    cuenta3 = sistema.crear_cuenta("Pedro Ruiz", "Plazo Fijo", 10.00)['numero_cuenta']
+    sistema.transferir(cuenta1, cuenta2, 300.55)
+    sistema.retirar(cuenta2, 50.00)
+    sistema.bloquear_cuenta(cuenta3)
+    for transaccion in sistema.transacciones[:2]:
+        transaccion.fecha = "2020-01-01 00:00:00"
+
+    with tempfile.TemporaryDirectory() as directorio:
+        CompactadorLibro(sistema, directorio).compactar()
+        ruta = os.path.join(directorio, "estado.sbin")
+        guardar_instantanea(sistema, ruta)
+        restaurado = cargar_instantanea(ruta)
+
+        assert restaurado.obtener_estadisticas() == sistema.obtener_estadisticas()
+        assert restaurado.obtener_todas_cuentas() == sistema.obtener_todas_cuentas()
+        assert restaurado.obtener_todas_transacciones() == sistema.obtener_todas_transacciones()
+        assert restaurado.obtener_resumen_archivado(cuenta1) == sistema.obtener_resumen_archivado(cuenta1)
+        assert restaurado.obtener_volumen("minuto") == sistema.obtener_volumen("minuto")
+        assert restaurado.obtener_cuentas_por_estado("Bloqueada")[0]['numero_cuenta'] == cuenta3
+        assert [t['id'] for t in restaurado.obtener_transacciones_cuenta(cuenta2)] == [4, 5]
+        assert VerificadorLibro(restaurado).verificar()['correcto']
+
+        # Los contadores continúan donde quedaron
+        cuenta4 = restaurado.crear_cuenta("Ana Torres", "Ahorro", 5.00)['numero_cuenta']
+        assert cuenta4 == sistema.siguiente_numero_cuenta
+        assert restaurado.transacciones[-1].id == sistema.siguiente_id_transaccion
+
+        # Una versión desconocida se rechaza
+        with open(ruta, "r+b") as archivo:
+            archivo.seek(4)
+            archivo.write((99).to_bytes(2, "little"))
+        try:
+            cargar_instantanea(ruta)
+            assert False, "Debería rechazar una versión desconocida"
+        except ValueError as e:
+            assert "99" in str(e)
+
+        # Guardar de nuevo reemplaza el archivo sin dejar temporales
+        guardar_instantanea(sistema, ruta)
+        assert not os.path.exists(ruta + ".tmp")
+
+        # Un archivo truncado se rechaza en lugar de cargar bloques incompletos
+        for tamano in (os.path.getsize(ruta) - 1, 20):
+            with open(ruta, "r+b") as archivo:
+                archivo.truncate(tamano)
+            try:
+                cargar_instantanea(ruta)
+                assert False, "Debería rechazar una instantánea truncada"
+            except ValueError as e:
+                assert "truncada" in str(e)
+
+
+def test_ranking_saldos():
+    """Prueba los rankings y rangos de saldo del índice ordenado."""
+    sistema = SistemaBancario()
+    ahorro1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 500.00)['numero_cuenta']
+    ahorro2 = sistema.crear_cuenta("Ana Torres", "Ahorro", 1500.00)['numero_cuenta']
+    corriente = sistema.crear_cuenta("María González", "Corriente", 800.00)['numero_cuenta']
+    plazo = sistema.crear_cuenta("Pedro Ruiz", "Plazo Fijo", 100.00)['numero_cuenta']
+
+    mayores = sistema.cuentas_mayor_saldo(2)
+    assert [c['numero_cuenta'] for c in mayores] == [ahorro2, corriente]
+    totales = sistema.obtener_totales_por_tipo()
+    assert list(totales) == ["Ahorro", "Corriente", "Plazo Fijo"]
+    assert (totales["Ahorro"]["cantidad"], totales["Ahorro"]["saldo_total"]) == (2, 2000)
+    assert [c['numero_cuenta'] for c in sistema.cuentas_menor_saldo(1, "Ahorro")] == [ahorro1]
+    assert sistema.posicion_saldo(ahorro1)['posicion'] == 3
+
+    # El índice sigue a los depósitos, transferencias y lotes posteriores
+    sistema.depositar(plazo, 2000.00)
+    sistema.transferir(ahorro2, ahorro1, 1200.00)
+    MotorIntereses(sistema, periodo_dias=365).ejecutar()
+    assert [c['numero_cuenta'] for c in sistema.cuentas_mayor_saldo(4)] == [plazo, ahorro1, corriente, ahorro2]
+    assert sistema.posicion_saldo(ahorro2, "Ahorro") == {
+        'numero_cuenta': ahorro2, 'saldo': sistema.buscar_cuenta(ahorro2)['saldo'], 'posicion': 2, 'total': 2
+    }
+
+    nueva = sistema.crear_cuenta("Luis Gómez", "Corriente", 900.00)['numero_cuenta']
+    en_rango = sistema.cuentas_en_rango_saldo(700, 1000, "Corriente")
+    assert [c['numero_cuenta'] for c in en_rango] == [corriente, nueva]
+    assert sistema.contar_cuentas_en_rango_saldo(0, 1000) == 3
+    assert sistema.cuentas_en_rango_saldo(0, 1000, "Inexistente") == []
+
+    try:
+        sistema.posicion_saldo(corriente, "Ahorro")
+        assert False, "Debería rechazar un tipo distinto al de la cuenta"
+    except ValueError:
+        pass
+
+
+def test_agregados_por_tiempo():
+    """Prueba los agregados de volumen por minuto, hora y día."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)['numero_cuenta']
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+    sistema.depositar(cuenta1, 50.25)
+    sistema.transferir(cuenta1, cuenta2, 300.00)
+    MotorIntereses(sistema, periodo_dias=365).ejecutar()
+
+    hoy = sistema.obtener_volumen("dia")
+    assert len(hoy) == 1 and hoy[0]['cantidad'] == len(sistema.transacciones)
+    por_operacion = hoy[0]['por_operacion']
+    assert por_operacion[CodigoOperacion.DEPOSITO] == {'cantidad': 1, 'monto': Decimal("50.25")}
+    assert por_operacion[CodigoOperacion.TRANSFERENCIA_SALIDA]['monto'] == 300
+    assert sum(p['cantidad'] for p in sistema.obtener_volumen("minuto")) == len(sistema.transacciones)
+
+    # Las cubetas finas antiguas se descartan; los totales siguen en las gruesas
+    agregados = AgregadosTiempo({"minuto": timedelta(hours=1)})
+    agregados.registrar("2024-03-01 10:15:00", CodigoOperacion.RETIRO, 1000)
+    agregados.registrar("2024-03-01 10:15:30", CodigoOperacion.RETIRO, 500)
+    agregados.registrar_totales("2024-03-01 12:00:00", {CodigoOperacion.DEPOSITO: (3, 900)})
+    assert [p['periodo'] for p in agregados.serie("minuto")] == ["2024-03-01 12:00"]
+    assert [p['cantidad'] for p in agregados.serie("hora")] == [2, 3]
+    assert agregados.serie("hora", desde="2024-03-01 11:00:00") == agregados.serie("hora", "2024-03-01 12")
+    dia = agregados.periodo("dia", "2024-03-01 23:59:59")
+    assert dia['por_operacion'][CodigoOperacion.RETIRO] == {'cantidad': 2, 'monto': Decimal("15.00")}
+
+    try:
+        sistema.obtener_volumen("semana")
+        assert False, "Debería rechazar una resolución desconocida"
+    except ValueError:
+        pass
+
+
+def test_saldos_memoria_compartida():
+    """Prueba la tabla de saldos compartida con procesos lectores."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)['numero_cuenta']
+    publicador = PublicadorSaldos(sistema, capacidad=3)
+    try:
+        cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+        sistema.transferir(cuenta1, cuenta2, 250.00)
+        sistema.bloquear_cuenta(cuenta2)
+
+        # Un proceso lector independiente ve el estado publicado
+        salida = subprocess.run(
+            [sys.executable, "-m", "operations.memoria_compartida", publicador.nombre,
+             str(cuenta1), str(cuenta2), "999"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True, timeout=60
+        ).stdout
+        estado = json.loads(salida)
+        assert estado['saldo'] == ["750.00", "250.00"]
+        assert estado['estado'] == ["Activa", "Bloqueada"]
+        assert estado['no_encontradas'] == [999]
+        assert estado['saldo_total'] == "1000.00"
+
+        lector = LectorSaldos(publicador.nombre, max_reintentos=10)
+        try:
+            sistema.depositar(cuenta1, 10.00)
+            assert lector.leer(cuenta1) == (Decimal("760.00"), "Activa")
+            assert lector.secuencia() == publicador.metricas()['secuencia']
+
+            # Las cuentas que no caben en el segmento no se publican
+            sistema.crear_cuenta("Pedro Ruiz", "Ahorro", 5.00)
+            cuenta4 = sistema.crear_cuenta("Ana Torres", "Ahorro", 5.00)['numero_cuenta']
+            assert lector.saldo(cuenta4) is None
+            assert publicador.metricas()['sin_publicar'] == 1
+
+            # Una lectura durante una escritura se repite y no devuelve datos a medias
+            publicador._secuencia[0] += 1
+            try:
+                lector.saldo(cuenta1)
+                assert False, "La lectura debería esperar a que termine la escritura"
+            except TimeoutError:
+                assert lector.reintentos == 10
+            publicador._secuencia[0] += 1
+            assert lector.saldo(cuenta1) == 760
+
+            # Compactar el historial con el publicador conectado no afecta la tabla publicada
+            for transaccion in sistema.transacciones[:3]:
+                transaccion.fecha = "2020-01-01 00:00:00"
+            with tempfile.TemporaryDirectory() as directorio:
+                assert CompactadorLibro(sistema, directorio, retencion_dias=365).compactar() is not None
+            assert sistema.transacciones_archivadas == 3
+            assert lector.leer(cuenta2) == (Decimal("250.00"), "Bloqueada")
+        finally:
+            lector.cerrar()
+    finally:
+        publicador.cerrar()
+
+
+def test_conciliacion_extractos():
+    """Prueba la conciliación de un extracto externo contra el libro."""
+    sistema = SistemaBancario()
+    cuenta1 = sistema.crear_cuenta("Juan Pérez", "Ahorro", 1000.00)['numero_cuenta']
+    cuenta2 = sistema.crear_cuenta("María González", "Corriente", 0.00)['numero_cuenta']
+    sistema.transferir(cuenta1, cuenta2, 300.00)
+    sistema.retirar(cuenta2, 50.00)
+    sistema.depositar(cuenta1, 20.00)
+    apertura, salida, entrada, retiro, deposito = sistema.transacciones
+
+    lineas = [
+        ("numero_cuenta", "fecha", "monto", "referencia"),
+        (cuenta1, apertura.fecha, "1000.00", "A-1"),
+        (cuenta1, salida.fecha, "-300.00", "A-2"),
+        (cuenta2, entrada.fecha, "300", "A-3"),
+        (cuenta2, retiro.fecha, "-55.00", "A-4"),   # Monto distinto al del libro
+        (cuenta2, retiro.fecha, "-10.00", "A-5"),   # Sin apunte en el libro
+        (cuenta1, "no es fecha", "5.00", "A-6"),
+        (cuenta1, deposito.fecha, "Infinity", "A-7"),
+        (cuenta1, deposito.fecha, "1e999999", "A-8")
+    ]
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_extracto = os.path.join(directorio, "extracto.csv")
+        with open(ruta_extracto, "w", encoding="utf-8") as archivo:
+            archivo.writelines(",".join(str(valor) for valor in linea) + "\n" for linea in lineas)
+
+        for procesos in (1, 2):
+            ruta_informe = os.path.join(directorio, f"informe_{procesos}.csv")
+            conciliador = ConciliadorExtractos(sistema, particiones=3, procesos=procesos)
+            resumen = conciliador.conciliar(ruta_extracto, ruta_informe)
+            assert (resumen['lineas'], resumen['conciliada'], resumen['discrepancia_monto']) == (8, 3, 1)
+            assert (resumen['falta_en_libro'], resumen['falta_en_extracto'], resumen['linea_invalida']) == (1, 1, 3)
+            assert resumen['monto_conciliado'] == 1000
+
+            with open(ruta_informe, encoding="utf-8") as archivo:
+                informe = {fila['referencia'] or fila['id_transaccion']: fila for fila in csv.DictReader(archivo)}
+            assert informe['A-4']['resultado'] == "discrepancia_monto"
+            assert informe['A-4']['monto_libro'] == "-50.00"
+            assert informe['A-5']['resultado'] == "falta_en_libro"
+            assert informe['A-6']['resultado'] == "linea_invalida"
+            assert informe['A-7']['resultado'] == informe['A-8']['resultado'] == "linea_invalida"
+            assert informe[str(deposito.id)]['resultado'] == "falta_en_extracto"
+
+        # Un extracto sin las columnas obligatorias se rechaza
+        with open(ruta_extracto, "w", encoding="utf-8") as archivo:
+            archivo.write("cuenta,importe\n")
+        try:
+            ConciliadorExtractos(sistema).conciliar(ruta_extracto)
+            assert False, "Debería rechazar un extracto sin columnas obligatorias"
+        except ValueError as e:
+            assert "numero_cuenta" in str(e)
+
+
+def test_politicas_tipo_cuenta():
+    """Prueba las políticas de saldo mínimo, sobregiro y retiro máximo por tipo de cuenta."""
+    politicas = MotorPoliticas([
+        PoliticaCuenta("Ahorro", saldo_minimo=10, max_retiro=200),
+        PoliticaCuenta("Corriente", sobregiro=100)
+    ])
+    sistema = SistemaBancario(politicas=politicas)
+    ahorro = sistema.crear_cuenta("Juan Pérez", "Ahorro", 500.00)['numero_cuenta']
+    corriente = sistema.crear_cuenta("María González", "Corriente", 50.00)['numero_cuenta']
+    nomina = sistema.crear_cuenta("Carlos López", "Nómina", 30.00)['numero_cuenta']
+
+    # Ahorro: retiro máximo por operación y saldo mínimo
+    resultado = sistema.intentar_retirar(ahorro, 250.00)
+    assert resultado.codigo == CodigoResultado.RETIRO_EXCEDE_MAXIMO
+    assert resultado.mensaje == "El retiro máximo en cuentas de Ahorro es de $200.00"
+    sistema.retirar(ahorro, 200.00)
+    resultado = sistema.intentar_transferir(ahorro, nomina, 295.00)
+    assert resultado.mensaje == "Saldo insuficiente en cuenta origen. Saldo disponible: $290.00"
+    sistema.transferir(ahorro, nomina, 290.00)
+    assert sistema.buscar_cuenta(ahorro)['saldo'] == 10
+
+    # Corriente: puede quedar en negativo hasta el sobregiro
+    sistema.retirar(corriente, 120.00)
+    assert sistema.buscar_cuenta(corriente)['saldo'] == -70
+    resultado = sistema.intentar_retirar(corriente, 40.00)
+    assert resultado.mensaje == "Saldo insuficiente. Saldo disponible: $30.00"
+    assert sistema.cuentas_menor_saldo(1)[0]['numero_cuenta'] == corriente
+
+    # Los tipos sin política no pueden quedar en negativo
+    assert sistema.intentar_retirar(nomina, 320.01).codigo == CodigoResultado.SALDO_INSUFICIENTE
+    sistema.retirar(nomina, 320.00)
+
+    # Al registrarse un tipo de cuenta nuevo se compila solo su tabla
+    tablas = sistema._tablas_politicas
+    empresarial = sistema.crear_cuenta("Ana Torres", "Empresarial", 5.00)['numero_cuenta']
+    assert sistema._tablas_politicas is tablas and len(tablas) == len(sistema.cuentas.nombres_tipo)
+    assert sistema.intentar_retirar(empresarial, 6).codigo == CodigoResultado.SALDO_INSUFICIENTE
+
+    # Las órdenes permanentes respetan el sobregiro de la cuenta origen
+    programador = ProgramadorOrdenes(sistema, max_reintentos=0)
+    inicio = datetime(2025, 1, 1)
+    programador.crear_orden(corriente, empresarial, 30.00, primera_ejecucion=inicio)
+    programador.crear_orden(corriente, empresarial, 1.00, primera_ejecucion=inicio)
+    resumen = programador.ejecutar_pendientes(inicio)
+    assert (resumen['ejecutadas'], resumen['omitidas']) == (1, 1)
+    assert sistema.buscar_cuenta(corriente)['saldo'] == -100
+    assert VerificadorLibro(sistema).verificar()['correcto']
+
+    # Asignar otro motor recompila las tablas de todos los tipos
+    sistema.politicas = MotorPoliticas()
+    assert sistema.intentar_retirar(ahorro, 10.00).ok
+
+    try:
+        PoliticaCuenta("Mixta", saldo_minimo=10, sobregiro=10)
+        assert False, "Debería rechazar saldo mínimo y sobregiro a la vez"
+    except ValueError:
+        pass
+
+
 if __name__ == "__main__":
     test_sistema_bancario()
+    test_cache_consultas()
+    test_flujo_eventos()
+    test_ciclo_vida_cuentas()
+    test_motor_intereses()
+    test_generador_carga()
+    test_extracto_paginado()
+    test_libro_partida_doble()
+    test_arranque_sin_interfaz()
+    test_limites_velocidad()
+    test_resultados_sin_excepciones()
+    test_almacen_cuentas_denso()
+    test_ordenes_permanentes()
+    test_trazas_rendimiento()
+    test_consulta_cuentas_lote()
+    test_compactacion_libro()
+    test_replicacion_lider_seguidor()
+    test_replicacion_diario_acotado()
+    test_replicacion_historial_archivado()
+    test_instantanea_binaria()
+    test_ranking_saldos()
+    test_agregados_por_tiempo()
+    test_saldos_memoria_compartida()
+    test_conciliacion_extractos()
+    test_politicas_tipo_cuenta()